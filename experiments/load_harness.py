@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Load harness for the game server.
+
+Connects N clients that move and shoot continuously, then reports:
+- broadcast throughput (state frames and bytes received per second, all clients)
+- shoot -> bullet_created round-trip latency (p50 / p99)
+
+Usage:
+    python experiments/load_harness.py --clients 40 --duration 20
+    python experiments/load_harness.py --compare   # default vs TUNED_STARTUP=1
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+
+import aiohttp
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(__file__), '..', 'server', 'game_server.py')
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class LoadClient:
+    """A single connection that moves, shoots and records what it receives"""
+
+    def __init__(self, session, url):
+        self.session = session
+        self.url = url
+        self.ws = None
+        self.player_id = None
+        self.state_frames = 0
+        self.bytes_received = 0
+        self.pending_shots = []
+        self.latencies = []
+
+    async def connect(self):
+        self.ws = await self.session.ws_connect(self.url)
+        init = json.loads((await self.ws.receive()).data)
+        self.player_id = init['player_id']
+
+    async def listen(self):
+        async for msg in self.ws:
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                continue
+            self.bytes_received += len(msg.data)
+            data = json.loads(msg.data)
+            if data['type'] == 'state':
+                self.state_frames += 1
+            elif data['type'] == 'bullet_created':
+                if data['bullet']['owner_id'] == self.player_id and self.pending_shots:
+                    self.latencies.append((time.perf_counter() - self.pending_shots.pop(0)) * 1000)
+
+    async def play(self, duration):
+        end = time.perf_counter() + duration
+        x, y = random.uniform(100, 700), random.uniform(100, 500)
+        while time.perf_counter() < end:
+            x = max(30, min(770, x + random.uniform(-10, 10)))
+            y = max(30, min(570, y + random.uniform(-10, 10)))
+            await self.ws.send_str(json.dumps({
+                'type': 'update',
+                'data': {'x': x, 'y': y, 'angle': random.uniform(0, 2 * math.pi)}
+            }))
+            self.pending_shots.append(time.perf_counter())
+            await self.ws.send_str(json.dumps({'type': 'shoot'}))
+            await asyncio.sleep(0.1)
+
+
+async def run_load(url, clients, duration):
+    """Run the load and return a result dict"""
+    async with aiohttp.ClientSession() as session:
+        bots = [LoadClient(session, url) for _ in range(clients)]
+        for bot in bots:
+            await bot.connect()
+
+        listeners = [asyncio.create_task(bot.listen()) for bot in bots]
+        start = time.perf_counter()
+        await asyncio.gather(*(bot.play(duration) for bot in bots))
+        elapsed = time.perf_counter() - start
+
+        for bot in bots:
+            await bot.ws.close()
+        for task in listeners:
+            task.cancel()
+
+    latencies = [value for bot in bots for value in bot.latencies]
+    return {
+        'clients': clients,
+        'state_frames_per_sec': sum(bot.state_frames for bot in bots) / elapsed,
+        'kbytes_per_sec': sum(bot.bytes_received for bot in bots) / elapsed / 1024,
+        'rtt_p50_ms': percentile(latencies, 50),
+        'rtt_p99_ms': percentile(latencies, 99),
+    }
+
+
+async def wait_for_server(url, timeout=10.0):
+    deadline = time.perf_counter() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.perf_counter() < deadline:
+            try:
+                async with session.get(url):
+                    return
+            except aiohttp.ClientError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start")
+
+
+async def run_with_server(port, env_overrides, clients, duration):
+    """Start a server subprocess with the given environment, load it, and stop it"""
+    env = dict(os.environ, PORT=str(port), **env_overrides)
+    server = subprocess.Popen([sys.executable, SERVER_SCRIPT], env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        await wait_for_server(f"http://127.0.0.1:{port}/")
+        return await run_load(f"ws://127.0.0.1:{port}/ws", clients, duration)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def print_result(label, result):
+    print(f"{label:10s} clients={result['clients']:3d} "
+          f"state={result['state_frames_per_sec']:8.1f} frames/s "
+          f"rx={result['kbytes_per_sec']:8.1f} KB/s "
+          f"rtt p50={result['rtt_p50_ms']:6.2f}ms p99={result['rtt_p99_ms']:6.2f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Game server load harness")
+    parser.add_argument('--url', default='ws://127.0.0.1:8080/ws')
+    parser.add_argument('--clients', type=int, default=40)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--compare', action='store_true',
+                        help="Start the server twice (default and TUNED_STARTUP=1) and compare")
+    parser.add_argument('--port', type=int, default=8090, help="Port used with --compare")
+    args = parser.parse_args()
+
+    if args.compare:
+        for label, env in (('default', {'TUNED_STARTUP': '0'}), ('tuned', {'TUNED_STARTUP': '1'})):
+            print_result(label, await run_with_server(args.port, env, args.clients, args.duration))
+    else:
+        print_result('server', await run_load(args.url, args.clients, args.duration))
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Headless micro-benchmarks for the game loop hot paths.
+
+Imports GameState directly (no sockets, no event loop) and times the
+per-tick work at several entity counts:
+- update_bullets, check_collisions, grow_players
+- get_state / get_chunked_state (state snapshot)
+- json_dumps (the plain state frame) and encode_state (per-chunk encoding
+  plus one view, what the broadcast pipeline does)
+
+Each case is run for several rounds on a freshly seeded GameState and the
+median time per call is reported. Results are compared to a baseline file
+and the run fails (exit code 1) when a case is slower than the baseline by
+more than --threshold.
+
+Usage:
+    python experiments/physics_bench.py                 # compare with the baseline
+    python experiments/physics_bench.py --save          # record a new baseline
+    python experiments/physics_bench.py --sizes 50:1000 --threshold 0.5
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+import game_server  # noqa: E402
+from world import encode_state_frame  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'physics_bench_baseline.json')
+DEFAULT_SIZES = '10:100,50:1000,200:4000'  # players:bullets
+# Differences below this are timer noise, whatever the relative change
+MIN_REGRESSION_MS = 0.005
+
+
+@contextmanager
+def room_limits(players: int, bullets: int):
+    """Raise MAX_SESSIONS and MAX_ACTIVE_BULLETS to fit a room, restoring them afterwards"""
+    saved = game_server.MAX_SESSIONS, game_server.MAX_ACTIVE_BULLETS
+    game_server.MAX_SESSIONS = max(saved[0], players)
+    game_server.MAX_ACTIVE_BULLETS = max(saved[1], bullets)
+    try:
+        yield
+    finally:
+        game_server.MAX_SESSIONS, game_server.MAX_ACTIVE_BULLETS = saved
+
+
+def build_game(players: int, bullets: int, seed: int) -> game_server.GameState:
+    """A room with the given number of players spread over the world and bullets in flight"""
+    random.seed(seed)
+    game = game_server.GameState()
+    with room_limits(players, bullets):
+        for i in range(players):
+            game.add_player(f"p{i}", None, name=f"bench{i}")
+        player_ids = list(game.players)
+        for _ in range(bullets):
+            player_id = random.choice(player_ids)
+            game.update_player(player_id, {'angle': random.uniform(-3.2, 3.2)})
+            game.create_bullet(player_id)
+    return game
+
+
+def state_frame(game: game_server.GameState) -> dict:
+    return {'type': 'state', 'tick': game.tick, 'time': 0, 'data': game.get_state(), 'hits': []}
+
+
+def chunked_frame(game: game_server.GameState) -> dict:
+    return {'type': 'state', 'tick': game.tick, 'time': 0, 'chunks': game.get_chunked_state(), 'hits': []}
+
+
+def encode_for_one_view(game: game_server.GameState, frame: dict):
+    encoded = encode_state_frame(frame)
+    encoded.frame(game.view_of('p0'))
+
+
+# name -> (prepare(game) -> argument, operation(game, argument))
+CASES = {
+    'update_bullets': (lambda game: None, lambda game, _: game.update_bullets()),
+    'check_collisions': (lambda game: None, lambda game, _: game.check_collisions()),
+    'grow_players': (lambda game: None, lambda game, _: game.grow_players()),
+    'get_state': (lambda game: None, lambda game, _: game.get_state()),
+    'get_chunked_state': (lambda game: None, lambda game, _: game.get_chunked_state()),
+    'json_dumps': (state_frame, lambda game, frame: json.dumps(frame)),
+    'encode_state': (chunked_frame, encode_for_one_view),
+}
+
+
+def time_case(name: str, players: int, bullets: int, rounds: int, calls: int) -> float:
+    """Median time of one call in ms. Every round starts from the same seeded state."""
+    prepare, operation = CASES[name]
+    per_call = []
+    for round_index in range(rounds):
+        game = build_game(players, bullets, seed=round_index)
+        argument = prepare(game)
+        started = time.perf_counter()
+        for _ in range(calls):
+            operation(game, argument)
+        per_call.append((time.perf_counter() - started) * 1000 / calls)
+    return statistics.median(per_call)
+
+
+def run(sizes, rounds: int, calls: int) -> dict:
+    results = {}
+    for players, bullets in sizes:
+        for name in CASES:
+            key = f"{name}[{players}x{bullets}]"
+            results[key] = round(time_case(name, players, bullets, rounds, calls), 4)
+            print(f"{key:36s} {results[key]:9.4f} ms")
+    return results
+
+
+def environment() -> dict:
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'system': platform.system(),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Cases slower than the baseline by more than threshold (a fraction)"""
+    regressions = []
+    for key, value in results.items():
+        reference = baseline['results'].get(key)
+        if reference is None:
+            continue
+        if value > reference * (1 + threshold) and value - reference > MIN_REGRESSION_MS:
+            regressions.append((key, reference, value))
+    return regressions
+
+
+def parse_sizes(text: str) -> list:
+    sizes = []
+    for item in text.split(','):
+        players, bullets = item.split(':')
+        sizes.append((int(players), int(bullets)))
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless game loop benchmarks")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help="Comma separated players:bullets pairs")
+    parser.add_argument('--rounds', type=int, default=7)
+    parser.add_argument('--calls', type=int, default=20, help="Calls timed per round")
+    parser.add_argument('--threshold', type=float, default=0.3,
+                        help="Allowed slowdown against the baseline (0.3 = 30%%)")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save', action='store_true', help="Write the results as the new baseline")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    results = run(parse_sizes(args.sizes), args.rounds, args.calls)
+
+    if args.save:
+        with open(args.baseline, 'w') as f:
+            json.dump({'environment': environment(), 'rounds': args.rounds, 'calls': args.calls,
+                       'results': results}, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --save first")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get('environment') != environment():
+        print(f"Note: baseline was recorded on {baseline.get('environment')}, timings may not be comparable")
+
+    regressions = compare(results, baseline, args.threshold)
+    for key, reference, value in regressions:
+        print(f"REGRESSION {key}: {reference:.4f} ms -> {value:.4f} ms ({(value / reference - 1) * 100:+.0f}%)")
+    if regressions:
+        sys.exit(1)
+    print(f"OK: {len(results)} cases within {args.threshold:.0%} of the baseline")
+
+
+if __name__ == '__main__':
+    main()
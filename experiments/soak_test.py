@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Soak test for per-connection memory.
+
+Starts the server, then repeatedly connects a wave of clients that move and
+shoot, disconnects them, and reads /admin/debug after every wave. Object
+counts must return to zero after each wave and RSS must stay flat after the
+warm-up waves.
+
+Usage:
+    python experiments/soak_test.py --waves 20 --clients 30 --wave-seconds 5
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+import aiohttp
+
+from load_harness import run_load, wait_for_server, SERVER_SCRIPT
+
+ADMIN_TOKEN = 'soak'
+LEAK_KEYS = ('players', 'connections', 'connection_stats', 'bullet_owners')
+
+
+async def read_debug(port):
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f"http://127.0.0.1:{port}/admin/debug", params={'token': ADMIN_TOKEN}) as response:
+            return await response.json()
+
+
+async def soak(port, waves, clients, wave_seconds, warmup, max_growth_mb):
+    env = dict(os.environ, PORT=str(port), ADMIN_TOKEN=ADMIN_TOKEN, BOTS='0')
+    server = await asyncio.create_subprocess_exec(sys.executable, SERVER_SCRIPT, env=env,
+                                                  stdout=asyncio.subprocess.DEVNULL,
+                                                  stderr=asyncio.subprocess.DEVNULL)
+    failures = []
+    try:
+        await wait_for_server(f"http://127.0.0.1:{port}/")
+        baseline_rss = None
+
+        for wave in range(1, waves + 1):
+            await run_load(f"ws://127.0.0.1:{port}/ws", clients, wave_seconds)
+            # Let the server run the handlers' cleanup
+            await asyncio.sleep(0.5)
+            debug = await read_debug(port)
+            objects = debug['objects']
+            rss_mb = debug['process']['rss_bytes'] / 1024 / 1024
+
+            print(f"wave {wave:3d} rss={rss_mb:7.1f}MB gc_objects={debug['process']['gc_objects']:8d} "
+                  + " ".join(f"{key}={objects[key]}" for key in LEAK_KEYS + ('bullets',))
+                  + f" opened={debug['lifecycle']['opened']} closed={debug['lifecycle']['closed']}")
+
+            leaked = {key: objects[key] for key in LEAK_KEYS if objects[key]}
+            if leaked:
+                failures.append(f"wave {wave}: objects left after disconnect: {leaked}")
+            if debug['lifecycle']['opened'] != debug['lifecycle']['closed']:
+                failures.append(f"wave {wave}: {debug['lifecycle']} connections not closed")
+
+            if wave == warmup:
+                baseline_rss = rss_mb
+            elif baseline_rss is not None and rss_mb - baseline_rss > max_growth_mb:
+                failures.append(f"wave {wave}: RSS grew {rss_mb - baseline_rss:.1f}MB since wave {warmup}")
+    finally:
+        server.terminate()
+        await server.wait()
+
+    return failures
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Connection churn soak test")
+    parser.add_argument('--port', type=int, default=8091)
+    parser.add_argument('--waves', type=int, default=20)
+    parser.add_argument('--clients', type=int, default=30)
+    parser.add_argument('--wave-seconds', type=float, default=5)
+    parser.add_argument('--warmup', type=int, default=3, help="Waves before the RSS baseline is taken")
+    parser.add_argument('--max-growth-mb', type=float, default=5)
+    args = parser.parse_args()
+
+    failures = await soak(args.port, args.waves, args.clients, args.wave_seconds, args.warmup, args.max_growth_mb)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK: memory and object counts stayed flat")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
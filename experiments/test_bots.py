@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test that humans can join a room already filled with bots.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+import game_server  # noqa: E402
+from bots import BotController  # noqa: E402
+
+
+async def join_full_room():
+    """Fill a room with BOTS=MAX_SESSIONS bots, then let two humans join"""
+    saved = game_server.game, game_server.bots, game_server.stats
+    game = game_server.GameState()
+    bots = BotController(game, game_server.MAX_SESSIONS, game_server.WORLD_WIDTH,
+                         game_server.WORLD_HEIGHT, game_server.PLAYER_SPEED)
+    game_server.game, game_server.bots, game_server.stats = game, bots, None
+    replies = []
+
+    async def reply(message):
+        replies.append(message)
+
+    try:
+        bots.rebalance()
+        assert len(game.players) == game_server.MAX_SESSIONS
+        joined = [await game_server.join_game(player_id, None, reply) for player_id in ('alice', 'bob')]
+        # The next tick keeps the room full without bringing the bots back
+        rebalanced = bots.rebalance()
+        return game, bots, joined, replies, rebalanced
+    finally:
+        game_server.game, game_server.bots, game_server.stats = saved
+
+
+def test_humans_replace_bots_in_a_full_room():
+    logging.disable(logging.INFO)
+    try:
+        game, bots, joined, replies, rebalanced = asyncio.run(join_full_room())
+    finally:
+        logging.disable(logging.NOTSET)
+
+    assert joined == [True, True]
+    assert [reply['type'] for reply in replies] == ['init', 'init']
+    assert {'alice', 'bob'} <= set(game.players)
+    assert len(game.players) == game_server.MAX_SESSIONS
+    assert len(bots.brains) == game_server.MAX_SESSIONS - 2
+    assert rebalanced == ([], [])
@@ -1,34 +1,26 @@
 #!/usr/bin/env python3
 """
-Standalone test to verify edge position logic without importing aiohttp.
+Test the respawn edge position logic of GameState.
 """
 
-import random
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from game_server import GameState, PLAYER_INITIAL_SIZE, WORLD_WIDTH, WORLD_HEIGHT  # noqa: E402
+
+# Respawned players are placed one radius (the initial size) from the edge
+CANVAS_WIDTH = WORLD_WIDTH
+CANVAS_HEIGHT = WORLD_HEIGHT
+RESPAWN_EDGE_MARGIN = PLAYER_INITIAL_SIZE
+
+_game = GameState()
 
-# Constants from server
-CANVAS_WIDTH = 800
-CANVAS_HEIGHT = 600
-RESPAWN_EDGE_MARGIN = 50
-PLAYER_INITIAL_SIZE = 20
 
 def get_random_edge_position():
-    """Generate a random position at the edge of the game area"""
-    edge = random.choice(['top', 'bottom', 'left', 'right'])
-
-    if edge == 'top':
-        x = random.uniform(RESPAWN_EDGE_MARGIN, CANVAS_WIDTH - RESPAWN_EDGE_MARGIN)
-        y = RESPAWN_EDGE_MARGIN
-    elif edge == 'bottom':
-        x = random.uniform(RESPAWN_EDGE_MARGIN, CANVAS_WIDTH - RESPAWN_EDGE_MARGIN)
-        y = CANVAS_HEIGHT - RESPAWN_EDGE_MARGIN
-    elif edge == 'left':
-        x = RESPAWN_EDGE_MARGIN
-        y = random.uniform(RESPAWN_EDGE_MARGIN, CANVAS_HEIGHT - RESPAWN_EDGE_MARGIN)
-    else:  # right
-        x = CANVAS_WIDTH - RESPAWN_EDGE_MARGIN
-        y = random.uniform(RESPAWN_EDGE_MARGIN, CANVAS_HEIGHT - RESPAWN_EDGE_MARGIN)
-
-    return x, y
+    """Edge position for a freshly respawned player"""
+    return _game.get_random_edge_position(PLAYER_INITIAL_SIZE)
 
 def test_random_edge_position():
     """Test that random edge position is truly at the edge"""
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Randomized invariant tests for the GameState secondary indexes.
+
+Random joins, leaves, renames, shots and physics steps are applied to a
+GameState and after every step bullets_by_owner and players_by_name are
+checked against indexes rebuilt from players and bullets.
+"""
+
+import logging
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+import game_server  # noqa: E402
+from game_server import GameState  # noqa: E402
+
+
+def rebuild_indexes(game: GameState):
+    """Indexes computed from scratch by scanning the primary dicts"""
+    by_owner, by_name = {}, {}
+    for bullet_id, bullet in game.bullets.items():
+        by_owner.setdefault(bullet.owner_id, set()).add(bullet_id)
+    for player_id, player in game.players.items():
+        by_name.setdefault(player.name, set()).add(player_id)
+    return by_owner, by_name
+
+
+def check_invariants(game: GameState, step: int, op: str):
+    by_owner, by_name = rebuild_indexes(game)
+    assert game.bullets_by_owner == by_owner, f"step {step} ({op}): bullets_by_owner out of sync"
+    assert game.players_by_name == by_name, f"step {step} ({op}): players_by_name out of sync"
+
+    # No empty index entries are left behind
+    assert all(game.bullets_by_owner.values()), f"step {step} ({op}): empty owner entry"
+    assert all(game.players_by_name.values()), f"step {step} ({op}): empty name entry"
+
+    # Name lookups go through the index
+    for name, player_ids in by_name.items():
+        found = {player.id for player in game.find_players_by_name(name)}
+        assert found == player_ids, f"step {step} ({op}): find_players_by_name({name!r})"
+
+    # A departed player owns nothing
+    for owner_id in game.bullets_by_owner:
+        assert owner_id in game.players, f"step {step} ({op}): bullets of departed {owner_id}"
+
+    for player_id in game.players:
+        assert game.active_bullet_count(player_id) == len(by_owner.get(player_id, ())), \
+            f"step {step} ({op}): active_bullet_count({player_id})"
+        assert game.active_bullet_count(player_id) <= game_server.MAX_ACTIVE_BULLETS
+
+
+def run(steps: int, seed: int) -> dict:
+    """Apply random operations, checking the invariants after each. Returns the count per operation."""
+    rng = random.Random(seed)
+    random.seed(seed)
+    game = GameState()
+    names = ['alice', 'bob', 'carol', 'dave']  # Few names so they collide
+    next_id = 0
+    counts = {}
+
+    for step in range(steps):
+        player_ids = list(game.players)
+        roll = rng.random()
+
+        if roll < 0.05 or not player_ids:
+            op = 'join'
+            next_id += 1
+            try:
+                game.add_player(f"p{next_id}", None, name=rng.choice(names + [None]))
+            except ValueError:
+                op = 'join_full'
+        elif roll < 0.09:
+            op = 'leave'
+            game.remove_player(rng.choice(player_ids))
+        elif roll < 0.10:
+            op = 'leave_twice'
+            player_id = rng.choice(player_ids)
+            game.remove_player(player_id)
+            game.remove_player(player_id)
+        elif roll < 0.15:
+            op = 'rename'
+            game.update_player_name(rng.choice(player_ids), rng.choice(names))
+        elif roll < 0.55:
+            op = 'shoot'
+            player_id = rng.choice(player_ids)
+            game.update_player(player_id, {'angle': rng.uniform(-3.2, 3.2)})
+            game.create_bullet(player_id)
+        elif roll < 0.65:
+            op = 'move'
+            game.update_player(rng.choice(player_ids), {'x': rng.uniform(0, 800), 'y': rng.uniform(0, 600)})
+        else:
+            op = 'physics'
+            game.update_bullets()
+            game.check_collisions()
+
+        counts[op] = counts.get(op, 0) + 1
+        check_invariants(game, step, op)
+
+    return counts
+
+
+def test_indexes_stay_consistent():
+    """Every kind of operation keeps both indexes in sync"""
+    logging.disable(logging.INFO)
+    try:
+        counts = run(5000, seed=1)
+    finally:
+        logging.disable(logging.NOTSET)
+    assert {'join', 'leave', 'leave_twice', 'rename', 'shoot', 'move', 'physics'} <= set(counts)
+
+
+def test_refused_joins_are_not_indexed():
+    """Joins refused because the room is full leave the indexes untouched"""
+    saved = game_server.MAX_SESSIONS
+    game_server.MAX_SESSIONS = 3
+    logging.disable(logging.INFO)
+    try:
+        counts = run(3000, seed=2)
+    finally:
+        game_server.MAX_SESSIONS = saved
+        logging.disable(logging.NOTSET)
+    assert counts.get('join_full')
+
+
+def test_leaving_removes_bullets_and_name():
+    game = GameState()
+    game.add_player('shooter', None, name='alice')
+    game.add_player('other', None, name='alice')
+    for _ in range(5):
+        game.create_bullet('shooter')
+    assert game.active_bullet_count('shooter') == 5
+    assert {p.id for p in game.find_players_by_name('alice')} == {'shooter', 'other'}
+
+    game.remove_player('shooter')
+    assert game.active_bullet_count('shooter') == 0
+    assert not game.bullets
+    assert [p.id for p in game.find_players_by_name('alice')] == ['other']
+    assert game.find_players_by_name('nobody') == []
+    check_invariants(game, 0, 'leave')
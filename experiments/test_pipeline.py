@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test the bounded queue of the broadcast pipeline.
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from pipeline import BroadcastPipeline, Outgoing  # noqa: E402
+
+
+def merge_hits(older: dict, newer: dict) -> dict:
+    return {**newer, 'hits': older['hits'] + newer['hits']}
+
+
+def snapshot(tick: int) -> Outgoing:
+    return Outgoing({'type': 'state', 'tick': tick, 'hits': [tick]}, snapshot=True)
+
+
+def event(index: int) -> Outgoing:
+    return Outgoing({'type': 'bullet_created', 'index': index})
+
+
+async def fill_stalled_queue():
+    """Submit to a pipeline whose task never runs, as when the fan-out falls far behind"""
+    async def deliver(item, message_str):
+        pass
+
+    pipeline = BroadcastPipeline(deliver, merge_hits, max_queued=10)
+    for tick in range(100):
+        pipeline.submit(snapshot(tick))
+        for index in range(tick * 3, tick * 3 + 3):
+            pipeline.submit(event(index))
+    await pipeline.stop()
+    return pipeline
+
+
+def test_queue_is_bounded():
+    pipeline = asyncio.run(fill_stalled_queue())
+    queue = list(pipeline.queue)
+
+    assert len(queue) <= pipeline.max_queued
+    assert pipeline.dropped == 300 - (pipeline.max_queued - 1)
+
+    # Only the newest snapshot is left and it carries every older snapshot's hits
+    snapshots = [item for item in queue if item.snapshot]
+    assert len(snapshots) == 1
+    assert snapshots[0].message['tick'] == 99
+    assert snapshots[0].message['hits'] == list(range(100))
+
+    # The newest events are kept, in order
+    indexes = [item.message['index'] for item in queue if not item.snapshot]
+    assert indexes == list(range(300 - len(indexes), 300))
+
+
+async def deliver_and_stop():
+    delivered = []
+
+    async def deliver(item, message_str):
+        delivered.append(message_str)
+
+    pipeline = BroadcastPipeline(deliver, merge_hits)
+    pipeline.start()
+    pipeline.submit(event(0))
+    pipeline.submit(snapshot(1))
+    await asyncio.sleep(0.1)
+    await pipeline.stop()
+    return pipeline, delivered
+
+
+def test_stop_cancels_the_task():
+    pipeline, delivered = asyncio.run(deliver_and_stop())
+    assert len(delivered) == 2
+    assert pipeline._task is None
+    assert pipeline.stats()['queued'] == 0
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test resumable sessions against the websocket handler.
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from aiohttp import web  # noqa: E402
+from aiohttp.test_utils import TestClient, TestServer  # noqa: E402
+
+import game_server  # noqa: E402
+from launcher import WORKER_ROUTER_KEY  # noqa: E402
+
+
+class CountingRouter:
+    """Stands in for the worker router, records the room count reports of the handler"""
+    room = '0'
+
+    def __init__(self):
+        self.reports = []
+
+    async def report(self, delta: int, room=None):
+        self.reports.append(delta)
+
+
+async def with_room(scenario, router=None):
+    """Run scenario(client, game) against a fresh room served by websocket_handler"""
+    saved = game_server.game, game_server.stats
+    game = game_server.GameState()
+    game_server.game, game_server.stats = game, None
+    app = web.Application()
+    if router:
+        app[WORKER_ROUTER_KEY] = router
+    app.router.add_get('/ws', game_server.websocket_handler)
+    client = TestClient(TestServer(app))
+    await client.start_server()
+    try:
+        return await scenario(client, game)
+    finally:
+        await client.close()
+        game_server.game, game_server.stats = saved
+
+
+async def drop(ws):
+    """Cut the connection without a close frame, like a network failure"""
+    ws._response.connection.transport.abort()
+    await asyncio.sleep(0.1)
+
+
+async def wait_for(condition):
+    for _ in range(50):
+        if condition():
+            return
+        await asyncio.sleep(0.02)
+
+
+def test_resume_keeps_the_player():
+    async def scenario(client, game):
+        ws = await client.ws_connect('/ws')
+        init = await ws.receive_json()
+        await drop(ws)
+        assert init['player_id'] in game.suspended
+
+        resumed_ws = await client.ws_connect(f"/ws?resume={init['resume_token']}&tick=0")
+        resumed = await resumed_ws.receive_json()
+        await resumed_ws.close()
+        await wait_for(lambda: not game.players)
+        return init, resumed, game
+
+    init, resumed, game = asyncio.run(with_room(scenario))
+    assert resumed['type'] == 'resumed'
+    assert resumed['player_id'] == init['player_id']
+    assert resumed['resume_token'] != init['resume_token']
+    # A clean close after resuming is a real leave
+    assert not game.players and not game.suspended and not game.connections
+
+
+def test_failed_resume_suspends_again():
+    """If the resumed socket fails before the reply is sent, the player is suspended again, not left behind"""
+    def failing_resumed_message(*args):
+        raise ConnectionResetError("Cannot write to closing transport")
+
+    async def scenario(client, game):
+        ws = await client.ws_connect('/ws')
+        init = await ws.receive_json()
+        await drop(ws)
+
+        game_server.resumed_message = failing_resumed_message
+        try:
+            await client.ws_connect(f"/ws?resume={init['resume_token']}&tick=0")
+            await wait_for(lambda: init['player_id'] in game.suspended)
+        finally:
+            game_server.resumed_message = resumed_message
+        return init, game
+
+    resumed_message = game_server.resumed_message
+    init, game = asyncio.run(with_room(scenario))
+    player_id = init['player_id']
+    assert player_id in game.players
+    assert player_id in game.suspended
+    assert player_id not in game.connections
+    # Only the real player is in the room, no throwaway id joined or left
+    assert list(game.players) == [player_id]
+    assert game.expired_sessions(game.suspended[player_id]) == [player_id]
+
+
+def test_suspended_players_keep_their_slot():
+    """The launcher reserves a slot per connection, it is released on a real leave only"""
+    router = CountingRouter()
+
+    async def scenario(client, game):
+        ws = await client.ws_connect('/ws')
+        init = await ws.receive_json()
+        await drop(ws)
+        suspended = list(router.reports)
+
+        resumed_ws = await client.ws_connect(f"/ws?resume={init['resume_token']}&tick=0")
+        await resumed_ws.receive_json()
+        resumed = list(router.reports)
+
+        await resumed_ws.close()
+        await wait_for(lambda: not game.players)
+        return suspended, resumed
+
+    suspended, resumed = asyncio.run(with_room(scenario, router))
+    # Two connections were routed, so two slots were reserved
+    assert suspended == []
+    assert resumed == [-1]
+    assert router.reports == [-1, -1]
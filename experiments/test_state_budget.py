@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test the per-client state frame budget: frames fit the byte budget, no
+player starves and clients learn which players left their view.
+"""
+
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+import game_server  # noqa: E402
+from budget import ClientBudget  # noqa: E402
+from world import encode_state_frame  # noqa: E402
+
+PLAYERS = game_server.MAX_SESSIONS
+TICKS = 200
+POSITION_SCALE = 10
+CHUNK_SIZE = 400
+# Ids as the server makes them: player_<ms>_<random>
+PLAYER_IDS = [f"player_{1792386390000 + i * 37}_{1000 + i}" for i in range(PLAYERS)]
+OWN_ID = PLAYER_IDS[0]
+
+
+def room(rng: random.Random) -> dict:
+    """Player states as in a state frame (quantized), spread over an 800x600 world"""
+    return {
+        player_id: {'x': rng.randrange(8000), 'y': rng.randrange(6000), 'angle': 0,
+                    'size': 200, 'name': f"player{i}", 'color': '#4CAF50'}
+        for i, player_id in enumerate(PLAYER_IDS)
+    }
+
+
+def step(players: dict, rng: random.Random):
+    """Some players move or turn every tick, the others stay unchanged"""
+    for data in players.values():
+        if rng.random() < 0.3:
+            data['x'] = min(7999, max(0, data['x'] + rng.randint(-200, 200)))
+            data['angle'] = rng.randint(-3141, 3141)
+
+
+def chunk_of(data: dict, chunked: bool):
+    if not chunked:
+        # All players in one chunk: the default world streams everything to everyone
+        return (0, 0)
+    size = CHUNK_SIZE * POSITION_SCALE
+    return (data['x'] // size, data['y'] // size)
+
+
+def encode(tick: int, players: dict, chunked: bool):
+    chunks = {}
+    for player_id, data in players.items():
+        chunks.setdefault(chunk_of(data, chunked), {})[player_id] = dict(data)
+    frame = {'tick': tick, 'time': 0, 'hits': [], 'chunks': chunks}
+    return encode_state_frame(frame, per_player=True)
+
+
+def run_client(budget_bytes: int, seed: int, chunked: bool = False):
+    """(frame, ids in view) sent to one client over TICKS ticks. Chunked, the client sees its own chunk only."""
+    rng = random.Random(seed)
+    players = room(rng)
+    budget = ClientBudget(budget_bytes, CHUNK_SIZE * POSITION_SCALE)
+    frames = []
+    for tick in range(TICKS):
+        step(players, rng)
+        state = encode(tick, players, chunked)
+        view = None
+        if chunked:
+            c, r = chunk_of(players[OWN_ID], chunked)
+            view = (c, r, c, r)
+        frames.append((json.loads(budget.frame(state, view, OWN_ID)), set(state.players_in(view))))
+    return frames
+
+
+def test_frames_fit_the_budget():
+    for budget_bytes in (1000, 1500, 2000):
+        for seed in range(3):
+            for chunked in (False, True):
+                for frame, in_view in run_client(budget_bytes, seed, chunked):
+                    assert len(json.dumps(frame)) <= budget_bytes
+                    assert OWN_ID in frame['data']['players']
+                    assert set(frame['data']['players']) <= in_view
+                    assert not set(frame['gone']) & in_view
+
+    # A full room still gets a share of the other players with every frame
+    for frame, _ in run_client(1000, seed=0):
+        assert len(frame['data']['players']) >= 5
+
+
+def test_no_player_starves():
+    frames = [frame for frame, _ in run_client(1500, seed=1)]
+
+    # Everyone shows up within the first frames, new players go first
+    seen = set()
+    for frame in frames[:10]:
+        seen.update(frame['data']['players'])
+    assert len(seen) == PLAYERS
+
+    # Afterwards no player goes unsent for long, however far or idle it is
+    last_sent = {}
+    longest_gap = 0
+    for tick, frame in enumerate(frames):
+        for player_id in frame['data']['players']:
+            if player_id in last_sent:
+                longest_gap = max(longest_gap, tick - last_sent[player_id])
+            last_sent[player_id] = tick
+    assert len(last_sent) == PLAYERS
+    assert all(TICKS - 1 - tick <= 30 for tick in last_sent.values())
+    assert longest_gap <= 30
+
+
+def test_clients_drop_players_that_left_the_view():
+    """A client keeping every player until it is listed in "gone" holds no ghosts for long"""
+    frames = run_client(1000, seed=2, chunked=True)
+    # Too many players start outside the view to announce them all in the first frame
+    assert 0 < len(frames[0][0]['gone']) < PLAYERS - len(frames[0][1])
+
+    known = set()
+    out_of_view_for = {}
+    for frame, in_view in frames:
+        known |= set(frame['data']['players'])
+        known -= set(frame['gone'])
+        out_of_view_for = {pid: out_of_view_for.get(pid, 0) + 1 for pid in known - in_view}
+        assert all(count <= 3 for count in out_of_view_for.values())
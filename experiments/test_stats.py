@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Test that StatsRecorder keeps flushing after a failed write.
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from stats import StatsRecorder  # noqa: E402
+
+
+class FlakyWrite:
+    """write_batch that fails once with an error that is not an sqlite3.Error"""
+
+    def __init__(self, write_batch):
+        self.write_batch = write_batch
+        self.failed = False
+
+    def __call__(self, batch):
+        if not self.failed:
+            self.failed = True
+            raise RuntimeError("disk went away")
+        self.write_batch(batch)
+
+
+async def record_and_flush(path: str):
+    recorder = StatsRecorder(path, flush_interval=0.01)
+    recorder.store.write_batch = FlakyWrite(recorder.store.write_batch)
+    recorder.start()
+    try:
+        recorder.record_hit('alice', None)
+        await asyncio.sleep(0.1)  # First flush fails, the batch is dropped
+        recorder.record_hit('bob', None)
+        await asyncio.sleep(0.1)
+        assert not recorder._task.done(), "flush task died"
+        return await recorder.leaderboard()
+    finally:
+        await recorder.close()
+
+
+def test_flush_survives_unexpected_errors(tmp_path):
+    leaderboard = asyncio.run(record_and_flush(str(tmp_path / 'stats.db')))
+    assert [row['name'] for row in leaderboard] == ['bob']
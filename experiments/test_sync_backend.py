@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test a simulating node and a relay sharing a room over LocalBroker.
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+import pytest  # noqa: E402
+
+import game_server  # noqa: E402
+from sync_backend import FrameRelay, LocalBroker, create_backend  # noqa: E402
+
+ROOM = 'main'
+
+
+class RecordingSocket:
+    """Stands in for a client WebSocket held by the relay"""
+
+    def __init__(self):
+        self.messages = []
+
+    async def send_str(self, text: str):
+        self.messages.append(json.loads(text))
+
+    def of_type(self, msg_type: str) -> list:
+        return [m for m in self.messages if m['type'] == msg_type]
+
+
+async def run_room():
+    broker = LocalBroker()
+
+    # Simulating node: the room's GameState publishes frames and takes input from the broker
+    game = game_server.GameState()
+    game.backend = broker
+    game.sync_room = ROOM
+    await broker.subscribe_inputs(ROOM, game_server.remote_input_handler)
+
+    # Relay node: holds the client sockets only
+    relay = FrameRelay(broker, ROOM)
+    first, second = RecordingSocket(), RecordingSocket()
+
+    saved_game = game_server.game
+    game_server.game = game
+    try:
+        await relay.attach('p1', first)
+        await relay.attach('p2', second)
+        await relay.forward('p1', {'type': 'update', 'data': {'x': 300, 'y': 200, 'angle': 0}})
+        await relay.forward('p1', {'type': 'change_name', 'name': 'Relayed'})
+        await game.broadcast_state({
+            'type': 'state',
+            'tick': game.tick,
+            'time': game_server.server_time_ms(),
+            'chunks': game.get_chunked_state(),
+            'hits': []
+        })
+        await relay.detach('p1')
+    finally:
+        game_server.game = saved_game
+    return game, first, second
+
+
+def test_relay_over_local_broker():
+    """Players on a relay join, steer and leave the room simulated on the other node"""
+    game, first, second = asyncio.run(run_room())
+
+    # Each relayed player got its own init, the other one was told about the join
+    assert [m['player_id'] for m in first.of_type('init')] == ['p1']
+    assert [m['player_id'] for m in second.of_type('init')] == ['p2']
+    assert [m['player_id'] for m in first.of_type('player_joined')] == ['p2']
+
+    # Input forwarded by the relay reached the simulation
+    assert [m['name'] for m in second.of_type('player_name_changed')] == ['Relayed']
+
+    # Relays get the whole world in every state frame
+    states = second.of_type('state')
+    assert len(states) == 1
+    assert set(states[0]['data']['players']) == {'p1', 'p2'}
+    assert states[0]['data']['players']['p1']['x'] == 300 * game_server.POSITION_SCALE
+
+    # Leaving on the relay removes the player from the simulation
+    assert 'p1' not in game.players
+    assert [m['player_id'] for m in second.of_type('player_left')] == ['p1']
+    assert len(first.of_type('state')) == 1  # Detached sockets get nothing more
+
+
+def test_local_relay_is_rejected():
+    """A relay needs a broker shared with the simulating process"""
+    with pytest.raises(ValueError):
+        create_backend('local', '', 'relay')
+    assert isinstance(create_backend('local', '', 'simulate'), LocalBroker)
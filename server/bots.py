@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Server-side bot players.
+
+Bots are regular Player entries in GameState without a connection. They
+are updated inside the game loop tick and use the same update_player and
+create_bullet paths as human players, but never touch the network.
+Decisions for all bots are made in one batched pass per think interval.
+"""
+
+import math
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass
+class BotBrain:
+    """Decision state of a single bot"""
+    target_x: float
+    target_y: float
+    next_shot: float
+
+
+class BotController:
+    """Keeps a room populated with bots and drives them from the game loop"""
+
+    def __init__(self, game, fill_to: int, width: float, height: float, speed: float,
+                 think_interval: float = 0.1, shoot_cooldown: float = 0.8, aim_range: float = 350):
+        self.game = game
+        self.fill_to = fill_to
+        self.width = width
+        self.height = height
+        self.speed = speed
+        self.think_interval = think_interval
+        self.shoot_cooldown = shoot_cooldown
+        self.aim_range = aim_range
+        self.brains: Dict[str, BotBrain] = {}
+        self.bot_counter = 0
+        self.last_think = 0.0
+
+    def is_bot(self, player_id: str) -> bool:
+        return player_id in self.brains
+
+    def rebalance(self) -> Tuple[List[str], List[str]]:
+        """
+        Add or remove bots so that humans + bots == fill_to.
+        Returns (added_ids, removed_ids) so the caller can announce them.
+        """
+        humans = len(self.game.players) - len(self.brains)
+        wanted = max(0, self.fill_to - humans)
+        added, removed = [], []
+
+        while len(self.brains) < wanted:
+            self.bot_counter += 1
+            bot_id = f"bot_{self.bot_counter}"
+            try:
+                player = self.game.add_player(bot_id, None, name=f"bot{self.bot_counter}")
+            except ValueError:
+                break
+            self.brains[bot_id] = BotBrain(player.x, player.y, 0.0)
+            added.append(bot_id)
+
+        while len(self.brains) > wanted:
+            removed.append(self._remove_one())
+
+        return added, removed
+
+    def make_room(self, capacity: int) -> Optional[str]:
+        """
+        Remove a bot if the room is at capacity, so a joining human takes its slot
+        right away instead of waiting for the next rebalance.
+        Returns the removed bot id, or None if nothing was removed.
+        """
+        if len(self.game.players) < capacity or not self.brains:
+            return None
+        return self._remove_one()
+
+    def _remove_one(self) -> str:
+        bot_id = next(iter(self.brains))
+        del self.brains[bot_id]
+        self.game.remove_player(bot_id)
+        return bot_id
+
+    def update(self, now: float) -> list:
+        """Move all bots one tick and, on think ticks, decide aim and shots. Returns new bullets."""
+        if not self.brains:
+            return []
+
+        bullets = []
+        players = self.game.players
+
+        if now - self.last_think >= self.think_interval:
+            self.last_think = now
+            bullets = self._think(now)
+
+        # Movement runs every tick so bots move as smoothly as the physics step
+        step = self.speed * 0.5
+        for bot_id, brain in self.brains.items():
+            bot = players.get(bot_id)
+            if bot is None:
+                continue
+            dx = brain.target_x - bot.x
+            dy = brain.target_y - bot.y
+            distance = math.hypot(dx, dy)
+            if distance < step:
+                brain.target_x = random.uniform(bot.size, self.width - bot.size)
+                brain.target_y = random.uniform(bot.size, self.height - bot.size)
+                continue
+            self.game.update_player(bot_id, {
+                'x': bot.x + dx / distance * step,
+                'y': bot.y + dy / distance * step
+            })
+
+        return bullets
+
+    def _think(self, now: float) -> list:
+        """Batched decision pass: one snapshot of positions shared by all bots"""
+        players = self.game.players
+        positions = [(p.id, p.x, p.y) for p in players.values()]
+        range_sq = self.aim_range * self.aim_range
+        bullets = []
+
+        for bot_id, brain in self.brains.items():
+            bot = players.get(bot_id)
+            if bot is None:
+                continue
+
+            nearest = None
+            nearest_sq = range_sq
+            for player_id, x, y in positions:
+                if player_id == bot_id:
+                    continue
+                distance_sq = (x - bot.x) ** 2 + (y - bot.y) ** 2
+                if distance_sq < nearest_sq:
+                    nearest, nearest_sq = (x, y), distance_sq
+
+            if nearest is None:
+                continue
+
+            # Aim with a little noise so bots are beatable
+            angle = math.atan2(nearest[1] - bot.y, nearest[0] - bot.x) + random.uniform(-0.15, 0.15)
+            self.game.update_player(bot_id, {'angle': angle})
+
+            if now >= brain.next_shot:
+                brain.next_shot = now + self.shoot_cooldown * random.uniform(0.8, 1.5)
+                bullet = self.game.create_bullet(bot_id)
+                if bullet:
+                    bullets.append(bullet)
+
+        return bullets
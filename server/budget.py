@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Per-client byte budget for state frames.
+
+Without a budget every client gets every player in its view on every
+frame, so frames grow with the room. With a budget each client keeps a
+priority accumulator per player: every frame the accumulator grows by the
+player's priority (closer and changed players grow faster), the players
+with the highest accumulators are sent until the budget is used up, and
+the accumulators of the sent ones are reset. Players that are skipped
+for a while climb the order, so everyone is refreshed eventually and
+far or idle players are simply refreshed less often.
+
+The client's own player is always sent. Clients keep the players a
+budgeted frame leaves out, so the frame lists the players that left the
+client's view by id in "gone" instead; the list counts against the budget
+too, and whatever does not fit is announced with the next frames.
+"""
+
+import json
+import math
+from typing import Dict, Optional, Set
+
+from world import EncodedState, View
+
+# Priority of a player whose state did not change since it was last sent to this client
+UNCHANGED_WEIGHT = 0.25
+# Players never sent to this client go first so they show up on the next frame
+NEW_PLAYER_PRIORITY = 1000.0
+
+
+class ClientBudget:
+    """Priority accumulators of one client"""
+
+    def __init__(self, budget_bytes: int, distance_scale: float):
+        self.budget_bytes = budget_bytes
+        self.distance_scale = distance_scale  # Priority halves at this distance (state frame units)
+        self.accumulators: Dict[str, float] = {}
+        self.sent: Dict[str, str] = {}  # player id -> fragment last sent to this client
+        self.outside: Set[str] = set()  # players this client was told are out of its view
+
+    def frame(self, state: EncodedState, view: Optional[View], own_id: str) -> str:
+        """The state frame for this client, at most budget_bytes long unless its own player alone exceeds it"""
+        candidates = set(state.players_in(view))
+        own = state.positions.get(own_id)
+
+        selected = []
+        remaining = self.budget_bytes - len(state.prefix) - len('}}, "gone": []}')
+        if own_id in state.players:
+            selected.append(state.players[own_id])
+            remaining -= len(state.players[own_id]) + 2
+
+        # Players that left the view (or joined outside it) are announced once, as many as fit,
+        # the rest with the next frames. Players that left the room are announced by player_left
+        self.outside &= state.players.keys()
+        self.outside -= candidates
+        gone = []
+        for pid in state.players.keys() - candidates - self.outside:
+            cost = len(json.dumps(pid)) + 2
+            if cost > remaining:
+                break
+            remaining -= cost
+            gone.append(pid)
+            self.outside.add(pid)
+
+        ranked = []
+        for pid in candidates:
+            if pid == own_id:
+                continue
+            fragment = state.players[pid]
+            if pid not in self.sent:
+                priority = NEW_PLAYER_PRIORITY
+            else:
+                priority = 1.0 if self.sent[pid] != fragment else UNCHANGED_WEIGHT
+                if own is not None:
+                    x, y = state.positions[pid]
+                    priority /= 1 + math.hypot(x - own[0], y - own[1]) / self.distance_scale
+            accumulator = self.accumulators.get(pid, 0.0) + priority
+            self.accumulators[pid] = accumulator
+            ranked.append((accumulator, pid))
+
+        ranked.sort(reverse=True)
+        for _, pid in ranked:
+            fragment = state.players[pid]
+            cost = len(fragment) + 2
+            if cost > remaining:
+                continue
+            remaining -= cost
+            selected.append(fragment)
+            self.accumulators[pid] = 0.0
+            self.sent[pid] = fragment
+
+        # Forget players that left the view, they count as new when they come back
+        for pid in [pid for pid in self.accumulators if pid not in candidates]:
+            del self.accumulators[pid]
+            self.sent.pop(pid, None)
+
+        return state.prefix + ', '.join(selected) + '}}, "gone": ' + json.dumps(gone) + '}'
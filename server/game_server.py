@@ -5,16 +5,31 @@ Players are represented as colored circles that can move and shoot at each other
 """
 
 import asyncio
+import gc
 import json
 import random
+import secrets
 import time
+import socket
 import logging
-from typing import Dict, Set, Optional
-from dataclasses import dataclass, asdict
+from typing import TYPE_CHECKING, Dict, Set, Optional, Union
+from dataclasses import dataclass, field, asdict
 from aiohttp import web
 import aiohttp
 import os
 
+from profiler import LoopProfiler, TickTimer, PROFILE_MODES
+from launcher import WORKER_ROUTER_KEY, run_workers, worker_count
+from bots import BotController
+from stats import LEADERBOARD_ORDERS, StatsRecorder
+from pipeline import BroadcastPipeline, Outgoing
+from world import ChunkGrid, EncodedState, View, encode_state_frame
+from budget import ClientBudget
+
+if TYPE_CHECKING:
+    # Imported in init_app() only when SYNC_BACKEND is set
+    from sync_backend import FrameRelay, SyncBackend
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -30,7 +45,67 @@ PLAYER_SPEED = 5
 BULLET_SPEED = 10
 BULLET_SIZE = 5
 HIT_SIZE_REDUCTION = 10
+MAX_ACTIVE_BULLETS = 20  # Bullets one player may have in flight, further shots are ignored
 RESPAWN_EDGE_MARGIN = 0  # Distance from edge for respawn
+UPDATE_FPS = 60  # Internal update rate for physics (high precision)
+BROADCAST_FPS = 20  # Broadcast rate to clients (optimized for network)
+# Encode and send in a background task so sends overlap with the next physics steps (see pipeline.py)
+BROADCAST_PIPELINE = os.environ.get('BROADCAST_PIPELINE', '1') == '1'
+POSITION_SCALE = 10  # State frames carry positions and sizes as integers in 1/10 px
+ANGLE_SCALE = 1000  # and angles as integers in milliradians
+
+# Profiling (opt-in)
+PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+PROFILE_SECONDS = float(os.environ.get('PROFILE_SECONDS', 0))  # Profile N seconds after startup (0 = off)
+PROFILE_MODE = os.environ.get('PROFILE_MODE', 'sample')  # 'sample' (collapsed stacks) or 'cprofile' (pstats)
+TICK_BUDGET_MS = float(os.environ.get('TICK_BUDGET_MS', 0))  # Log ticks slower than this in ms (0 = off)
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')  # Admin endpoints are disabled when empty
+
+# Startup tuning
+TUNED_STARTUP = os.environ.get('TUNED_STARTUP', '0') == '1'  # uvloop (if installed) + tuned listening socket
+REUSE_PORT = os.environ.get('REUSE_PORT', '0') == '1'  # Allow several processes to bind the same port
+SOCKET_BACKLOG = int(os.environ.get('SOCKET_BACKLOG', 1024))
+SOCKET_SNDBUF = int(os.environ.get('SOCKET_SNDBUF', 0))  # Send buffer size in bytes (0 = OS default)
+WORKERS = os.environ.get('WORKERS', '1')  # Worker processes sharing the port, one room each ('auto' = one per core)
+STATIC_DIR = os.path.join(os.path.dirname(__file__), '..', 'static')
+IMPORTED_AT = time.time()  # Fallback for the startup time where the process start time is unknown
+
+# State sync between nodes (see sync_backend.py)
+SYNC_BACKEND = os.environ.get('SYNC_BACKEND', '')  # '' (standalone), 'local' or 'unix'
+SYNC_BROKER_PATH = os.environ.get('SYNC_BROKER_PATH', '/tmp/llm_game_broker.sock')
+SYNC_ROLE = os.environ.get('SYNC_ROLE', 'simulate')  # 'simulate' runs the room, 'relay' only holds client sockets
+SYNC_ROOM = os.environ.get('SYNC_ROOM', 'main')
+
+# Server-side bots fill the room up to this many players (0 = no bots)
+BOTS = int(os.environ.get('BOTS', 0))
+
+# Player statistics (see stats.py)
+STATS_DB = os.environ.get('STATS_DB', 'stats.db')  # SQLite file ('' = stats off)
+STATS_FLUSH_SECONDS = float(os.environ.get('STATS_FLUSH_SECONDS', 5))
+
+# Read-only spectators (/spectate) do not count against MAX_SESSIONS
+MAX_SPECTATORS = int(os.environ.get('MAX_SPECTATORS', 1000))
+SPECTATOR_FPS = float(os.environ.get('SPECTATOR_FPS', 10))  # State frames per second sent to spectators
+SPECTATOR_EVERY = max(1, round(BROADCAST_FPS / SPECTATOR_FPS))  # Every Nth player state frame goes to spectators
+
+# World size, may be larger than the client canvas (see world.py).
+# Collisions only look at nearby chunks and each client is streamed the players
+# of the chunks within VIEW_CHUNKS of its own chunk.
+WORLD_WIDTH = int(os.environ.get('WORLD_WIDTH', CANVAS_WIDTH))
+WORLD_HEIGHT = int(os.environ.get('WORLD_HEIGHT', CANVAS_HEIGHT))
+CHUNK_SIZE = max(PLAYER_MAX_SIZE, int(os.environ.get('CHUNK_SIZE', 400)))  # A player never spans more than two chunks
+VIEW_CHUNKS = int(os.environ.get('VIEW_CHUNKS', 1))
+# Cap each client's state frames at this many bytes by sending far and unchanged players
+# less often (see budget.py; 0 = every player in view on every frame)
+STATE_BUDGET_BYTES = int(os.environ.get('STATE_BUDGET_BYTES', 0))
+
+# A player whose socket drops stays in the room this long and can reattach with its resume token (0 = off)
+RESUME_GRACE_SECONDS = float(os.environ.get('RESUME_GRACE_SECONDS', 15))
+CLEAN_CLOSE_CODES = (aiohttp.WSCloseCode.OK, aiohttp.WSCloseCode.GOING_AWAY)  # Client left on purpose, no grace
+
+# Per-connection buffer limits
+WS_MAX_MESSAGE_SIZE = int(os.environ.get('WS_MAX_MESSAGE_SIZE', 64 * 1024))  # Largest accepted client message
+WS_MAX_WRITE_BUFFER = int(os.environ.get('WS_MAX_WRITE_BUFFER', 256 * 1024))  # Drop clients with more unsent bytes
 
 
 @dataclass
@@ -56,6 +131,24 @@ class Bullet:
     vy: float
     owner_id: str
     created_at: float
+    spawn_tick: int = 0
+
+
+@dataclass
+class ConnectionStats:
+    """Lifecycle accounting for one client connection"""
+    connected_at: float
+    transport: Optional[asyncio.BaseTransport] = field(default=None, repr=False)
+    messages_in: int = 0
+    bytes_in: int = 0
+    messages_out: int = 0
+    bytes_out: int = 0
+
+    def write_buffer_size(self) -> int:
+        """Bytes queued in the socket that the client has not read yet"""
+        if self.transport is None or self.transport.is_closing():
+            return 0
+        return self.transport.get_write_buffer_size()
 
 
 class GameState:
@@ -65,8 +158,34 @@ class GameState:
         self.players: Dict[str, Player] = {}
         self.bullets: Dict[str, Bullet] = {}
         self.connections: Dict[str, web.WebSocketResponse] = {}
+        self.connection_stats: Dict[str, ConnectionStats] = {}
+        # Spectators get broadcast frames but are not players
+        self.spectators: Dict[str, web.WebSocketResponse] = {}
+        self.spectator_stats: Dict[str, ConnectionStats] = {}
+        # Spectators get every SPECTATOR_EVERY-th state frame with the hits of the skipped ones
+        self.spectator_hits: list = []
+        self.frames_since_spectator_frame = 0
+        # Priority accumulators per player connection, used with STATE_BUDGET_BYTES
+        self.state_budgets: Dict[str, ClientBudget] = {}
+        # Outbound messages are queued here when set, otherwise sent directly
+        self.pipeline: Optional[BroadcastPipeline] = None
+        # Secondary indexes, kept in sync with players/bullets by the methods below
+        self.bullets_by_owner: Dict[str, Set[str]] = {}  # owner id -> bullet ids
+        self.players_by_name: Dict[str, Set[str]] = {}  # name -> player ids (names are not unique)
+        # Resumable sessions: token -> player id, player id -> token, and
+        # disconnected players kept until a deadline (time.time())
+        self.resume_tokens: Dict[str, str] = {}
+        self.session_tokens: Dict[str, str] = {}
+        self.suspended: Dict[str, float] = {}
+        self.connections_opened = 0
+        self.connections_closed = 0
         self.bullet_counter = 0
         self.player_counter = 0
+        self.tick = 0  # Physics steps since startup, bullets move once per tick
+        self.grid = ChunkGrid(WORLD_WIDTH, WORLD_HEIGHT, CHUNK_SIZE, VIEW_CHUNKS)
+        # Frames are also published here for players connected to relay nodes
+        self.backend: Optional['SyncBackend'] = None
+        self.sync_room: Optional[str] = None
 
     def get_random_edge_position(self, player_size: float) -> tuple:
         """Generate a random position at the edge of the game area, considering player size"""
@@ -75,32 +194,33 @@ class GameState:
         edge = random.choice(['top', 'bottom', 'left', 'right'])
 
         if edge == 'top':
-            x = random.uniform(margin, CANVAS_WIDTH - margin)
+            x = random.uniform(margin, WORLD_WIDTH - margin)
             y = margin
         elif edge == 'bottom':
-            x = random.uniform(margin, CANVAS_WIDTH - margin)
-            y = CANVAS_HEIGHT - margin
+            x = random.uniform(margin, WORLD_WIDTH - margin)
+            y = WORLD_HEIGHT - margin
         elif edge == 'left':
             x = margin
-            y = random.uniform(margin, CANVAS_HEIGHT - margin)
+            y = random.uniform(margin, WORLD_HEIGHT - margin)
         else:  # right
-            x = CANVAS_WIDTH - margin
-            y = random.uniform(margin, CANVAS_HEIGHT - margin)
+            x = WORLD_WIDTH - margin
+            y = random.uniform(margin, WORLD_HEIGHT - margin)
 
         return x, y
 
-    def add_player(self, player_id: str, ws: web.WebSocketResponse) -> Player:
+    def add_player(self, player_id: str, ws: Optional[web.WebSocketResponse],
+                   transport: Optional[asyncio.BaseTransport] = None, name: Optional[str] = None) -> Player:
         """Add a new player to the game"""
         if len(self.players) >= MAX_SESSIONS:
             raise ValueError("Server is full")
 
         # Generate default player name
         self.player_counter += 1
-        default_name = f"player{self.player_counter}"
+        default_name = name or f"player{self.player_counter}"
 
         # Random spawn position and color
-        x = random.uniform(100, CANVAS_WIDTH - 100)
-        y = random.uniform(100, CANVAS_HEIGHT - 100)
+        x = random.uniform(100, WORLD_WIDTH - 100)
+        y = random.uniform(100, WORLD_HEIGHT - 100)
         color = "#{:06x}".format(random.randint(0, 0xFFFFFF))
 
         player = Player(
@@ -115,18 +235,96 @@ class GameState:
         )
 
         self.players[player_id] = player
-        self.connections[player_id] = ws
+        self.players_by_name.setdefault(default_name, set()).add(player_id)
+        if ws is not None:
+            self.connections[player_id] = ws
+            self.connection_stats[player_id] = ConnectionStats(connected_at=time.time(), transport=transport)
+            self.connections_opened += 1
         logger.info(f"Player {player_id} ({default_name}) joined. Total players: {len(self.players)}")
         return player
 
     def remove_player(self, player_id: str):
-        """Remove a player from the game"""
-        if player_id in self.players:
-            del self.players[player_id]
-        if player_id in self.connections:
-            del self.connections[player_id]
+        """Remove a player, their connection and their bullets. Safe to call more than once."""
+        if player_id not in self.players and player_id not in self.connection_stats:
+            return
+
+        player = self.players.pop(player_id, None)
+        if player is not None:
+            self._unindex_name(player)
+        self.connections.pop(player_id, None)
+        if self.connection_stats.pop(player_id, None) is not None:
+            self.connections_closed += 1
+        for bullet_id in self.bullets_by_owner.pop(player_id, ()):
+            self.bullets.pop(bullet_id, None)
+        self.resume_tokens.pop(self.session_tokens.pop(player_id, None), None)
+        self.suspended.pop(player_id, None)
+        self.state_budgets.pop(player_id, None)
         logger.info(f"Player {player_id} left. Total players: {len(self.players)}")
 
+    def drop_connection(self, player_id: str):
+        """
+        Stop sending to a broken or too slow connection and close it.
+        The player is removed by the connection's handler once the socket closes,
+        so leaving is announced exactly once.
+        """
+        ws = self.connections.pop(player_id, None)
+        if ws is not None and not ws.closed:
+            asyncio.ensure_future(ws.close())
+
+    def issue_resume_token(self, player_id: str) -> str:
+        """A new token for reattaching to player_id; the previous one stops working"""
+        self.resume_tokens.pop(self.session_tokens.get(player_id), None)
+        token = secrets.token_urlsafe(16)
+        self.resume_tokens[token] = player_id
+        self.session_tokens[player_id] = token
+        return token
+
+    def suspend_player(self, player_id: str, grace: float):
+        """
+        Detach a player from its closed connection but keep it in the room
+        until the deadline, so it can be resumed without a leave and re-join
+        """
+        self.connections.pop(player_id, None)
+        if self.connection_stats.pop(player_id, None) is not None:
+            self.connections_closed += 1
+        self.suspended[player_id] = time.time() + grace
+        logger.info(f"Player {player_id} disconnected, resumable for {grace:g}s")
+
+    def resume_player(self, token: str, ws: web.WebSocketResponse,
+                      transport: Optional[asyncio.BaseTransport] = None) -> Optional[Player]:
+        """
+        Reattach a player to a new connection. Returns None for unknown or expired tokens.
+        The old socket may not have noticed the drop yet; the new connection takes over from it.
+        """
+        player_id = self.resume_tokens.get(token)
+        if player_id is None or player_id not in self.players:
+            return None
+        self.suspended.pop(player_id, None)
+        self.drop_connection(player_id)
+        if self.connection_stats.pop(player_id, None) is not None:
+            self.connections_closed += 1
+        self.connections[player_id] = ws
+        self.connection_stats[player_id] = ConnectionStats(connected_at=time.time(), transport=transport)
+        self.connections_opened += 1
+        logger.info(f"Player {player_id} resumed")
+        return self.players[player_id]
+
+    def expired_sessions(self, now: float) -> list:
+        """Suspended players whose grace period is over"""
+        return [player_id for player_id, deadline in self.suspended.items() if deadline <= now]
+
+    def add_spectator(self, spectator_id: str, ws: web.WebSocketResponse,
+                      transport: Optional[asyncio.BaseTransport] = None):
+        """Add a read-only viewer"""
+        if len(self.spectators) >= MAX_SPECTATORS:
+            raise ValueError("Too many spectators")
+        self.spectators[spectator_id] = ws
+        self.spectator_stats[spectator_id] = ConnectionStats(connected_at=time.time(), transport=transport)
+
+    def remove_spectator(self, spectator_id: str):
+        self.spectators.pop(spectator_id, None)
+        self.spectator_stats.pop(spectator_id, None)
+
     def update_player(self, player_id: str, data: dict):
         """Update player position and angle"""
         if player_id not in self.players:
@@ -136,10 +334,10 @@ class GameState:
 
         if 'x' in data:
             # Clamp position considering player size (radius) to prevent going beyond boundaries
-            player.x = max(player.size, min(CANVAS_WIDTH - player.size, data['x']))
+            player.x = max(player.size, min(WORLD_WIDTH - player.size, data['x']))
         if 'y' in data:
             # Clamp position considering player size (radius) to prevent going beyond boundaries
-            player.y = max(player.size, min(CANVAS_HEIGHT - player.size, data['y']))
+            player.y = max(player.size, min(WORLD_HEIGHT - player.size, data['y']))
         if 'angle' in data:
             player.angle = data['angle']
 
@@ -155,14 +353,34 @@ class GameState:
         if not name or len(name) > 20:
             return False
 
-        self.players[player_id].name = name
+        player = self.players[player_id]
+        self._unindex_name(player)
+        player.name = name
+        self.players_by_name.setdefault(name, set()).add(player_id)
         logger.info(f"Player {player_id} changed name to: {name}")
         return True
 
+    def _unindex_name(self, player: Player):
+        ids = self.players_by_name.get(player.name)
+        if ids is not None:
+            ids.discard(player.id)
+            if not ids:
+                del self.players_by_name[player.name]
+
+    def find_players_by_name(self, name: str) -> list:
+        """Players currently using a name"""
+        return [self.players[pid] for pid in self.players_by_name.get(name, ())]
+
+    def active_bullet_count(self, player_id: str) -> int:
+        """Bullets a player has in flight"""
+        return len(self.bullets_by_owner.get(player_id, ()))
+
     def create_bullet(self, player_id: str):
         """Create a bullet from a player"""
         if player_id not in self.players:
             return None
+        if self.active_bullet_count(player_id) >= MAX_ACTIVE_BULLETS:
+            return None
 
         player = self.players[player_id]
         self.bullet_counter += 1
@@ -184,12 +402,25 @@ class GameState:
             vx=vx,
             vy=vy,
             owner_id=player_id,
-            created_at=time.time()
+            created_at=time.time(),
+            spawn_tick=self.tick
         )
 
         self.bullets[bullet_id] = bullet
+        self.bullets_by_owner.setdefault(player_id, set()).add(bullet_id)
         return bullet
 
+    def remove_bullet(self, bullet_id: str):
+        """Remove a bullet and its owner index entry"""
+        bullet = self.bullets.pop(bullet_id, None)
+        if bullet is None:
+            return
+        owned = self.bullets_by_owner.get(bullet.owner_id)
+        if owned is not None:
+            owned.discard(bullet_id)
+            if not owned:
+                del self.bullets_by_owner[bullet.owner_id]
+
     def update_bullets(self):
         """Update bullet positions and remove out-of-bounds bullets"""
         current_time = time.time()
@@ -200,21 +431,29 @@ class GameState:
             bullet.y += bullet.vy
 
             # Remove bullets that are out of bounds or too old (5 seconds)
-            if (bullet.x < 0 or bullet.x > CANVAS_WIDTH or
-                bullet.y < 0 or bullet.y > CANVAS_HEIGHT or
+            if (bullet.x < 0 or bullet.x > WORLD_WIDTH or
+                bullet.y < 0 or bullet.y > WORLD_HEIGHT or
                 current_time - bullet.created_at > 5):
                 bullets_to_remove.append(bullet_id)
 
         for bullet_id in bullets_to_remove:
-            del self.bullets[bullet_id]
+            self.remove_bullet(bullet_id)
 
     def check_collisions(self):
-        """Check for bullet-player collisions"""
+        """Check for bullet-player collisions against the players in chunks near each bullet"""
         import math
         hits = []
+        if self.grid.indexed:
+            self.grid.rebuild(self.players.values())
+            nearby_players = self.grid.nearby_players
+        else:
+            # Small world: every bullet is near everyone, scan all players
+            players = list(self.players.values())
+            nearby_players = lambda x, y: players  # noqa: E731
 
         for bullet_id, bullet in list(self.bullets.items()):
-            for player_id, player in self.players.items():
+            for player in nearby_players(bullet.x, bullet.y):
+                player_id = player.id
                 # Don't check collision with bullet owner
                 if bullet.owner_id == player_id:
                     continue
@@ -235,8 +474,7 @@ class GameState:
         # Process hits
         for hit in hits:
             # Remove bullet
-            if hit['bullet_id'] in self.bullets:
-                del self.bullets[hit['bullet_id']]
+            self.remove_bullet(hit['bullet_id'])
 
             # Reset player size to initial value and respawn at random edge position
             player = self.players[hit['player_id']]
@@ -259,170 +497,585 @@ class GameState:
                 player.last_update = current_time
 
     def get_state(self) -> dict:
-        """Get the current game state for broadcasting"""
+        """
+        Get the current game state for broadcasting.
+        Positions, sizes and angles are quantized to fixed-point integers
+        (see POSITION_SCALE and ANGLE_SCALE) to keep frames small.
+        Bullets are not included: clients simulate them from bullet_created events.
+        """
+        return {
+            'players': {pid: player_state(p) for pid, p in self.players.items()}
+        }
+
+    def get_chunked_state(self) -> dict:
+        """The state of get_state() grouped by chunk, so frames can be cut per client view"""
         return {
-            'players': {pid: asdict(p) for pid, p in self.players.items()},
-            'bullets': {bid: asdict(b) for bid, b in self.bullets.items()}
+            chunk: {p.id: player_state(p) for p in players}
+            for chunk, players in self.grid.group(self.players.values()).items()
         }
 
-    async def broadcast(self, message: dict, exclude: Optional[str] = None):
-        """Broadcast a message to all connected clients"""
-        if not self.connections:
+    def view_of(self, player_id: str) -> Optional[View]:
+        """Chunks streamed to a player, None for the whole world"""
+        player = self.players.get(player_id)
+        if player is None:
+            return None
+        return self.grid.view_of(player.x, player.y)
+
+    async def broadcast(self, message: dict, exclude: Optional[str] = None, spectators: bool = True):
+        """
+        Broadcast a message to all connected clients (and spectators unless spectators=False).
+        With a pipeline the message is queued and sent in order by the pipeline task.
+        """
+        if self.pipeline:
+            self.pipeline.submit(Outgoing(message, exclude=exclude, spectators=spectators))
+            return
+        await self.fan_out(json.dumps(message), exclude, spectators)
+
+    async def broadcast_state(self, frame: dict):
+        """Send a state snapshot to players and, at SPECTATOR_FPS, to spectators"""
+        item = Outgoing(frame, spectators=False, snapshot=True)
+        if self.pipeline:
+            self.pipeline.submit(item)
+            return
+        await self.deliver(item, encode_state(frame))
+
+    async def notify_player(self, player_id: str, message: dict):
+        """Send a message to one player, in order with queued broadcasts"""
+        if self.pipeline:
+            self.pipeline.submit(Outgoing(message, target=player_id))
+            return
+        await self.send_to_player(player_id, message)
+
+    async def deliver(self, item: Outgoing, message_str: Union[str, EncodedState, None]):
+        """Send one outgoing message; called by the pipeline task. Snapshots arrive as EncodedState."""
+        if item.target is not None:
+            await self.send_to_player(item.target, item.message)
+            return
+        await self.fan_out(message_str, item.exclude, item.spectators)
+        if item.snapshot:
+            await self.send_spectator_state(item.message, message_str)
+
+    async def fan_out(self, message_str: Union[str, EncodedState], exclude: Optional[str] = None,
+                      spectators: bool = True):
+        """
+        Send an encoded message to all connected clients.
+        A state frame is cut to each player's view; players with the same view share one string.
+        """
+        if not self.connections and not self.backend and not (spectators and self.spectators):
             return
 
-        message_str = json.dumps(message)
         dead_connections = []
 
-        for player_id, ws in self.connections.items():
+        state = message_str if isinstance(message_str, EncodedState) else None
+
+        if self.backend:
+            # Relay nodes do not know player positions, they get the whole world
+            await self.backend.publish_frame(self.sync_room, state.frame() if state else message_str, exclude=exclude)
+
+        for player_id, ws in list(self.connections.items()):
             if exclude and player_id == exclude:
                 continue
+            if state:
+                message_str = self.client_frame(player_id, state)
+
+            conn_stats = self.connection_stats.get(player_id)
+            if conn_stats and conn_stats.write_buffer_size() > WS_MAX_WRITE_BUFFER:
+                logger.warning(f"Dropping {player_id}: {conn_stats.write_buffer_size()} bytes unsent")
+                dead_connections.append(player_id)
+                continue
 
             try:
                 await ws.send_str(message_str)
+                if conn_stats:
+                    conn_stats.messages_out += 1
+                    conn_stats.bytes_out += len(message_str)
             except Exception as e:
                 logger.error(f"Error broadcasting to {player_id}: {e}")
                 dead_connections.append(player_id)
 
         # Clean up dead connections
         for player_id in dead_connections:
-            self.remove_player(player_id)
+            self.drop_connection(player_id)
+
+        if spectators and self.spectators:
+            await self.send_to_spectators(state.frame() if state else message_str)
+
+    def client_frame(self, player_id: str, state: EncodedState) -> str:
+        """A state frame cut to a player's view and, with STATE_BUDGET_BYTES, to its byte budget"""
+        view = self.view_of(player_id)
+        if not STATE_BUDGET_BYTES:
+            return state.frame(view)
+        budget = self.state_budgets.get(player_id)
+        if budget is None:
+            budget = self.state_budgets[player_id] = ClientBudget(STATE_BUDGET_BYTES, CHUNK_SIZE * POSITION_SCALE)
+        return budget.frame(state, view, player_id)
+
+    async def send_spectator_state(self, frame: dict, encoded: EncodedState):
+        """Forward every SPECTATOR_EVERY-th state frame of the whole world to spectators"""
+        self.spectator_hits.extend(frame['hits'])
+        self.frames_since_spectator_frame += 1
+        if self.frames_since_spectator_frame < SPECTATOR_EVERY:
+            return
+
+        if self.spectators:
+            # Encoded once for all spectators; the player frame is reused when nothing was skipped
+            if SPECTATOR_EVERY == 1:
+                spectator_frame = encoded.frame()
+            else:
+                spectator_frame = encoded.with_hits(self.spectator_hits).frame()
+            await self.send_to_spectators(spectator_frame)
+        self.spectator_hits = []
+        self.frames_since_spectator_frame = 0
+
+    async def send_to_spectators(self, message_str: str):
+        """Send an already encoded frame to every spectator"""
+        dead_spectators = []
+
+        for spectator_id, ws in list(self.spectators.items()):
+            conn_stats = self.spectator_stats[spectator_id]
+            if conn_stats.write_buffer_size() > WS_MAX_WRITE_BUFFER:
+                dead_spectators.append(spectator_id)
+                continue
+            try:
+                await ws.send_str(message_str)
+                conn_stats.messages_out += 1
+                conn_stats.bytes_out += len(message_str)
+            except Exception:
+                dead_spectators.append(spectator_id)
+
+        # The spectate handler finishes once the socket is closed
+        for spectator_id in dead_spectators:
+            ws = self.spectators.get(spectator_id)
+            self.remove_spectator(spectator_id)
+            if ws is not None and not ws.closed:
+                asyncio.ensure_future(ws.close())
 
     async def send_to_player(self, player_id: str, message: dict):
         """Send a message to a specific player"""
         if player_id not in self.connections:
+            if self.backend and player_id in self.players:
+                await self.backend.publish_frame(self.sync_room, json.dumps(message), target=player_id)
+                return True
             return False
 
         try:
-            await self.connections[player_id].send_str(json.dumps(message))
+            message_str = json.dumps(message)
+            await self.connections[player_id].send_str(message_str)
+            conn_stats = self.connection_stats.get(player_id)
+            if conn_stats:
+                conn_stats.messages_out += 1
+                conn_stats.bytes_out += len(message_str)
             return True
         except Exception as e:
             logger.error(f"Error sending to {player_id}: {e}")
-            self.remove_player(player_id)
+            self.drop_connection(player_id)
             return False
 
 
 # Global game state
 game = GameState()
-
-
-async def game_loop():
+profiler = LoopProfiler(PROFILE_DIR)
+tick_timer = TickTimer(TICK_BUDGET_MS)
+bots = BotController(game, BOTS, WORLD_WIDTH, WORLD_HEIGHT, PLAYER_SPEED)
+stats: Optional[StatsRecorder] = StatsRecorder(STATS_DB, STATS_FLUSH_SECONDS) if STATS_DB else None
+# Set when this node only relays frames for a room simulated elsewhere
+relay: Optional['FrameRelay'] = None
+# Seconds from process start until the first game loop tick (None while starting)
+startup_seconds: Optional[float] = None
+# index.html, read once at startup
+index_page: Optional[bytes] = None
+
+
+async def game_loop(app: web.Application):
     """Main game loop that updates game state and broadcasts to clients"""
-    # Internal update rate for physics (high precision)
-    UPDATE_FPS = 60
-    # Broadcast rate to clients (optimized for network)
-    BROADCAST_FPS = 20
-
     update_interval = 1 / UPDATE_FPS
     broadcast_interval = 1 / BROADCAST_FPS
     last_broadcast_time = 0
+    # Hits since the last state frame, clients remove the hit bullets
+    pending_hits = []
+    next_tick = time.perf_counter()
 
     while True:
         try:
             current_time = time.time()
+            tick_timer.start()
+
+            # Server-side bots act inside the tick without any networking of their own
+            if bots.fill_to:
+                added, removed = bots.rebalance()
+                for bot_id in added:
+                    await game.broadcast({
+                        'type': 'player_joined',
+                        'player_id': bot_id,
+                        'player': asdict(game.players[bot_id])
+                    })
+                for bot_id in removed:
+                    await game.broadcast({
+                        'type': 'player_left',
+                        'player_id': bot_id
+                    })
+                for bullet in bots.update(current_time):
+                    await game.broadcast(bullet_created_message(bullet))
+                tick_timer.mark('bots')
+
+            # Players that did not come back within the grace period leave for good
+            if game.suspended:
+                router = app.get(WORKER_ROUTER_KEY)
+                for player_id in game.expired_sessions(current_time):
+                    await leave_game(player_id)
+                    if router:
+                        await router.report(-1)
 
             # Always update game physics at high rate for accuracy
+            game.tick += 1
             game.update_bullets()
             game.grow_players()
             hits = game.check_collisions()
+            pending_hits.extend(hits)
+            tick_timer.mark('physics')
+
+            # Stats are only counted in memory here, stats.py writes them off the loop
+            if stats:
+                for hit in hits:
+                    shooter = game.players.get(hit['shooter_id'])
+                    stats.record_hit(
+                        shooter.name if shooter and not bots.is_bot(shooter.id) else None,
+                        None if bots.is_bot(hit['player_id']) else game.players[hit['player_id']]
+                    )
 
             # Send immediate hit notifications to ensure death screen always appears
             # This is sent directly to each hit player to guarantee delivery
             for hit in hits:
-                await game.send_to_player(hit['player_id'], {
+                if bots.is_bot(hit['player_id']):
+                    continue
+                await game.notify_player(hit['player_id'], {
                     'type': 'player_hit',
                     'hit': hit
                 })
+            tick_timer.mark('hits')
 
             # Broadcast to clients at reduced rate for network efficiency
             # This reduces network load and allows better client-side interpolation
             if current_time - last_broadcast_time >= broadcast_interval:
-                state = game.get_state()
-                await game.broadcast({
+                if stats:
+                    stats.observe_sizes(game.players)
+                chunks = game.get_chunked_state()
+                tick_timer.mark('get_state')
+                # The snapshot is never mutated after this point, so the pipeline
+                # can encode and send it while the next ticks run
+                await game.broadcast_state({
                     'type': 'state',
-                    'data': state,
-                    'hits': hits
+                    'tick': game.tick,
+                    'time': server_time_ms(),
+                    'chunks': chunks,
+                    'hits': pending_hits
                 })
+                tick_timer.mark('broadcast')
                 last_broadcast_time = current_time
+                pending_hits = []
+
+            tick_timer.finish()
+            if startup_seconds is None:
+                mark_ready()
 
-            # Run physics updates at 60 FPS, broadcasts at 20 FPS
-            await asyncio.sleep(update_interval)
+            # Run physics updates at 60 FPS, broadcasts at 20 FPS.
+            # Sleep until the next tick is due so the cadence does not drift with tick cost
+            next_tick += update_interval
+            delay = next_tick - time.perf_counter()
+            if delay < -update_interval:
+                # Far behind (e.g. after an error): start over instead of running a burst of ticks
+                next_tick = time.perf_counter()
+            await asyncio.sleep(max(0.0, delay))
 
         except Exception as e:
             logger.error(f"Error in game loop: {e}")
             await asyncio.sleep(1)
 
 
+def process_started_at() -> float:
+    """Wall clock time this process was started (module import time where /proc is unavailable)"""
+    try:
+        with open('/proc/self/stat') as f:
+            # Fields after the command name; starttime is field 22, in clock ticks after boot
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - uptime + start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return IMPORTED_AT
+
+
+def mark_ready():
+    """Record the startup time; /ready reports ready from now on"""
+    global startup_seconds
+    startup_seconds = max(0.0, time.time() - process_started_at())
+    logger.info(f"Ready in {startup_seconds * 1000:.0f} ms after process start")
+
+
+def encode_state(frame: dict) -> EncodedState:
+    """Encode a state snapshot, per player when frames are budgeted per client"""
+    return encode_state_frame(frame, per_player=bool(STATE_BUDGET_BYTES))
+
+
+def merge_state_frames(older: dict, newer: dict) -> dict:
+    """A queued state frame is replaced by a newer one, which must keep the older frame's hits"""
+    return {**newer, 'hits': older['hits'] + newer['hits']}
+
+
+def player_state(p: Player) -> dict:
+    """Quantized state frame entry of one player"""
+    return {
+        'x': round(p.x * POSITION_SCALE),
+        'y': round(p.y * POSITION_SCALE),
+        'angle': round(p.angle * ANGLE_SCALE),
+        'size': round(p.size * POSITION_SCALE),
+        'name': p.name,
+        'color': p.color
+    }
+
+
+def server_time_ms() -> int:
+    """Server wall clock in ms, used by clients to interpolate on server time"""
+    return int(time.time() * 1000)
+
+
+def init_message(player_id: str, player: Player, room: Optional[str] = None) -> dict:
+    """Build the initial message sent to a new player"""
+    return {
+        'type': 'init',
+        'player_id': player_id,
+        'player': asdict(player),
+        'config': {
+            'canvas_width': CANVAS_WIDTH,
+            'canvas_height': CANVAS_HEIGHT,
+            'world_width': WORLD_WIDTH,
+            'world_height': WORLD_HEIGHT,
+            'chunk_size': CHUNK_SIZE,
+            'view_chunks': VIEW_CHUNKS,
+            'player_speed': PLAYER_SPEED,
+            'physics_fps': UPDATE_FPS,
+            'broadcast_fps': BROADCAST_FPS,
+            'position_scale': POSITION_SCALE,
+            'angle_scale': ANGLE_SCALE,
+            'resume_grace': RESUME_GRACE_SECONDS,
+            'room': room
+        },
+        # Reconnect with /ws?resume=<token>&tick=<last state tick> to keep this player
+        'resume_token': game.issue_resume_token(player_id) if RESUME_GRACE_SECONDS else None,
+        # Bullets in flight, clients simulate them locally from here on
+        'tick': game.tick,
+        'time': server_time_ms(),
+        'bullets': {bid: asdict(b) for bid, b in game.bullets.items()}
+    }
+
+
+def resumed_message(player_id: str, player: Player, since_tick: int) -> dict:
+    """
+    Reply to a resumed session: only what the client cannot get from the next
+    state frame. Bullets spawned after since_tick are sent in full, the ones it
+    already knows only by id (so it can drop those that were removed meanwhile).
+    """
+    return {
+        'type': 'resumed',
+        'player_id': player_id,
+        'player': asdict(player),
+        'resume_token': game.issue_resume_token(player_id),
+        'since_tick': since_tick,
+        'tick': game.tick,
+        'time': server_time_ms(),
+        'bullets': {bid: asdict(b) for bid, b in game.bullets.items() if b.spawn_tick > since_tick},
+        'bullet_ids': list(game.bullets)
+    }
+
+
+def spectate_message(room: Optional[str] = None) -> dict:
+    """Build the initial message for a spectator: config plus a full snapshot"""
+    return {
+        'type': 'spectate_init',
+        'config': {
+            'canvas_width': CANVAS_WIDTH,
+            'canvas_height': CANVAS_HEIGHT,
+            'world_width': WORLD_WIDTH,
+            'world_height': WORLD_HEIGHT,
+            'chunk_size': CHUNK_SIZE,
+            'view_chunks': VIEW_CHUNKS,
+            'player_speed': PLAYER_SPEED,
+            'physics_fps': UPDATE_FPS,
+            'broadcast_fps': BROADCAST_FPS / SPECTATOR_EVERY,
+            'position_scale': POSITION_SCALE,
+            'angle_scale': ANGLE_SCALE,
+            'room': room
+        },
+        'tick': game.tick,
+        'time': server_time_ms(),
+        'data': game.get_state(),
+        'bullets': {bid: asdict(b) for bid, b in game.bullets.items()}
+    }
+
+
+def bullet_created_message(bullet: Bullet) -> dict:
+    """
+    Spawn event for a bullet. Bullets move in a straight line at constant
+    velocity, so clients extrapolate x + vx * (tick - spawn tick) locally
+    and state frames do not carry bullet positions.
+    """
+    return {
+        'type': 'bullet_created',
+        'bullet': asdict(bullet),
+        'tick': game.tick
+    }
+
+
+async def join_game(player_id: str, ws: Optional[web.WebSocketResponse], reply, room: Optional[str] = None,
+                    transport: Optional[asyncio.BaseTransport] = None) -> bool:
+    """
+    Add a player, send them the initial state and announce them to others.
+    reply(message) sends a message to the joining player only.
+    Returns False if the player could not join.
+    """
+    # A full room gives up a bot for the human
+    bot_id = bots.make_room(MAX_SESSIONS)
+    if bot_id:
+        await game.broadcast({
+            'type': 'player_left',
+            'player_id': bot_id
+        })
+
+    try:
+        player = game.add_player(player_id, ws, transport)
+    except ValueError as e:
+        await reply({'type': 'error', 'message': str(e)})
+        return False
+
+    if stats:
+        stats.start_life(player_id, player.size)
+
+    # Send initial state to new player
+    await reply(init_message(player_id, player, room))
+
+    # Broadcast new player to others
+    await game.broadcast({
+        'type': 'player_joined',
+        'player_id': player_id,
+        'player': asdict(player)
+    }, exclude=player_id)
+    return True
+
+
+async def leave_game(player_id: str):
+    """Remove a player and announce it to others"""
+    player = game.players.get(player_id)
+    if stats and player:
+        stats.end_life(player_id, player.name)
+    game.remove_player(player_id)
+    await game.broadcast({
+        'type': 'player_left',
+        'player_id': player_id
+    })
+
+
+async def handle_client_message(player_id: str, data: dict, reply):
+    """Apply a message from a player. reply(message) sends a message to that player only."""
+    msg_type = data.get('type')
+
+    if msg_type == 'update':
+        game.update_player(player_id, data.get('data', {}))
+
+    elif msg_type == 'shoot':
+        bullet = game.create_bullet(player_id)
+        if bullet:
+            await game.broadcast(bullet_created_message(bullet))
+
+    elif msg_type == 'change_name':
+        new_name = data.get('name', '')
+        if game.update_player_name(player_id, new_name):
+            # Broadcast name change to all players
+            await game.broadcast({
+                'type': 'player_name_changed',
+                'player_id': player_id,
+                'name': new_name
+            })
+        else:
+            await reply({
+                'type': 'error',
+                'message': 'Invalid name'
+            })
+
+
+async def remote_input_handler(player_id: str, message: dict):
+    """Apply input forwarded by a relay node for a player connected there"""
+    async def reply(response: dict):
+        await game.backend.publish_frame(game.sync_room, json.dumps(response), target=player_id)
+
+    msg_type = message.get('type')
+    if msg_type == 'join':
+        await join_game(player_id, None, reply, game.sync_room)
+    elif msg_type == 'leave':
+        if player_id in game.players:
+            await leave_game(player_id)
+    else:
+        await handle_client_message(player_id, message, reply)
+
+
+async def relay_websocket_handler(ws: web.WebSocketResponse, player_id: str):
+    """Hold a client socket for a room simulated on another node"""
+    await relay.attach(player_id, ws)
+    try:
+        async for msg in ws:
+            if msg.type == aiohttp.WSMsgType.TEXT:
+                try:
+                    await relay.forward(player_id, json.loads(msg.data))
+                except json.JSONDecodeError:
+                    logger.error(f"Invalid JSON from {player_id}")
+    finally:
+        await relay.detach(player_id)
+
+
 async def websocket_handler(request):
     """Handle WebSocket connections from clients"""
-    ws = web.WebSocketResponse()
+    ws = web.WebSocketResponse(max_msg_size=WS_MAX_MESSAGE_SIZE)
     await ws.prepare(request)
 
-    player_id = None
+    # Generate unique player ID
+    player_id = f"player_{int(time.time() * 1000)}_{random.randint(1000, 9999)}"
 
-    try:
-        # Generate unique player ID
-        player_id = f"player_{int(time.time() * 1000)}_{random.randint(1000, 9999)}"
+    if relay:
+        await relay_websocket_handler(ws, player_id)
+        return ws
 
-        # Add player to game
-        try:
-            player = game.add_player(player_id, ws)
-        except ValueError as e:
-            await ws.send_json({'type': 'error', 'message': str(e)})
+    # The launcher counted this connection in the room when routing it
+    router = request.app.get(WORKER_ROUTER_KEY)
+
+    try:
+        # Reattach to a dropped session if the client has a valid token, otherwise join as a new player.
+        # Nothing is broadcast on resume: for the others the player never left
+        resumed = None
+        if RESUME_GRACE_SECONDS and request.query.get('resume'):
+            try:
+                since_tick = int(request.query.get('tick', 0))
+            except ValueError:
+                since_tick = 0
+            resumed = game.resume_player(request.query['resume'], ws, request.transport)
+        if resumed:
+            # Owned by this handler before anything is awaited, so if the new socket
+            # fails too the cleanup below suspends the player again
+            player_id = resumed.id
+            if router:
+                # The suspended player kept its slot, release the one reserved for this connection
+                await router.report(-1)
+            await ws.send_json(resumed_message(player_id, resumed, since_tick))
+        elif not await join_game(player_id, ws, ws.send_json, router.room if router else None, request.transport):
             await ws.close()
             return ws
-
-        # Send initial state to new player
-        await ws.send_json({
-            'type': 'init',
-            'player_id': player_id,
-            'player': asdict(player),
-            'config': {
-                'canvas_width': CANVAS_WIDTH,
-                'canvas_height': CANVAS_HEIGHT,
-                'player_speed': PLAYER_SPEED
-            }
-        })
-
-        # Broadcast new player to others
-        await game.broadcast({
-            'type': 'player_joined',
-            'player_id': player_id,
-            'player': asdict(player)
-        }, exclude=player_id)
+        conn_stats = game.connection_stats[player_id]
 
         # Handle incoming messages
         async for msg in ws:
             if msg.type == aiohttp.WSMsgType.TEXT:
+                conn_stats.messages_in += 1
+                conn_stats.bytes_in += len(msg.data)
                 try:
-                    data = json.loads(msg.data)
-                    msg_type = data.get('type')
-
-                    if msg_type == 'update':
-                        game.update_player(player_id, data.get('data', {}))
-
-                    elif msg_type == 'shoot':
-                        bullet = game.create_bullet(player_id)
-                        if bullet:
-                            await game.broadcast({
-                                'type': 'bullet_created',
-                                'bullet': asdict(bullet)
-                            })
-
-                    elif msg_type == 'change_name':
-                        new_name = data.get('name', '')
-                        if game.update_player_name(player_id, new_name):
-                            # Broadcast name change to all players
-                            await game.broadcast({
-                                'type': 'player_name_changed',
-                                'player_id': player_id,
-                                'name': new_name
-                            })
-                        else:
-                            await ws.send_json({
-                                'type': 'error',
-                                'message': 'Invalid name'
-                            })
-
+                    await handle_client_message(player_id, json.loads(msg.data), ws.send_json)
                 except json.JSONDecodeError:
                     logger.error(f"Invalid JSON from {player_id}")
 
@@ -430,22 +1083,172 @@ async def websocket_handler(request):
                 logger.error(f"WebSocket error from {player_id}: {ws.exception()}")
 
     finally:
-        # Clean up when player disconnects
-        if player_id:
-            game.remove_player(player_id)
-            await game.broadcast({
-                'type': 'player_left',
-                'player_id': player_id
-            })
+        # Clean up when player disconnects. Unless the client closed the socket on purpose,
+        # keep the player for RESUME_GRACE_SECONDS (the server drops slow sockets by removing
+        # them from game.connections first, those may resume too)
+        current = game.connections.get(player_id)
+        if current is not None and current is not ws:
+            pass  # Resumed on a newer connection
+        elif RESUME_GRACE_SECONDS and player_id in game.players and (
+                current is None or ws.close_code not in CLEAN_CLOSE_CODES):
+            game.suspend_player(player_id, RESUME_GRACE_SECONDS)
+        else:
+            await leave_game(player_id)
+            # Only a real leave (or a refused join) frees the slot, a suspended player keeps it
+            # until it resumes or expires in game_loop
+            if router:
+                await router.report(-1)
+
+    return ws
+
+
+async def spectate_handler(request):
+    """Read-only WebSocket stream of the room. Spectators get the same encoded frames as players."""
+    if relay:
+        return web.json_response({'error': 'Spectating is served by the simulating node'}, status=503)
+
+    # No compression: it would cost a deflate per spectator and frame
+    ws = web.WebSocketResponse(max_msg_size=1024, compress=False)
+    await ws.prepare(request)
+
+    spectator_id = f"spectator_{int(time.time() * 1000)}_{random.randint(1000, 9999)}"
+    router = request.app.get(WORKER_ROUTER_KEY)
+
+    try:
+        game.add_spectator(spectator_id, ws, request.transport)
+    except ValueError as e:
+        await ws.send_json({'type': 'error', 'message': str(e)})
+        await ws.close()
+        return ws
+
+    try:
+        await ws.send_json(spectate_message(router.room if router else None))
+        # Spectators are read-only, anything they send is ignored
+        async for msg in ws:
+            pass
+    finally:
+        game.remove_spectator(spectator_id)
 
     return ws
 
 
 async def index_handler(request):
-    """Serve the main game page"""
-    static_dir = os.path.join(os.path.dirname(__file__), '..', 'static')
-    index_path = os.path.join(static_dir, 'index.html')
-    return web.FileResponse(index_path)
+    """Serve the main game page from memory"""
+    if index_page is None:
+        return web.FileResponse(os.path.join(STATIC_DIR, 'index.html'))
+    return web.Response(body=index_page, content_type='text/html')
+
+
+async def ready_handler(request):
+    """Readiness probe: 200 once the game loop is ticking (or the relay is connected), 503 before"""
+    if startup_seconds is None:
+        return web.json_response({'status': 'starting'}, status=503)
+    return web.json_response({'status': 'ready', 'startup_ms': round(startup_seconds * 1000)})
+
+
+async def leaderboard_handler(request):
+    """Top players by kills (or ?order=deaths|time_alive|max_size), cached between stats flushes"""
+    if stats is None:
+        return web.json_response({'error': 'Stats are disabled'}, status=404)
+
+    order = request.query.get('order', 'kills')
+    if order not in LEADERBOARD_ORDERS:
+        return web.json_response({'error': f"Unknown order: {order}", 'orders': LEADERBOARD_ORDERS}, status=400)
+    try:
+        limit = max(1, min(int(request.query.get('limit', 10)), 100))
+    except ValueError:
+        return web.json_response({'error': 'Invalid limit'}, status=400)
+
+    return web.json_response({'order': order, 'leaderboard': await stats.leaderboard(order, limit)})
+
+
+def is_admin_request(request) -> bool:
+    """Check the admin token passed as a query parameter"""
+    return bool(ADMIN_TOKEN) and request.query.get('token') == ADMIN_TOKEN
+
+
+async def profile_handler(request):
+    """Start a profiling capture of the event loop (admin only)"""
+    if not is_admin_request(request):
+        return web.json_response({'error': 'Forbidden'}, status=403)
+
+    try:
+        seconds = min(float(request.query.get('seconds', 10)), 300)
+        mode = request.query.get('mode', PROFILE_MODE)
+        path = profiler.start(seconds, mode)
+    except (ValueError, RuntimeError) as e:
+        return web.json_response({'error': str(e), 'modes': PROFILE_MODES}, status=400)
+
+    return web.json_response({'status': 'started', 'seconds': seconds, 'mode': mode, 'output': path})
+
+
+def process_rss_bytes() -> int:
+    """Current resident set size of this process (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+async def debug_handler(request):
+    """Report memory, object counts and per-connection accounting (admin only)"""
+    if not is_admin_request(request):
+        return web.json_response({'error': 'Forbidden'}, status=403)
+
+    # ?name= lists only the connections of players using that name
+    listed = game.connection_stats.items()
+    if request.query.get('name'):
+        listed = [(p.id, game.connection_stats[p.id]) for p in game.find_players_by_name(request.query['name'])
+                  if p.id in game.connection_stats]
+
+    now = time.time()
+    connections = {
+        player_id: {
+            'connected_seconds': round(now - conn_stats.connected_at, 1),
+            'messages_in': conn_stats.messages_in,
+            'bytes_in': conn_stats.bytes_in,
+            'messages_out': conn_stats.messages_out,
+            'bytes_out': conn_stats.bytes_out,
+            'write_buffer_bytes': conn_stats.write_buffer_size(),
+            'owned_bullets': len(game.bullets_by_owner.get(player_id, ())),
+        }
+        for player_id, conn_stats in listed
+    }
+
+    return web.json_response({
+        'process': {
+            'rss_bytes': process_rss_bytes(),
+            'gc_objects': len(gc.get_objects()),
+            'gc_counts': gc.get_count(),
+        },
+        'objects': {
+            'players': len(game.players),
+            'bots': len(bots.brains),
+            'connections': len(game.connections),
+            'connection_stats': len(game.connection_stats),
+            'spectators': len(game.spectators),
+            'suspended': len(game.suspended),
+            'bullets': len(game.bullets),
+            'bullet_owners': len(game.bullets_by_owner),
+            'occupied_chunks': len(game.grid.group(game.players.values())),
+        },
+        'lifecycle': {
+            'opened': game.connections_opened,
+            'closed': game.connections_closed,
+        },
+        'startup_ms': round(startup_seconds * 1000) if startup_seconds is not None else None,
+        'profiling': {
+            'active': profiler.active,
+            'last_output': profiler.last_output,
+            'slow_ticks': tick_timer.slow_ticks,
+            'last_tick_ms': round(tick_timer.last_ms, 3),
+            'last_tick_phases_ms': {name: round(ms, 3) for name, ms in tick_timer.breakdown().items()},
+        },
+        'pipeline': game.pipeline.stats() if game.pipeline else None,
+        'connections': connections,
+    })
 
 
 async def init_app():
@@ -454,25 +1257,121 @@ async def init_app():
 
     # Routes
     app.router.add_get('/', index_handler)
+    app.router.add_get('/ready', ready_handler)
     app.router.add_get('/ws', websocket_handler)
-
-    # Static files
-    static_dir = os.path.join(os.path.dirname(__file__), '..', 'static')
-    app.router.add_static('/static/', static_dir, name='static')
+    app.router.add_get('/spectate', spectate_handler)
+    app.router.add_get('/leaderboard', leaderboard_handler)
+    app.router.add_get('/admin/profile', profile_handler)
+    app.router.add_get('/admin/debug', debug_handler)
+
+    # Static files; the index page is served from memory
+    app.router.add_static('/static/', STATIC_DIR, name='static')
+    global index_page
+    try:
+        with open(os.path.join(STATIC_DIR, 'index.html'), 'rb') as f:
+            index_page = f.read()
+    except OSError as e:
+        logger.warning(f"Serving index.html from disk: {e}")
+
+    backend = None
+    if SYNC_BACKEND:
+        from sync_backend import FrameRelay, create_backend
+        backend = create_backend(SYNC_BACKEND, SYNC_BROKER_PATH, SYNC_ROLE)
+    if backend:
+        await backend.connect()
+
+    if backend and SYNC_ROLE == 'relay':
+        # Relay nodes hold client sockets only, the room is simulated elsewhere
+        global relay
+        relay = FrameRelay(backend, SYNC_ROOM)
+        logger.info(f"Relaying room {SYNC_ROOM}")
+        mark_ready()
+        return app
+
+    if backend:
+        game.backend = backend
+        game.sync_room = SYNC_ROOM
+        await backend.subscribe_inputs(SYNC_ROOM, remote_input_handler)
+        logger.info(f"Simulating room {SYNC_ROOM}")
+
+    if BROADCAST_PIPELINE:
+        game.pipeline = BroadcastPipeline(game.deliver, merge_state_frames, encode_state)
+        game.pipeline.start()
+
+        async def stop_pipeline(app):
+            await game.pipeline.stop()
+        app.on_cleanup.append(stop_pipeline)
 
     # Start game loop
-    asyncio.create_task(game_loop())
+    asyncio.create_task(game_loop(app))
+
+    if stats:
+        stats.start()
+
+        async def close_stats(app):
+            await stats.close()
+        app.on_cleanup.append(close_stats)
+
+    if PROFILE_SECONDS > 0:
+        profiler.start(PROFILE_SECONDS, PROFILE_MODE)
 
     return app
 
 
+def create_event_loop() -> asyncio.AbstractEventLoop:
+    """Create a uvloop event loop when available, falling back to the default asyncio loop"""
+    try:
+        import uvloop
+    except ImportError:
+        logger.warning("uvloop is not installed, using the default asyncio event loop")
+        return asyncio.new_event_loop()
+
+    logger.info("Using uvloop event loop")
+    return uvloop.new_event_loop()
+
+
+def create_listen_socket(host: str, port: int, reuse_port: bool = REUSE_PORT) -> socket.socket:
+    """Create a listening socket tuned for low-latency broadcast"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+
+    # Accepted connections inherit these options from the listening socket on Linux
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    if SOCKET_SNDBUF:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_SNDBUF)
+
+    sock.bind((host, port))
+    sock.setblocking(False)
+    return sock
+
+
 def main():
     """Main entry point"""
     logger.info("Starting game server...")
     port = int(os.environ.get('PORT', 8080))
     logger.info(f"Server will listen on port {port}")
+    workers = worker_count(WORKERS)
+    if workers > 1:
+        logger.info(f"Starting {workers} workers")
+        run_workers(
+            workers,
+            room_capacity=MAX_SESSIONS,
+            app_factory=init_app,
+            socket_factory=lambda: create_listen_socket('0.0.0.0', port, reuse_port=True),
+            loop_factory=create_event_loop if TUNED_STARTUP else asyncio.new_event_loop
+        )
+        return
+
     app = init_app()
-    web.run_app(app, host='0.0.0.0', port=port)
+
+    if TUNED_STARTUP:
+        loop = create_event_loop()
+        sock = create_listen_socket('0.0.0.0', port)
+        web.run_app(app, sock=sock, backlog=SOCKET_BACKLOG, loop=loop)
+    else:
+        web.run_app(app, host='0.0.0.0', port=port, reuse_port=REUSE_PORT or None)
 
 
 if __name__ == '__main__':
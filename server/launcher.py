@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Multi-worker launcher for the game server.
+
+The launcher forks one worker process per core. Every worker binds the same
+port with SO_REUSEPORT and owns one room (its own GameState). The parent
+process runs a small coordinator on a Unix-domain socket that knows how many
+players each room has.
+
+The kernel hands each TCP connection to an arbitrary worker, so a worker
+peeks at the HTTP request line of every /ws and /spectate connection and asks the
+coordinator which worker owns the requested room (or which room a player
+without a preference should join). If another worker owns it, the raw
+socket and the buffered request bytes are passed to that worker over a
+Unix datagram socket (SCM_RIGHTS) and the owner serves the connection as
+if it had accepted it itself. No Redis or other outside service is needed.
+"""
+
+import array
+import asyncio
+import json
+import logging
+import os
+import signal
+import socket
+import tempfile
+from typing import Callable, Dict, List, Optional, Set
+from urllib.parse import parse_qs, urlsplit
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+MAX_REQUEST_HEAD = 8192  # Larger request heads are served locally without routing (they do not fit a handoff datagram)
+
+
+def worker_count(value: str) -> int:
+    """Parse the WORKERS setting ('auto' = one per core)"""
+    if value == 'auto':
+        return os.cpu_count() or 1
+    return max(1, int(value))
+
+
+class Coordinator:
+    """
+    Runs in the parent process and tracks rooms.
+    Each worker owns exactly one room, named after its index.
+    """
+
+    def __init__(self, num_workers: int, room_capacity: int):
+        self.room_capacity = room_capacity
+        self.players: Dict[str, int] = {str(i): 0 for i in range(num_workers)}
+        self._clients: Set[asyncio.StreamWriter] = set()
+
+    def route(self, room: Optional[str], reserve: bool = False) -> str:
+        """
+        Pick the room for a joining player. With reserve the player is counted
+        right away, so concurrent joins see each other; the worker reports -1
+        when the player leaves or fails to join.
+        """
+        if room not in self.players:
+            # Matchmaking: fill the busiest room that still has space so rooms stay populated
+            open_rooms = [r for r, count in self.players.items() if count < self.room_capacity]
+            if open_rooms:
+                room = max(open_rooms, key=lambda r: self.players[r])
+            else:
+                room = min(self.players, key=lambda r: self.players[r])
+        if reserve:
+            self.players[room] += 1
+        return room
+
+    def handle(self, request: dict) -> dict:
+        op = request.get('op')
+        if op == 'route':
+            return {'room': self.route(request.get('room'), request.get('reserve', False))}
+        if op == 'count':
+            room = request['room']
+            self.players[room] = max(0, self.players.get(room, 0) + request['delta'])
+            return {'room': room, 'players': self.players[room]}
+        if op == 'rooms':
+            return {'rooms': dict(self.players)}
+        return {'error': f"Unknown op: {op}"}
+
+    async def serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._clients.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                writer.write(json.dumps(self.handle(json.loads(line))).encode() + b'\n')
+                await writer.drain()
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    async def serve(self, path: str, stop: asyncio.Event):
+        """Serve worker requests on a Unix socket until stop is set"""
+        server = await asyncio.start_unix_server(self.serve_client, path=path)
+        logger.info(f"Coordinator listening on {path}")
+        async with server:
+            await stop.wait()
+            # Close worker connections so their handlers finish before the loop shuts down
+            for writer in list(self._clients):
+                writer.close()
+            while self._clients:
+                await asyncio.sleep(0.01)
+
+
+class WorkerRouter:
+    """Worker-side connection to the coordinator and to the other workers"""
+
+    def __init__(self, worker_index: int, runtime_dir: str):
+        self.worker_index = worker_index
+        self.room = str(worker_index)
+        self.runtime_dir = runtime_dir
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+        self._handoff_sock: Optional[socket.socket] = None
+
+    @staticmethod
+    def coordinator_path(runtime_dir: str) -> str:
+        return os.path.join(runtime_dir, 'coordinator.sock')
+
+    @staticmethod
+    def handoff_path(runtime_dir: str, worker_index: int) -> str:
+        return os.path.join(runtime_dir, f"worker-{worker_index}.sock")
+
+    async def connect(self):
+        path = self.coordinator_path(self.runtime_dir)
+        for _ in range(50):
+            try:
+                self._reader, self._writer = await asyncio.open_unix_connection(path)
+                return
+            except (FileNotFoundError, ConnectionRefusedError):
+                await asyncio.sleep(0.1)
+        raise RuntimeError(f"Coordinator is not reachable at {path}")
+
+    async def request(self, message: dict) -> dict:
+        async with self._lock:
+            self._writer.write(json.dumps(message).encode() + b'\n')
+            await self._writer.drain()
+            return json.loads(await self._reader.readline())
+
+    async def route(self, room: Optional[str], reserve: bool = False) -> str:
+        """Ask the coordinator which room a joining player belongs to (and count them there with reserve)"""
+        return (await self.request({'op': 'route', 'room': room, 'reserve': reserve}))['room']
+
+    async def report(self, delta: int, room: Optional[str] = None):
+        """Report players joining (+1) or leaving (-1) a room, this worker's room by default"""
+        await self.request({'op': 'count', 'room': room or self.room, 'delta': delta})
+
+    def start_handoff_receiver(self, accept: Callable[[socket.socket, bytes], None]):
+        """Receive connections passed by other workers and hand them to accept()"""
+        path = self.handoff_path(self.runtime_dir, self.worker_index)
+        if os.path.exists(path):
+            os.unlink(path)
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(path)
+        sock.setblocking(False)
+        self._handoff_sock = sock
+
+        def on_readable():
+            while True:
+                try:
+                    data, fds, flags, _ = socket.recv_fds(sock, MAX_REQUEST_HEAD, 1)
+                except BlockingIOError:
+                    return
+                if flags & socket.MSG_TRUNC:
+                    # Senders never pass heads this large, drop rather than serve a partial request
+                    logger.error("Dropped a handed off connection with a truncated request head")
+                    for fd in fds:
+                        os.close(fd)
+                    continue
+                for fd in fds:
+                    accept(socket.socket(fileno=fd), data)
+
+        asyncio.get_running_loop().add_reader(sock.fileno(), on_readable)
+
+    def handoff(self, conn: socket.socket, buffered: bytes, worker_index: int) -> bool:
+        """Pass an accepted connection to another worker. Returns False if it could not be sent."""
+        path = self.handoff_path(self.runtime_dir, worker_index)
+        try:
+            fds = array.array('i', [conn.fileno()])
+            self._handoff_sock.sendmsg([buffered], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, fds)], 0, path)
+            return True
+        except OSError as e:
+            logger.error(f"Handoff to worker {worker_index} failed: {e}")
+            return False
+
+
+# Application key under which a worker's router is stored
+WORKER_ROUTER_KEY = web.AppKey('worker_router', WorkerRouter)
+
+
+class RoutingProtocol(asyncio.Protocol):
+    """
+    Buffers the HTTP request head of a new connection, routes /ws and /spectate requests
+    to the worker that owns the room and otherwise hands the connection to
+    the local aiohttp request handler.
+    """
+
+    def __init__(self, server_factory: Callable[[], asyncio.Protocol], router: WorkerRouter):
+        self.server_factory = server_factory
+        self.router = router
+        self.transport: Optional[asyncio.Transport] = None
+        self.buffer = b''
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data: bytes):
+        self.buffer += data
+        if b'\r\n\r\n' in self.buffer or len(self.buffer) > MAX_REQUEST_HEAD:
+            self.transport.pause_reading()
+            asyncio.ensure_future(self.dispatch())
+
+    def connection_lost(self, exc):
+        self.transport = None
+
+    async def dispatch(self):
+        request_line = self.buffer.split(b'\r\n', 1)[0].decode('latin-1')
+        parts = request_line.split(' ')
+        url = urlsplit(parts[1] if len(parts) > 1 else '/')
+
+        if url.path in ('/ws', '/spectate'):
+            requested = parse_qs(url.query).get('room', [None])[0]
+            # Players are counted when routed, the websocket handler releases the count on leave
+            reserve = url.path == '/ws'
+            try:
+                if len(self.buffer) > MAX_REQUEST_HEAD:
+                    # Too large for a handoff datagram, served by this worker
+                    room = self.router.room
+                    if reserve:
+                        await self.router.report(1)
+                else:
+                    room = await self.router.route(requested, reserve)
+            except (OSError, ValueError) as e:
+                logger.error(f"Room routing failed, serving locally: {e}")
+                room, reserve = self.router.room, False
+
+            if self.transport is None:
+                if reserve:
+                    await self.router.report(-1, room)
+                return
+            if room != self.router.room:
+                conn = self.transport.get_extra_info('socket')
+                if self.router.handoff(conn, self.buffer, int(room)):
+                    # The other worker holds its own reference to the socket now,
+                    # closing ours does not end the connection
+                    self.transport.abort()
+                    return
+                if reserve:
+                    # Served here after all, move the reservation
+                    await self.router.report(-1, room)
+                    await self.router.report(1)
+
+        if self.transport is None:
+            return
+        protocol = self.server_factory()
+        self.transport.set_protocol(protocol)
+        protocol.connection_made(self.transport)
+        protocol.data_received(self.buffer)
+        self.transport.resume_reading()
+
+
+async def serve_worker(worker_index: int, runtime_dir: str, sock: socket.socket, app_factory):
+    """Run one worker: the aiohttp app behind the routing protocol"""
+    router = WorkerRouter(worker_index, runtime_dir)
+    await router.connect()
+
+    app = await app_factory()
+    app[WORKER_ROUTER_KEY] = router
+    runner = web.AppRunner(app)
+    await runner.setup()
+    loop = asyncio.get_running_loop()
+
+    def accept_handoff(conn: socket.socket, buffered: bytes):
+        async def attach():
+            conn.setblocking(False)
+            _, protocol = await loop.connect_accepted_socket(runner.server, conn)
+            protocol.data_received(buffered)
+        asyncio.ensure_future(attach())
+
+    router.start_handoff_receiver(accept_handoff)
+    server = await loop.create_server(lambda: RoutingProtocol(runner.server, router), sock=sock)
+    logger.info(f"Worker {worker_index} (pid {os.getpid()}) serving room {router.room}")
+
+    stop = asyncio.Event()
+    loop.add_signal_handler(signal.SIGTERM, stop.set)
+    loop.add_signal_handler(signal.SIGINT, stop.set)
+    await stop.wait()
+
+    server.close()
+    await runner.cleanup()
+
+
+def run_workers(num_workers: int, room_capacity: int, app_factory, socket_factory, loop_factory):
+    """
+    Fork num_workers workers sharing the port and run the coordinator in this process.
+    socket_factory() must return a SO_REUSEPORT listening socket.
+    """
+    runtime_dir = tempfile.mkdtemp(prefix='llm_game_')
+    children: List[int] = []
+
+    for worker_index in range(num_workers):
+        pid = os.fork()
+        if pid == 0:
+            loop = loop_factory()
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(serve_worker(worker_index, runtime_dir, socket_factory(), app_factory))
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    logger.info(f"Started {num_workers} workers: {children}")
+    coordinator = Coordinator(num_workers, room_capacity)
+
+    async def coordinate():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGTERM, stop.set)
+        loop.add_signal_handler(signal.SIGINT, stop.set)
+        await coordinator.serve(WorkerRouter.coordinator_path(runtime_dir), stop)
+
+    try:
+        asyncio.run(coordinate())
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in children:
+            os.waitpid(pid, 0)
+        for name in os.listdir(runtime_dir):
+            os.unlink(os.path.join(runtime_dir, name))
+        os.rmdir(runtime_dir)
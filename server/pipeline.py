@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Outbound message pipeline for the game loop.
+
+The game loop only builds messages (state snapshots are fresh dicts that
+are never mutated afterwards) and submits them here. A background task
+encodes them and fans them out, so socket writes overlap with the next
+simulation steps instead of delaying them:
+
+    tick N:   simulate -> snapshot -> submit
+    tick N+1: simulate ...              | encode N (worker thread) -> send N
+
+Snapshots are encoded with encode_snapshot (json.dumps unless the caller
+passes its own encoder). Messages are delivered in submission order. A state snapshot that is
+still queued when a newer one arrives is replaced by it, wherever it sits in
+the queue; merge() carries over whatever the dropped snapshot must not lose
+(the hits). So at most one snapshot is ever queued, and when the queue holds
+max_queued messages the oldest other message is dropped: a fan-out that
+cannot keep up loses events instead of growing the queue without limit.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_QUEUED = 1000  # Messages waiting for the pipeline task
+
+
+@dataclass(eq=False)
+class Outgoing:
+    """A queued message and who receives it"""
+    message: dict
+    exclude: Optional[str] = None
+    target: Optional[str] = None  # Send to one player only
+    spectators: bool = True
+    snapshot: bool = False  # Replaced by a newer snapshot while still queued
+
+
+class BroadcastPipeline:
+    """Encodes and delivers queued messages in a background task"""
+
+    def __init__(self, deliver: Callable[[Outgoing, Any], Awaitable[None]],
+                 merge: Optional[Callable[[dict, dict], dict]] = None,
+                 encode_snapshot: Callable[[dict], Any] = json.dumps, max_queued: int = MAX_QUEUED):
+        self.deliver = deliver
+        self.merge = merge
+        self.encode_snapshot = encode_snapshot
+        self.max_queued = max_queued
+        self.queue: Deque[Outgoing] = deque()
+        self._queued_snapshot: Optional[Outgoing] = None
+        self._wakeup = asyncio.Event()
+        # Snapshots are encoded off the event loop thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='encode')
+        self._task: Optional[asyncio.Task] = None
+        self.delivered = 0
+        self.replaced = 0
+        self.dropped = 0
+        self.last_delivery_ms = 0.0
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancel the pipeline task and shut the encoder thread down; queued messages are discarded"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._executor.shutdown(wait=False)
+
+    def submit(self, item: Outgoing):
+        """Queue a message; never blocks the caller"""
+        if item.snapshot:
+            older = self._queued_snapshot
+            if older is not None:
+                self.queue.remove(older)
+                if self.merge:
+                    item.message = self.merge(older.message, item.message)
+                self.replaced += 1
+            self._queued_snapshot = item
+        elif len(self.queue) >= self.max_queued:
+            # Drop the oldest message other than the snapshot, which is replaced by the next one anyway
+            oldest = 1 if self.queue[0] is self._queued_snapshot else 0
+            if oldest < len(self.queue):
+                del self.queue[oldest]
+                self.dropped += 1
+                if self.dropped % MAX_QUEUED == 1:
+                    logger.warning(f"Broadcast queue full, {self.dropped} messages dropped so far")
+        self.queue.append(item)
+        self._wakeup.set()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            while self.queue:
+                item = self.queue.popleft()
+                if item is self._queued_snapshot:
+                    self._queued_snapshot = None
+                started = time.perf_counter()
+                try:
+                    if item.target is not None:
+                        message_str = None
+                    elif item.snapshot:
+                        message_str = await loop.run_in_executor(self._executor, self.encode_snapshot, item.message)
+                    else:
+                        message_str = json.dumps(item.message)
+                    await self.deliver(item, message_str)
+                except Exception as e:
+                    logger.error(f"Error delivering {item.message.get('type')}: {e}")
+                self.delivered += 1
+                self.last_delivery_ms = (time.perf_counter() - started) * 1000
+
+    def stats(self) -> dict:
+        return {
+            'queued': len(self.queue),
+            'delivered': self.delivered,
+            'replaced_snapshots': self.replaced,
+            'dropped': self.dropped,
+            'last_delivery_ms': round(self.last_delivery_ms, 3),
+        }
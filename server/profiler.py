@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Opt-in profiling helpers for the game server.
+
+Two capture modes are supported:
+- 'cprofile': deterministic cProfile run written as a .pstats file
+- 'sample': low-overhead stack sampler written as collapsed stacks
+  (one "frame;frame;frame count" line per stack, ready for flamegraph.pl
+  or speedscope)
+
+Both modes profile the event loop thread, so game_loop, websocket_handler
+and broadcast activity are all captured together.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import logging
+from collections import Counter
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ('cprofile', 'sample')
+
+
+class StackSampler:
+    """Samples the stack of one thread at a fixed interval from a helper thread"""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start sampling in a daemon thread"""
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and wait for the sampler thread to exit"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+
+            self.stacks[';'.join(reversed(stack))] += 1
+
+    def write_collapsed(self, path: str):
+        """Write samples in collapsed-stack format"""
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class LoopProfiler:
+    """Records N seconds of event loop activity and writes the result to disk"""
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.active = False
+        self.last_output: Optional[str] = None
+
+    def start(self, seconds: float, mode: str = 'sample') -> str:
+        """
+        Begin a capture on the current (event loop) thread.
+        Returns the path the result will be written to.
+        """
+        if self.active:
+            raise RuntimeError("Profiling is already running")
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        ext = 'pstats' if mode == 'cprofile' else 'collapsed'
+        # Workers started together profile in the same second, the pid keeps their captures apart
+        path = os.path.join(self.output_dir, f"profile_{stamp}_{os.getpid()}.{ext}")
+
+        if mode == 'cprofile':
+            import cProfile  # Only needed for this mode, kept out of server startup
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+            def finish():
+                profiler.disable()
+                profiler.dump_stats(path)
+        else:
+            sampler = StackSampler(threading.get_ident())
+            sampler.start()
+
+            def finish():
+                sampler.stop()
+                sampler.write_collapsed(path)
+
+        self.active = True
+        logger.info(f"Profiling ({mode}) for {seconds}s -> {path}")
+
+        def stop():
+            try:
+                finish()
+                self.last_output = path
+                logger.info(f"Profile written to {path}")
+            finally:
+                self.active = False
+
+        asyncio.get_running_loop().call_later(seconds, stop)
+        return path
+
+
+class TickTimer:
+    """
+    Measures per-phase durations of a single game loop tick and logs
+    ticks that exceed the configured budget.
+    """
+
+    def __init__(self, budget_ms: float):
+        self.budget_ms = budget_ms
+        self.slow_ticks = 0
+        self.last_ms = 0.0  # Duration of the last finished tick
+        self._start = 0.0
+        self._last = 0.0
+        self.phases: List[tuple] = []
+
+    def start(self):
+        """Begin timing a new tick"""
+        self._start = self._last = time.perf_counter()
+        self.phases = []
+
+    def mark(self, phase: str):
+        """Record the time spent since the previous mark under the given phase name"""
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self._last) * 1000))
+        self._last = now
+
+    def finish(self) -> float:
+        """Finish the tick, log it if over budget, and return its duration in ms"""
+        total_ms = (time.perf_counter() - self._start) * 1000
+        self.last_ms = total_ms
+        if self.budget_ms and total_ms > self.budget_ms:
+            self.slow_ticks += 1
+            breakdown = ', '.join(f"{name}={ms:.2f}ms" for name, ms in self.phases)
+            logger.warning(f"Slow tick: {total_ms:.2f}ms (budget {self.budget_ms:.2f}ms): {breakdown}")
+        return total_ms
+
+    def breakdown(self) -> Dict[str, float]:
+        """Phase durations of the last tick in ms"""
+        return dict(self.phases)
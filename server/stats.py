@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Persistent player statistics.
+
+Kills, deaths, time alive and maximum size are aggregated per player name.
+The game loop only updates in-memory counters; a background task flushes
+them to SQLite every few seconds through a single-thread executor, so
+database I/O never runs on the event loop. The leaderboard is served from
+an in-memory cache that is invalidated after every flush.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LEADERBOARD_ORDERS = ('kills', 'deaths', 'time_alive', 'max_size')
+
+
+@dataclass
+class StatsDelta:
+    """Changes for one name since the last flush"""
+    kills: int = 0
+    deaths: int = 0
+    time_alive: float = 0.0
+    max_size: float = 0.0
+
+
+@dataclass
+class Life:
+    """Current life of a player: from spawn until hit or leave"""
+    started_at: float
+    max_size: float
+
+
+class StatsStore:
+    """SQLite storage. All methods run in the stats executor thread."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            # Several worker processes may share the file
+            self._db = sqlite3.connect(self.path, timeout=5)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('''
+                CREATE TABLE IF NOT EXISTS player_stats (
+                    name TEXT PRIMARY KEY,
+                    kills INTEGER NOT NULL DEFAULT 0,
+                    deaths INTEGER NOT NULL DEFAULT 0,
+                    time_alive REAL NOT NULL DEFAULT 0,
+                    max_size REAL NOT NULL DEFAULT 0,
+                    updated_at REAL NOT NULL
+                )
+            ''')
+        return self._db
+
+    def write_batch(self, batch: Dict[str, StatsDelta]):
+        """Add a batch of deltas in one transaction"""
+        db = self._connect()
+        now = time.time()
+        with db:
+            db.executemany('''
+                INSERT INTO player_stats (name, kills, deaths, time_alive, max_size, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    kills = kills + excluded.kills,
+                    deaths = deaths + excluded.deaths,
+                    time_alive = time_alive + excluded.time_alive,
+                    max_size = MAX(max_size, excluded.max_size),
+                    updated_at = excluded.updated_at
+            ''', [(name, d.kills, d.deaths, d.time_alive, d.max_size, now) for name, d in batch.items()])
+
+    def top(self, order: str, limit: int) -> List[dict]:
+        if order not in LEADERBOARD_ORDERS:
+            raise ValueError(f"Unknown order: {order}")
+        db = self._connect()
+        rows = db.execute(
+            f'SELECT name, kills, deaths, time_alive, max_size FROM player_stats '
+            f'ORDER BY {order} DESC, name LIMIT ?', (limit,)
+        ).fetchall()
+        return [
+            {'name': name, 'kills': kills, 'deaths': deaths,
+             'time_alive': round(time_alive, 1), 'max_size': round(max_size, 1)}
+            for name, kills, deaths, time_alive, max_size in rows
+        ]
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+class StatsRecorder:
+    """
+    Collects stats from the game loop and writes them in batches.
+    record_*() and observe_sizes() only touch memory and are safe to call in the tick.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 5.0):
+        self.store = StatsStore(path)
+        self.flush_interval = flush_interval
+        self.pending: Dict[str, StatsDelta] = {}
+        self.lives: Dict[str, Life] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='stats')
+        self._cache: Dict[Tuple[str, int], List[dict]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _delta(self, name: str) -> StatsDelta:
+        delta = self.pending.get(name)
+        if delta is None:
+            delta = self.pending[name] = StatsDelta()
+        return delta
+
+    def start_life(self, player_id: str, size: float):
+        self.lives[player_id] = Life(time.time(), size)
+
+    def end_life(self, player_id: str, name: str):
+        """Account a finished life (death or leave) to a name"""
+        life = self.lives.pop(player_id, None)
+        if life is None:
+            return
+        delta = self._delta(name)
+        delta.time_alive += time.time() - life.started_at
+        delta.max_size = max(delta.max_size, life.max_size)
+
+    def record_hit(self, shooter_name: Optional[str], victim):
+        """
+        Count a kill for the shooter and a death for the victim (a respawned Player).
+        Either may be None for players that are not tracked, such as bots.
+        """
+        if shooter_name is not None:
+            self._delta(shooter_name).kills += 1
+        if victim is not None:
+            self._delta(victim.name).deaths += 1
+            self.end_life(victim.id, victim.name)
+            self.start_life(victim.id, victim.size)
+
+    def observe_sizes(self, players: dict):
+        """Track the largest size of every current life (sizes only grow between hits)"""
+        for player_id, life in self.lives.items():
+            player = players.get(player_id)
+            if player is not None and player.size > life.max_size:
+                life.max_size = player.size
+
+    async def flush(self):
+        """Write pending deltas in the executor and invalidate the leaderboard cache"""
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, {}
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self.store.write_batch, batch)
+        except Exception as e:
+            # Whatever failed, the recorder keeps running and flushes the next batch
+            logger.exception(f"Stats flush failed, {len(batch)} names dropped: {e}")
+        self._cache.clear()
+
+    async def _flush_forever(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self):
+        self._task = asyncio.create_task(self._flush_forever())
+
+    async def close(self):
+        """Stop the flush task and write what is left"""
+        if self._task:
+            self._task.cancel()
+        await self.flush()
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.store.close)
+        self._executor.shutdown()
+
+    async def leaderboard(self, order: str = 'kills', limit: int = 10) -> List[dict]:
+        """Top players, served from cache until the next flush"""
+        key = (order, limit)
+        if key not in self._cache:
+            self._cache[key] = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self.store.top, order, limit)
+        return self._cache[key]
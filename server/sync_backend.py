@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Pluggable state-sync backends.
+
+A room is simulated by exactly one node (the one holding its GameState).
+Other nodes may hold client sockets for that room and act as relays:
+- the simulating node publishes encoded frames on "frames:<room>"
+- relays forward client input on "inputs:<room>"
+
+Frames are published already encoded, so relays forward them to their
+sockets without touching JSON. Two backends are provided:
+- LocalBroker: in-process, for tests and single-process setups (not for relays)
+- UnixSocketBroker: talks to BrokerServer over a Unix-domain socket, so
+  several processes on one host can share rooms
+
+A networked backend (Redis, NATS, ...) only needs to implement
+publish() and subscribe() to run the same rooms across machines.
+
+Run a broker with:
+    python server/sync_backend.py /tmp/llm_game_broker.sock
+"""
+
+import asyncio
+import json
+import logging
+import sys
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[dict, bytes], Awaitable[None]]
+
+
+class SyncBackend:
+    """Interface for publishing room frames and client input between nodes"""
+
+    async def connect(self):
+        pass
+
+    async def publish(self, channel: str, meta: dict, payload: bytes):
+        raise NotImplementedError
+
+    async def subscribe(self, channel: str, handler: Handler):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+    async def publish_frame(self, room: str, frame: str,
+                            target: Optional[str] = None, exclude: Optional[str] = None):
+        """Publish an encoded frame for all players of a room, one player (target) or all but one (exclude)"""
+        await self.publish(f"frames:{room}", {'target': target, 'exclude': exclude}, frame.encode())
+
+    async def subscribe_frames(self, room: str, handler: Callable[[str, Optional[str], Optional[str]], Awaitable[None]]):
+        async def on_message(meta: dict, payload: bytes):
+            await handler(payload.decode(), meta.get('target'), meta.get('exclude'))
+        await self.subscribe(f"frames:{room}", on_message)
+
+    async def send_input(self, room: str, player_id: str, message: dict):
+        """Forward a client message to the node simulating the room"""
+        await self.publish(f"inputs:{room}", {'player_id': player_id}, json.dumps(message).encode())
+
+    async def subscribe_inputs(self, room: str, handler: Callable[[str, dict], Awaitable[None]]):
+        async def on_message(meta: dict, payload: bytes):
+            await handler(meta['player_id'], json.loads(payload))
+        await self.subscribe(f"inputs:{room}", on_message)
+
+
+class LocalBroker(SyncBackend):
+    """In-process backend: handlers are called directly"""
+
+    def __init__(self):
+        self.handlers: Dict[str, List[Handler]] = defaultdict(list)
+
+    async def publish(self, channel: str, meta: dict, payload: bytes):
+        for handler in list(self.handlers.get(channel, ())):
+            try:
+                await handler(meta, payload)
+            except Exception as e:
+                logger.error(f"Error in {channel} handler: {e}")
+
+    async def subscribe(self, channel: str, handler: Handler):
+        self.handlers[channel].append(handler)
+
+
+# Wire format between UnixSocketBroker and BrokerServer:
+# one JSON header line {"op", "channel", "meta", "len"} followed by "len" raw payload bytes
+
+async def write_message(writer: asyncio.StreamWriter, header: dict, payload: bytes = b''):
+    header['len'] = len(payload)
+    writer.write(json.dumps(header).encode() + b'\n' + payload)
+    await writer.drain()
+
+
+async def read_message(reader: asyncio.StreamReader):
+    line = await reader.readline()
+    if not line:
+        return None, b''
+    header = json.loads(line)
+    payload = await reader.readexactly(header['len']) if header['len'] else b''
+    return header, payload
+
+
+class BrokerServer:
+    """Fan-out hub for UnixSocketBroker clients"""
+
+    def __init__(self):
+        self.subscribers: Dict[str, List[asyncio.StreamWriter]] = defaultdict(list)
+
+    async def serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                header, payload = await read_message(reader)
+                if header is None:
+                    break
+                if header['op'] == 'sub':
+                    self.subscribers[header['channel']].append(writer)
+                elif header['op'] == 'pub':
+                    for subscriber in list(self.subscribers.get(header['channel'], ())):
+                        try:
+                            await write_message(subscriber, header, payload)
+                        except ConnectionError:
+                            self.subscribers[header['channel']].remove(subscriber)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for writers in self.subscribers.values():
+                if writer in writers:
+                    writers.remove(writer)
+            writer.close()
+
+    async def serve(self, path: str):
+        server = await asyncio.start_unix_server(self.serve_client, path=path)
+        logger.info(f"Sync broker listening on {path}")
+        async with server:
+            await server.serve_forever()
+
+
+class UnixSocketBroker(SyncBackend):
+    """Backend that talks to a BrokerServer over a Unix-domain socket"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.handlers: Dict[str, List[Handler]] = defaultdict(list)
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+        self._listener: Optional[asyncio.Task] = None
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+        self._listener = asyncio.create_task(self._listen())
+        logger.info(f"Connected to sync broker at {self.path}")
+
+    async def _listen(self):
+        while True:
+            header, payload = await read_message(self._reader)
+            if header is None:
+                logger.error("Sync broker connection closed")
+                return
+            for handler in list(self.handlers.get(header['channel'], ())):
+                try:
+                    await handler(header['meta'], payload)
+                except Exception as e:
+                    logger.error(f"Error in {header['channel']} handler: {e}")
+
+    async def publish(self, channel: str, meta: dict, payload: bytes):
+        async with self._lock:
+            await write_message(self._writer, {'op': 'pub', 'channel': channel, 'meta': meta}, payload)
+
+    async def subscribe(self, channel: str, handler: Handler):
+        if channel not in self.handlers:
+            async with self._lock:
+                await write_message(self._writer, {'op': 'sub', 'channel': channel, 'meta': {}})
+        self.handlers[channel].append(handler)
+
+    async def close(self):
+        if self._listener:
+            self._listener.cancel()
+        if self._writer:
+            self._writer.close()
+
+
+class FrameRelay:
+    """
+    Holds client sockets for a room simulated on another node.
+    Frames from the backend are forwarded as-is; client messages are
+    forwarded to the simulating node.
+    """
+
+    def __init__(self, backend: SyncBackend, room: str):
+        self.backend = backend
+        self.room = room
+        self.connections: Dict[str, object] = {}
+        self._subscribed = False
+
+    async def attach(self, player_id: str, ws):
+        """Register a local socket and ask the simulating node to add the player"""
+        if not self._subscribed:
+            self._subscribed = True
+            await self.backend.subscribe_frames(self.room, self.deliver)
+        self.connections[player_id] = ws
+        await self.backend.send_input(self.room, player_id, {'type': 'join'})
+
+    async def detach(self, player_id: str):
+        self.connections.pop(player_id, None)
+        await self.backend.send_input(self.room, player_id, {'type': 'leave'})
+
+    async def forward(self, player_id: str, message: dict):
+        await self.backend.send_input(self.room, player_id, message)
+
+    async def deliver(self, frame: str, target: Optional[str], exclude: Optional[str]):
+        if target is not None:
+            recipients = [(target, self.connections[target])] if target in self.connections else []
+        else:
+            recipients = [(pid, ws) for pid, ws in self.connections.items() if pid != exclude]
+
+        for player_id, ws in recipients:
+            try:
+                await ws.send_str(frame)
+            except Exception as e:
+                logger.error(f"Error relaying to {player_id}: {e}")
+                self.connections.pop(player_id, None)
+
+
+def create_backend(kind: str, broker_path: str, role: str = 'simulate') -> Optional[SyncBackend]:
+    """Create the backend selected by configuration ('' = none)"""
+    if not kind:
+        return None
+    if kind == 'local':
+        if role == 'relay':
+            # Nothing else publishes on an in-process broker, the relay would never get a frame
+            raise ValueError("A relay needs a broker shared with the simulating node (SYNC_BACKEND=unix)")
+        return LocalBroker()
+    if kind == 'unix':
+        return UnixSocketBroker(broker_path)
+    raise ValueError(f"Unknown sync backend: {kind}")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    path = sys.argv[1] if len(sys.argv) > 1 else '/tmp/llm_game_broker.sock'
+    asyncio.run(BrokerServer().serve(path))
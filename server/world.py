@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Chunked world support.
+
+The world is divided into square chunks. Each tick the players are
+bucketed by chunk, so collision checks only look at bullets near occupied
+chunks and per-tick work grows with the occupied area, not the world size.
+Small worlds (a few chunks, such as the default 800x600) skip the bucketing.
+
+State frames are streamed per chunk: every occupied chunk's players are
+encoded once per frame, and the frame for a client is assembled from the
+fragments of the chunks around it (its view). Clients with the same view
+share one assembled string.
+
+For per-client frames (see budget.py) each player is also encoded as its
+own fragment, and chunk fragments are joined from those.
+"""
+
+import json
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+Chunk = Tuple[int, int]
+View = Tuple[int, int, int, int]  # first column, first row, last column, last row (inclusive)
+
+# Up to this many chunks a bullet's 3x3 neighbourhood is (nearly) the whole world,
+# so bucketing players costs more than it saves and collisions use a flat scan
+FLAT_SCAN_MAX_CHUNKS = 9
+
+
+class ChunkGrid:
+    """Players bucketed by chunk, rebuilt once per tick"""
+
+    def __init__(self, width: float, height: float, chunk_size: float, view_chunks: int):
+        self.chunk_size = chunk_size
+        self.view_chunks = view_chunks
+        self.columns = max(1, math.ceil(width / chunk_size))
+        self.rows = max(1, math.ceil(height / chunk_size))
+        self.indexed = self.columns * self.rows > FLAT_SCAN_MAX_CHUNKS
+        self.players: Dict[Chunk, list] = {}
+
+    def chunk_of(self, x: float, y: float) -> Chunk:
+        column = min(self.columns - 1, max(0, int(x // self.chunk_size)))
+        row = min(self.rows - 1, max(0, int(y // self.chunk_size)))
+        return column, row
+
+    def rebuild(self, players: Iterable):
+        """Bucket players for nearby_players() (only worth it when indexed)"""
+        self.players = {}
+        for player in players:
+            self.players.setdefault(self.chunk_of(player.x, player.y), []).append(player)
+
+    def nearby_players(self, x: float, y: float) -> Iterator:
+        """
+        Players in the chunk of (x, y) and its neighbours. Chunks are at least
+        as large as the biggest player, so nobody touching (x, y) is missed.
+        """
+        if not self.players:
+            return
+        column, row = self.chunk_of(x, y)
+        for dc in (-1, 0, 1):
+            for dr in (-1, 0, 1):
+                yield from self.players.get((column + dc, row + dr), ())
+
+    def view_of(self, x: float, y: float) -> Optional[View]:
+        """Chunks streamed to a client at (x, y), None when that is the whole world"""
+        column, row = self.chunk_of(x, y)
+        r = self.view_chunks
+        view = (max(0, column - r), max(0, row - r),
+                min(self.columns - 1, column + r), min(self.rows - 1, row + r))
+        if view == (0, 0, self.columns - 1, self.rows - 1):
+            return None
+        return view
+
+    def group(self, players: Iterable) -> Dict[Chunk, list]:
+        """Bucket players by their current chunk (used for state snapshots)"""
+        groups: Dict[Chunk, list] = {}
+        for player in players:
+            groups.setdefault(self.chunk_of(player.x, player.y), []).append(player)
+        return groups
+
+
+@dataclass
+class EncodedState:
+    """
+    A state frame encoded per chunk. frame(view) returns the JSON text of the
+    frame with the players of the chunks in view (all chunks when view is None).
+    """
+    prefix: str
+    fragments: Dict[Chunk, str]
+    # Only filled by encode_state_frame(frame, per_player=True)
+    players: Dict[str, str] = field(default_factory=dict)  # player id -> fragment
+    positions: Dict[str, Tuple[int, int]] = field(default_factory=dict)  # player id -> quantized (x, y)
+    chunk_players: Dict[Chunk, List[str]] = field(default_factory=dict)
+    _frames: Dict[Optional[View], str] = field(default_factory=dict)
+
+    def frame(self, view: Optional[View] = None) -> str:
+        text = self._frames.get(view)
+        if text is None:
+            if view is None:
+                parts = self.fragments.values()
+            else:
+                c0, r0, c1, r1 = view
+                parts = [fragment for (c, r), fragment in self.fragments.items()
+                         if c0 <= c <= c1 and r0 <= r <= r1]
+            text = self._frames[view] = self.prefix + ', '.join(parts) + '}}}'
+        return text
+
+    def players_in(self, view: Optional[View]) -> List[str]:
+        """Ids of the players in the chunks of a view (per-player encoding only)"""
+        if view is None:
+            return list(self.players)
+        c0, r0, c1, r1 = view
+        return [pid for (c, r), ids in self.chunk_players.items()
+                if c0 <= c <= c1 and r0 <= r <= r1 for pid in ids]
+
+    def with_hits(self, hits: List[dict]) -> 'EncodedState':
+        """Same players with a different hit list"""
+        prefix = self.prefix[:self.prefix.index('"hits": ')] + state_prefix_tail(hits)
+        return EncodedState(prefix, self.fragments, self.players, self.positions, self.chunk_players)
+
+
+def state_prefix_tail(hits: List[dict]) -> str:
+    return f'"hits": {json.dumps(hits)}, "data": {{"players": {{'
+
+
+def encode_state_frame(frame: dict, per_player: bool = False) -> EncodedState:
+    """
+    Encode a state snapshot {'type', 'tick', 'time', 'hits', 'chunks': {chunk: {player_id: data}}}.
+    Each chunk's players become a fragment of the "players" object; with
+    per_player, each player also gets a fragment of its own.
+    """
+    prefix = f'{{"type": "state", "tick": {frame["tick"]}, "time": {frame["time"]}, ' + state_prefix_tail(frame['hits'])
+    if not per_player:
+        fragments = {
+            chunk: json.dumps(players)[1:-1]
+            for chunk, players in frame['chunks'].items()
+            if players
+        }
+        return EncodedState(prefix, fragments)
+
+    encoded = EncodedState(prefix, {})
+    for chunk, players in frame['chunks'].items():
+        if not players:
+            continue
+        for pid, data in players.items():
+            encoded.players[pid] = json.dumps({pid: data})[1:-1]
+            encoded.positions[pid] = (data['x'], data['y'])
+        encoded.chunk_players[chunk] = list(players)
+        encoded.fragments[chunk] = ', '.join(encoded.players[pid] for pid in players)
+    return encoded
@@ -10,7 +10,19 @@ window.GAME_CONFIG = {
     // Default: connect to the same host as the web page
     wsUrl: (function() {
         const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-        return `${protocol}//${window.location.host}/ws`;
+        // Pass ?room=<id> from the page URL so friends can join the same room
+        // when the server runs several workers
+        const room = new URLSearchParams(window.location.search).get('room');
+        const query = room ? `?room=${encodeURIComponent(room)}` : '';
+        return `${protocol}//${window.location.host}/ws${query}`;
+    })(),
+
+    // Read-only spectator stream, used by the Canvas version when the page is opened with ?spectate
+    spectateUrl: (function() {
+        const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+        const room = new URLSearchParams(window.location.search).get('room');
+        const query = room ? `?room=${encodeURIComponent(room)}` : '';
+        return `${protocol}//${window.location.host}/spectate${query}`;
     })(),
 
     // Examples for different deployment scenarios:
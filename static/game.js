@@ -19,6 +19,8 @@ class Game {
             name: 'player'
         };
         this.hoveredPlayer = null;
+        // Opened with ?spectate: watch the room without joining it
+        this.spectating = new URLSearchParams(window.location.search).has('spectate');
         this.keys = {
             ArrowUp: false,
             ArrowDown: false,
@@ -29,7 +31,13 @@ class Game {
         this.config = {
             canvas_width: 800,
             canvas_height: 600,
-            player_speed: 5
+            world_width: 800,
+            world_height: 600,
+            player_speed: 5,
+            physics_fps: 60,
+            broadcast_fps: 20,
+            position_scale: 10,
+            angle_scale: 1000
         };
         this.lastShootTime = 0;
         this.shootCooldown = 250; // milliseconds
@@ -47,28 +55,71 @@ class Game {
         this.playerInterpolation = {}; // Stores interpolation data for each remote player
         this.playerUpdateBuffer = {}; // Buffer to store incoming position updates
         this.lastFrameTime = performance.now();
-        // Increased interpolation delay to handle network jitter better
-        // With server broadcasting at 20 FPS (every 50ms), we need enough buffer
-        // to smooth out network latency variations
-        this.interpolationDelay = 150; // ms - intentional delay for smooth interpolation
+        // Snapshots are stamped with server time, so the delay only needs to cover
+        // network jitter; it adapts to the measured jitter (see updateServerClock)
+        this.interpolationDelay = 100; // ms
+        this.minInterpolationDelay = 60; // ms
+        this.maxInterpolationDelay = 250; // ms
+        this.clockOffset = null; // local clock - server clock, ms
+        this.jitter = 0; // smoothed extra delay of recent frames, ms
 
         // Client-side prediction: threshold for server reconciliation
         // Only apply server correction if mismatch is larger than this
         this.serverReconciliationThreshold = 15; // pixels
 
+        // Bullets are simulated locally from bullet_created spawn events,
+        // using a server tick clock that is re-synced on every state frame
+        this.serverTick = 0;
+        this.serverTickTime = 0; // server time of serverTick, ms
+
+        // After a dropped connection the client reconnects with its resume token
+        // and keeps its player, as long as the server's grace period has not run out
+        this.resumeToken = null;
+        this.lastStateTick = 0; // tick of the last state frame received
+        this.reconnectDeadline = 0; // performance.now() until which reconnecting is tried, 0 = connected
+        this.leaving = false; // Set when the page is closed, the socket is closed on purpose
+
         // Death flash effect state
         this.deathFlashActive = false;
         this.deathFlashStartTime = 0;
         this.deathFlashDuration = 1500; // milliseconds
 
+        // Pre-rendered sprites: player bodies keyed by color, size bucket and outline,
+        // plus single bullet, grid and text label sprites. Drawing a cached bitmap
+        // avoids rebuilding paths and switching ctx state for every object every frame.
+        this.spriteCache = new Map();
+        this.maxCachedSprites = 256;
+        this.spriteSizeStep = 2; // px, player radius bucket
+        this.gridSprite = null;
+        this.bulletSprite = null;
+
+        // Top-left world position shown at the canvas origin. The camera follows
+        // the local player when the world is larger than the canvas.
+        this.camera = { x: 0, y: 0 };
+
+        // Frame-time overlay (toggle with F3 or open the page with ?stats)
+        this.showFrameStats = new URLSearchParams(window.location.search).has('stats');
+        this.frameTimes = []; // render() durations of recent frames, ms
+        this.frameIntervals = []; // time between recent frames, ms
+
         this.init();
     }
 
     init() {
-        this.setupNameModal();
+        if (this.spectating) {
+            document.getElementById('name-modal').classList.add('hidden');
+        } else {
+            this.setupNameModal();
+        }
         this.setupWebSocket();
         this.setupControls();
         this.startGameLoop();
+
+        // Leave for good when the page goes away, so the server does not keep our player for a resume
+        window.addEventListener('pagehide', () => {
+            this.leaving = true;
+            if (this.ws) this.ws.close(1000);
+        });
     }
 
     setupNameModal() {
@@ -111,19 +162,32 @@ class Game {
     setupWebSocket() {
         // Use configured WebSocket URL if available, otherwise use default
         let wsUrl;
-        if (window.GAME_CONFIG && window.GAME_CONFIG.wsUrl) {
+        if (this.spectating) {
+            const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+            wsUrl = (window.GAME_CONFIG && window.GAME_CONFIG.spectateUrl) || `${protocol}//${window.location.host}/spectate`;
+        } else if (window.GAME_CONFIG && window.GAME_CONFIG.wsUrl) {
             wsUrl = window.GAME_CONFIG.wsUrl;
         } else {
             const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
             wsUrl = `${protocol}//${window.location.host}/ws`;
         }
+        if (this.reconnectDeadline && this.resumeToken) {
+            const url = new URL(wsUrl);
+            // The launcher routes by ?room, resume in the room the player is in
+            if (this.config.room != null) {
+                url.searchParams.set('room', this.config.room);
+            }
+            url.searchParams.set('resume', this.resumeToken);
+            url.searchParams.set('tick', this.lastStateTick);
+            wsUrl = url.toString();
+        }
 
         console.log('Connecting to WebSocket:', wsUrl);
         this.ws = new WebSocket(wsUrl);
 
         this.ws.onopen = () => {
             console.log('Connected to server');
-            this.updateStatus('Connected', true);
+            this.updateStatus(this.spectating ? 'Spectating' : 'Connected', true);
 
             // Send pending name if available
             if (this.pendingName) {
@@ -143,42 +207,117 @@ class Game {
 
         this.ws.onerror = (error) => {
             console.error('WebSocket error:', error);
+            if (this.reconnectDeadline) return; // onclose retries
             this.updateStatus('Connection Error', false);
             this.showError('Connection error occurred');
         };
 
         this.ws.onclose = () => {
             console.log('Disconnected from server');
+            if (this.tryReconnect()) return;
             this.updateStatus('Disconnected', false);
             this.showError('Disconnected from server. Refresh to reconnect.');
         };
     }
 
+    tryReconnect() {
+        // Retry within the server's grace period; the server keeps our player until then
+        const grace = (this.config.resume_grace || 0) * 1000;
+        if (this.spectating || this.leaving || !this.resumeToken || !grace) return false;
+
+        const now = performance.now();
+        if (!this.reconnectDeadline) {
+            this.reconnectDeadline = now + grace;
+        } else if (now >= this.reconnectDeadline) {
+            this.reconnectDeadline = 0;
+            return false;
+        }
+        this.updateStatus('Reconnecting...', false);
+        setTimeout(() => this.setupWebSocket(), 1000);
+        return true;
+    }
+
     handleMessage(message) {
         switch (message.type) {
-            case 'init':
+            case 'init': {
+                // A reconnect that could not resume joins as a new player; keep the chosen name
+                const previousName = this.reconnectDeadline && this.localPlayer ? this.localPlayer.name : null;
+                this.reconnectDeadline = 0;
+                this.resumeToken = message.resume_token;
                 this.playerId = message.player_id;
                 this.localPlayer = message.player;
                 this.players[this.playerId] = this.localPlayer;
                 this.config = message.config;
                 console.log('Initialized as player:', this.playerId);
 
+                // Bullets already in flight
+                this.updateServerClock(message.time);
+                this.syncServerTick(message.tick, message.time);
+                this.bullets = {};
+                for (const bullet of Object.values(message.bullets || {})) {
+                    this.addBullet(bullet, message.tick);
+                }
+
                 // Set default name in the input field
                 const nameInput = document.getElementById('player-name-input');
                 if (nameInput) {
                     nameInput.value = this.localPlayer.name;
                 }
+                if (previousName && previousName !== this.localPlayer.name) {
+                    this.sendNameChange(previousName);
+                }
+                break;
+            }
+
+            case 'resumed': {
+                // Same player as before the drop: nobody saw us leave. Take the server's
+                // view of our player and bullets; the next state frame updates everyone else
+                this.reconnectDeadline = 0;
+                this.resumeToken = message.resume_token;
+                Object.assign(this.localPlayer, message.player);
+                this.players[this.playerId] = this.localPlayer;
+                this.updateServerClock(message.time);
+                this.syncServerTick(message.tick, message.time);
+
+                const inFlight = new Set(message.bullet_ids);
+                for (const bulletId of Object.keys(this.bullets)) {
+                    if (!inFlight.has(bulletId)) {
+                        delete this.bullets[bulletId];
+                    }
+                }
+                for (const bullet of Object.values(message.bullets)) {
+                    this.addBullet(bullet, message.tick);
+                }
+                console.log('Resumed as player:', this.playerId, 'missed ticks:', message.tick - message.since_tick);
+                break;
+            }
+
+            case 'spectate_init':
+                // Spectators have no local player, everyone is interpolated
+                this.config = message.config;
+                this.updateServerClock(message.time);
+                this.syncServerTick(message.tick, message.time);
+                for (const [id, quantizedData] of Object.entries(message.data.players)) {
+                    this.players[id] = this.decodePlayerState(id, quantizedData);
+                }
+                this.bullets = {};
+                for (const bullet of Object.values(message.bullets || {})) {
+                    this.addBullet(bullet, message.tick);
+                }
+                console.log('Spectating room', message.config.room);
                 break;
 
             case 'state':
                 // Use buffered interpolation for smooth movement
-                const currentTime = performance.now();
-
-                // Update bullets directly (no interpolation needed)
-                this.bullets = message.data.bullets;
+                // Re-sync the server clock used for interpolation and bullet simulation
+                this.updateServerClock(message.time);
+                this.syncServerTick(message.tick, message.time);
+                this.lastStateTick = message.tick;
 
                 // Process each player in the server update
-                for (const [id, newPlayerData] of Object.entries(message.data.players)) {
+                for (const [id, quantizedData] of Object.entries(message.data.players)) {
+                    const newPlayerData = this.decodePlayerState(id, quantizedData);
+
                     // Add or update player in our local state
                     if (!this.players[id]) {
                         this.players[id] = { ...newPlayerData };
@@ -225,7 +364,7 @@ class Game {
                         x: newPlayerData.x,
                         y: newPlayerData.y,
                         angle: newPlayerData.angle,
-                        timestamp: currentTime
+                        timestamp: message.time
                     });
 
                     // Keep only last 5 updates (prevents buffer from growing unbounded)
@@ -247,9 +386,22 @@ class Game {
                     }
                 }
 
+                // Players outside this client's view are not streamed (large worlds);
+                // forget them until they come back into view. Budgeted frames leave out
+                // players in view too, those frames list the ones that left the view in "gone"
+                const gone = message.gone || Object.keys(this.players).filter(id => !(id in message.data.players));
+                for (const id of gone) {
+                    if (id !== this.playerId) {
+                        delete this.players[id];
+                        delete this.playerInterpolation[id];
+                        delete this.playerUpdateBuffer[id];
+                    }
+                }
+
                 // Handle hits
                 if (message.hits && message.hits.length > 0) {
                     message.hits.forEach(hit => {
+                        delete this.bullets[hit.bullet_id];
                         if (hit.player_id === this.playerId) {
                             this.startDeathFlash();
                         }
@@ -264,13 +416,19 @@ class Game {
 
             case 'player_left':
                 delete this.players[message.player_id];
+                // The server removes a leaving player's bullets with them
+                for (const [bulletId, bullet] of Object.entries(this.bullets)) {
+                    if (bullet.owner_id === message.player_id) {
+                        delete this.bullets[bulletId];
+                    }
+                }
                 delete this.playerInterpolation[message.player_id];
                 delete this.playerUpdateBuffer[message.player_id];
                 console.log('Player left:', message.player_id);
                 break;
 
             case 'bullet_created':
-                this.bullets[message.bullet.id] = message.bullet;
+                this.addBullet(message.bullet, message.tick);
                 break;
 
             case 'player_name_changed':
@@ -307,6 +465,9 @@ class Game {
                 if (e.code === 'Space') {
                     this.shoot();
                 }
+            } else if (e.code === 'F3') {
+                e.preventDefault();
+                this.showFrameStats = !this.showFrameStats;
             }
         });
 
@@ -325,8 +486,8 @@ class Game {
             if (!this.playerId) return;
 
             const rect = this.canvas.getBoundingClientRect();
-            const mouseX = e.clientX - rect.left;
-            const mouseY = e.clientY - rect.top;
+            const mouseX = e.clientX - rect.left + this.camera.x;
+            const mouseY = e.clientY - rect.top + this.camera.y;
 
             // Calculate angle from player to mouse
             const dx = mouseX - this.localPlayer.x;
@@ -362,8 +523,8 @@ class Game {
 
             const rect = this.canvas.getBoundingClientRect();
             const touch = e.touches[0];
-            const touchX = touch.clientX - rect.left;
-            const touchY = touch.clientY - rect.top;
+            const touchX = touch.clientX - rect.left + this.camera.x;
+            const touchY = touch.clientY - rect.top + this.camera.y;
 
             // Calculate angle from player to touch point
             const dx = touchX - this.localPlayer.x;
@@ -394,15 +555,19 @@ class Game {
 
             this.update();
             this.updateInterpolation(deltaTime);
+            this.updateBullets();
+
+            const renderStart = performance.now();
             this.render();
+            this.recordFrameTime(performance.now() - renderStart, deltaTime);
             requestAnimationFrame(loop);
         };
         requestAnimationFrame(loop);
     }
 
     updateInterpolation(deltaTime) {
-        const currentTime = performance.now();
-        const renderTime = currentTime - this.interpolationDelay;
+        // Render remote players in the past on the server timeline
+        const renderTime = this.serverNow() - this.interpolationDelay;
 
         // Update interpolation for all remote players using buffered updates
         for (const [id, buffer] of Object.entries(this.playerUpdateBuffer)) {
@@ -500,6 +665,86 @@ class Game {
         }
     }
 
+    updateServerClock(serverTime) {
+        // Offset between the local clock and server time, taken from the least delayed
+        // frame seen so far. It creeps up slowly so clock drift and route changes are absorbed.
+        const offset = performance.now() - serverTime;
+        if (this.clockOffset === null || offset < this.clockOffset) {
+            this.clockOffset = offset;
+        } else {
+            this.clockOffset += 0.02;
+        }
+
+        // Adaptive jitter buffer: delay = one broadcast interval plus twice the smoothed
+        // extra delay of recent frames, so a quiet network gets a small delay
+        const extraDelay = offset - this.clockOffset;
+        this.jitter += (extraDelay - this.jitter) * 0.1;
+        const broadcastInterval = 1000 / this.config.broadcast_fps;
+        const targetDelay = Math.min(this.maxInterpolationDelay,
+            Math.max(this.minInterpolationDelay, broadcastInterval + 2 * this.jitter));
+        this.interpolationDelay += (targetDelay - this.interpolationDelay) * 0.05;
+    }
+
+    serverNow() {
+        return performance.now() - (this.clockOffset || 0);
+    }
+
+    decodePlayerState(id, data) {
+        // State frames carry fixed-point integers (see position_scale / angle_scale)
+        const scale = this.config.position_scale;
+        return {
+            id: id,
+            x: data.x / scale,
+            y: data.y / scale,
+            angle: data.angle / this.config.angle_scale,
+            size: data.size / scale,
+            name: data.name,
+            color: data.color
+        };
+    }
+
+    syncServerTick(tick, serverTime) {
+        this.serverTick = tick;
+        this.serverTickTime = serverTime;
+    }
+
+    estimateServerTick() {
+        const elapsed = this.serverNow() - this.serverTickTime;
+        return this.serverTick + elapsed * this.config.physics_fps / 1000;
+    }
+
+    addBullet(bullet, tick) {
+        // Never let the tick clock lag behind a spawn we already know about
+        if (tick > this.estimateServerTick()) {
+            this.syncServerTick(tick, this.serverNow());
+        }
+        this.bullets[bullet.id] = {
+            ...bullet,
+            originX: bullet.x,
+            originY: bullet.y,
+            spawnTick: tick
+        };
+    }
+
+    updateBullets() {
+        // Bullets fly in a straight line at constant velocity (one step per server tick),
+        // so their position is fully determined by the spawn event
+        const tick = this.estimateServerTick();
+        const maxTicks = 5 * this.config.physics_fps; // Server removes bullets after 5 seconds
+
+        for (const [id, bullet] of Object.entries(this.bullets)) {
+            const ticks = Math.max(0, tick - bullet.spawnTick);
+            bullet.x = bullet.originX + bullet.vx * ticks;
+            bullet.y = bullet.originY + bullet.vy * ticks;
+
+            if (bullet.x < 0 || bullet.x > this.config.world_width ||
+                bullet.y < 0 || bullet.y > this.config.world_height ||
+                ticks > maxTicks) {
+                delete this.bullets[id];
+            }
+        }
+    }
+
     easeOutCubic(t) {
         return 1 - Math.pow(1 - t, 3);
     }
@@ -563,8 +808,8 @@ class Game {
         }
 
         // Clamp position to canvas bounds, considering player size (radius) to prevent going beyond boundaries
-        this.localPlayer.x = Math.max(this.localPlayer.size, Math.min(this.config.canvas_width - this.localPlayer.size, this.localPlayer.x));
-        this.localPlayer.y = Math.max(this.localPlayer.size, Math.min(this.config.canvas_height - this.localPlayer.size, this.localPlayer.y));
+        this.localPlayer.x = Math.max(this.localPlayer.size, Math.min(this.config.world_width - this.localPlayer.size, this.localPlayer.x));
+        this.localPlayer.y = Math.max(this.localPlayer.size, Math.min(this.config.world_height - this.localPlayer.size, this.localPlayer.y));
 
         // Send update to server if moved, but throttle to avoid overwhelming the network
         if (moved) {
@@ -670,25 +915,60 @@ class Game {
         this.deathFlashStartTime = performance.now();
     }
 
-    render() {
-        // Clear canvas
-        this.ctx.fillStyle = '#0a0a0a';
-        this.ctx.fillRect(0, 0, this.canvas.width, this.canvas.height);
+    updateCamera() {
+        const { width, height } = this.canvas;
+        const centerX = this.playerId ? this.localPlayer.x : 0;
+        const centerY = this.playerId ? this.localPlayer.y : 0;
 
-        // Draw grid for reference
-        this.drawGrid();
+        // Whole pixels keep the cached sprites crisp
+        this.camera.x = Math.round(Math.max(0, Math.min(this.config.world_width - width, centerX - width / 2)));
+        this.camera.y = Math.round(Math.max(0, Math.min(this.config.world_height - height, centerY - height / 2)));
+    }
 
-        // Draw all players
-        for (const [id, player] of Object.entries(this.players)) {
-            const isLocalPlayer = id === this.playerId;
-            this.drawPlayer(player, isLocalPlayer);
+    isOnScreen(x, y, radius) {
+        const { width, height } = this.canvas;
+        return x + radius >= this.camera.x && x - radius <= this.camera.x + width &&
+            y + radius >= this.camera.y && y - radius <= this.camera.y + height;
+    }
+
+    render() {
+        const ctx = this.ctx;
+        this.updateCamera();
+        const camera = this.camera;
+
+        // Background and grid come from one cached bitmap, one cell larger than the
+        // canvas so it only has to be shifted by the camera offset within a cell
+        ctx.drawImage(this.getGridSprite(), -(camera.x % 50), -(camera.y % 50));
+
+        // World objects are drawn in world coordinates, only those on screen
+        ctx.save();
+        ctx.translate(-camera.x, -camera.y);
+
+        // Player bodies are cached sprites; guns are collected into one path
+        // per batch so all of them share a single stroke and fill
+        const players = Object.entries(this.players).filter(([, player]) => this.isOnScreen(player.x, player.y, player.size + 3));
+        for (const [id, player] of players) {
+            this.drawPlayer(player, id === this.playerId);
         }
+        this.drawGuns(players);
 
         // Draw all bullets
+        const bulletSprite = this.getBulletSprite();
+        const bulletOffset = bulletSprite.width / 2;
         for (const bullet of Object.values(this.bullets)) {
-            this.drawBullet(bullet);
+            if (this.isOnScreen(bullet.x, bullet.y, bulletOffset)) {
+                ctx.drawImage(bulletSprite, bullet.x - bulletOffset, bullet.y - bulletOffset);
+            }
         }
 
+        // World border, visible when the world is larger than the canvas
+        if (this.config.world_width > this.canvas.width || this.config.world_height > this.canvas.height) {
+            ctx.strokeStyle = '#444444';
+            ctx.lineWidth = 2;
+            ctx.strokeRect(0, 0, this.config.world_width, this.config.world_height);
+        }
+        ctx.restore();
+
         // Draw death flash and message if active
         if (this.deathFlashActive) {
             const elapsed = performance.now() - this.deathFlashStartTime;
@@ -702,102 +982,218 @@ class Game {
                 const alpha = (1 - progress) * 0.5 * (pulse * 0.5 + 0.5);
 
                 // Draw red flash overlay
-                this.ctx.fillStyle = '#ff0000';
-                this.ctx.globalAlpha = alpha;
-                this.ctx.fillRect(0, 0, this.canvas.width, this.canvas.height);
-                this.ctx.globalAlpha = 1.0;
+                ctx.fillStyle = '#ff0000';
+                ctx.globalAlpha = alpha;
+                ctx.fillRect(0, 0, this.canvas.width, this.canvas.height);
 
                 // Draw "Вы убиты" message in the center
-                const messageAlpha = (1 - progress) * 0.9;
-                this.ctx.globalAlpha = messageAlpha;
-                this.ctx.font = 'bold 48px Arial';
-                this.ctx.fillStyle = '#ffffff';
-                this.ctx.textAlign = 'center';
-                this.ctx.textBaseline = 'middle';
-                this.ctx.strokeStyle = '#ff0000';
-                this.ctx.lineWidth = 4;
-                this.ctx.strokeText('Вы убиты', this.canvas.width / 2, this.canvas.height / 2);
-                this.ctx.fillText('Вы убиты', this.canvas.width / 2, this.canvas.height / 2);
-                this.ctx.globalAlpha = 1.0;
+                const label = this.getLabelSprite('Вы убиты', 'bold 48px Arial', '#ffffff', '#ff0000', 4);
+                ctx.globalAlpha = (1 - progress) * 0.9;
+                ctx.drawImage(label, (this.canvas.width - label.width) / 2, (this.canvas.height - label.height) / 2);
+                ctx.globalAlpha = 1.0;
             } else {
                 // Flash effect finished
                 this.deathFlashActive = false;
             }
         }
 
+        if (this.showFrameStats) {
+            this.drawFrameStats();
+        }
+
         // Update UI
         this.updateUI();
     }
 
-    drawGrid() {
-        this.ctx.strokeStyle = '#1a1a1a';
-        this.ctx.lineWidth = 1;
+    createSpriteCanvas(width, height) {
+        const canvas = document.createElement('canvas');
+        canvas.width = Math.ceil(width);
+        canvas.height = Math.ceil(height);
+        return canvas;
+    }
 
-        // Vertical lines
-        for (let x = 0; x < this.canvas.width; x += 50) {
-            this.ctx.beginPath();
-            this.ctx.moveTo(x, 0);
-            this.ctx.lineTo(x, this.canvas.height);
-            this.ctx.stroke();
+    cacheSprite(key, build) {
+        let sprite = this.spriteCache.get(key);
+        if (!sprite) {
+            // Player colors are random, so bound the cache instead of tracking usage
+            if (this.spriteCache.size >= this.maxCachedSprites) {
+                this.spriteCache.clear();
+            }
+            sprite = build();
+            this.spriteCache.set(key, sprite);
         }
+        return sprite;
+    }
 
-        // Horizontal lines
-        for (let y = 0; y < this.canvas.height; y += 50) {
-            this.ctx.beginPath();
-            this.ctx.moveTo(0, y);
-            this.ctx.lineTo(this.canvas.width, y);
-            this.ctx.stroke();
+    getGridSprite() {
+        const width = this.canvas.width + 50;
+        const height = this.canvas.height + 50;
+        if (!this.gridSprite || this.gridSprite.width !== width || this.gridSprite.height !== height) {
+            this.gridSprite = this.createSpriteCanvas(width, height);
+            const ctx = this.gridSprite.getContext('2d');
+
+            ctx.fillStyle = '#0a0a0a';
+            ctx.fillRect(0, 0, width, height);
+
+            // All grid lines in one path
+            ctx.strokeStyle = '#1a1a1a';
+            ctx.lineWidth = 1;
+            ctx.beginPath();
+            for (let x = 0; x < width; x += 50) {
+                ctx.moveTo(x, 0);
+                ctx.lineTo(x, height);
+            }
+            for (let y = 0; y < height; y += 50) {
+                ctx.moveTo(0, y);
+                ctx.lineTo(width, y);
+            }
+            ctx.stroke();
         }
+        return this.gridSprite;
+    }
+
+    getPlayerSprite(color, size, isLocal) {
+        // Sizes are bucketed so a growing player does not create a sprite per pixel
+        const bucket = Math.max(this.spriteSizeStep, Math.ceil(size / this.spriteSizeStep) * this.spriteSizeStep);
+        const key = `player:${color}:${bucket}:${isLocal ? 1 : 0}`;
+
+        return this.cacheSprite(key, () => {
+            const padding = 2; // room for the local player outline
+            const sprite = this.createSpriteCanvas((bucket + padding) * 2, (bucket + padding) * 2);
+            const ctx = sprite.getContext('2d');
+            const center = sprite.width / 2;
+
+            ctx.fillStyle = color;
+            ctx.beginPath();
+            ctx.arc(center, center, bucket, 0, Math.PI * 2);
+            ctx.fill();
+
+            // Draw outline for local player
+            if (isLocal) {
+                ctx.strokeStyle = '#ffffff';
+                ctx.lineWidth = 3;
+                ctx.stroke();
+            }
+            sprite.radius = bucket;
+            return sprite;
+        });
+    }
+
+    getBulletSprite() {
+        if (!this.bulletSprite) {
+            const sprite = this.createSpriteCanvas(14, 14);
+            const ctx = sprite.getContext('2d');
+
+            // Draw bullet as small red circle
+            ctx.fillStyle = '#ff0000';
+            ctx.beginPath();
+            ctx.arc(7, 7, 5, 0, Math.PI * 2);
+            ctx.fill();
+
+            // Add glow effect
+            ctx.strokeStyle = '#ff6666';
+            ctx.lineWidth = 2;
+            ctx.stroke();
+            this.bulletSprite = sprite;
+        }
+        return this.bulletSprite;
+    }
+
+    getLabelSprite(text, font, fillStyle, strokeStyle = null, lineWidth = 0) {
+        const key = `label:${font}:${fillStyle}:${strokeStyle}:${lineWidth}:${text}`;
+
+        return this.cacheSprite(key, () => {
+            const measureCtx = this.createSpriteCanvas(1, 1).getContext('2d');
+            measureCtx.font = font;
+            const metrics = measureCtx.measureText(text);
+            const ascent = metrics.actualBoundingBoxAscent || parseInt(font.match(/\d+/), 10);
+            const descent = metrics.actualBoundingBoxDescent || 0;
+
+            const sprite = this.createSpriteCanvas(metrics.width + lineWidth * 2, ascent + descent + lineWidth * 2);
+            const ctx = sprite.getContext('2d');
+            ctx.font = font;
+            ctx.textAlign = 'left';
+            ctx.textBaseline = 'alphabetic';
+            if (strokeStyle) {
+                ctx.strokeStyle = strokeStyle;
+                ctx.lineWidth = lineWidth;
+                ctx.strokeText(text, lineWidth, lineWidth + ascent);
+            }
+            ctx.fillStyle = fillStyle;
+            ctx.fillText(text, lineWidth, lineWidth + ascent);
+            return sprite;
+        });
     }
 
     drawPlayer(player, isLocal) {
-        const { x, y, angle, size, color } = player;
+        const { x, y, size, color } = player;
+        const sprite = this.getPlayerSprite(color, size, isLocal);
 
-        // Draw player circle
-        this.ctx.fillStyle = color;
-        this.ctx.beginPath();
-        this.ctx.arc(x, y, size, 0, Math.PI * 2);
-        this.ctx.fill();
-
-        // Draw outline for local player
-        if (isLocal) {
-            this.ctx.strokeStyle = '#ffffff';
-            this.ctx.lineWidth = 3;
-            this.ctx.stroke();
-        }
-
-        // Draw gun (line indicating direction)
-        const gunLength = size;
-        const gunEndX = x + Math.cos(angle) * gunLength;
-        const gunEndY = y + Math.sin(angle) * gunLength;
-
-        this.ctx.strokeStyle = '#ffffff';
-        this.ctx.lineWidth = 3;
-        this.ctx.beginPath();
-        this.ctx.moveTo(x, y);
-        this.ctx.lineTo(gunEndX, gunEndY);
-        this.ctx.stroke();
-
-        // Draw gun tip
-        this.ctx.fillStyle = '#ffffff';
-        this.ctx.beginPath();
-        this.ctx.arc(gunEndX, gunEndY, 3, 0, Math.PI * 2);
-        this.ctx.fill();
-    }
-
-    drawBullet(bullet) {
-        const { x, y } = bullet;
-
-        // Draw bullet as small red circle
-        this.ctx.fillStyle = '#ff0000';
-        this.ctx.beginPath();
-        this.ctx.arc(x, y, 5, 0, Math.PI * 2);
-        this.ctx.fill();
-
-        // Add glow effect
-        this.ctx.strokeStyle = '#ff6666';
-        this.ctx.lineWidth = 2;
-        this.ctx.stroke();
+        // Scale the bucket sprite to the exact radius
+        const scale = size / sprite.radius;
+        const drawSize = sprite.width * scale;
+        this.ctx.drawImage(sprite, x - drawSize / 2, y - drawSize / 2, drawSize, drawSize);
+    }
+
+    drawGuns(players) {
+        const ctx = this.ctx;
+
+        // Draw guns (lines indicating direction) as one path
+        ctx.strokeStyle = '#ffffff';
+        ctx.lineWidth = 3;
+        ctx.beginPath();
+        for (const [, player] of players) {
+            ctx.moveTo(player.x, player.y);
+            ctx.lineTo(player.x + Math.cos(player.angle) * player.size, player.y + Math.sin(player.angle) * player.size);
+        }
+        ctx.stroke();
+
+        // Draw gun tips as one path
+        ctx.fillStyle = '#ffffff';
+        ctx.beginPath();
+        for (const [, player] of players) {
+            const gunEndX = player.x + Math.cos(player.angle) * player.size;
+            const gunEndY = player.y + Math.sin(player.angle) * player.size;
+            ctx.moveTo(gunEndX + 3, gunEndY);
+            ctx.arc(gunEndX, gunEndY, 3, 0, Math.PI * 2);
+        }
+        ctx.fill();
+    }
+
+    recordFrameTime(renderTime, frameInterval) {
+        this.frameTimes.push(renderTime);
+        this.frameIntervals.push(frameInterval);
+        if (this.frameTimes.length > 120) {
+            this.frameTimes.shift();
+            this.frameIntervals.shift();
+        }
+    }
+
+    drawFrameStats() {
+        const count = this.frameTimes.length;
+        if (count === 0) return;
+
+        const average = (values) => values.reduce((sum, value) => sum + value, 0) / values.length;
+        const renderAvg = average(this.frameTimes);
+        const renderMax = Math.max(...this.frameTimes);
+        const intervalAvg = average(this.frameIntervals);
+        const dropped = this.frameIntervals.filter((interval) => interval > 1000 / 60 * 1.5).length;
+
+        const lines = [
+            `fps ${(1000 / intervalAvg).toFixed(0)}  frame ${intervalAvg.toFixed(1)} ms`,
+            `render ${renderAvg.toFixed(2)} ms avg / ${renderMax.toFixed(2)} ms max`,
+            `dropped ${dropped}/${count}  sprites ${this.spriteCache.size}`,
+            `players ${Object.keys(this.players).length}  bullets ${Object.keys(this.bullets).length}`
+        ];
+
+        const ctx = this.ctx;
+        ctx.fillStyle = 'rgba(0, 0, 0, 0.6)';
+        ctx.fillRect(8, 8, 250, lines.length * 16 + 8);
+        ctx.font = '12px monospace';
+        ctx.fillStyle = '#00ff88';
+        ctx.textAlign = 'left';
+        ctx.textBaseline = 'top';
+        lines.forEach((line, i) => ctx.fillText(line, 14, 12 + i * 16));
     }
 
     updateUI() {
@@ -2,6 +2,247 @@
  * Client-side 3D game logic for multiplayer tank shooter using Three.js
  */
 
+/**
+ * A growable THREE.InstancedMesh: instances live in one buffer that is reused
+ * across frames, and the buffer is reallocated (doubled) only when it runs out.
+ */
+class InstancePool {
+    constructor(scene, geometry, material, { capacity = 64, colored = false, castShadow = true, receiveShadow = false } = {}) {
+        this.scene = scene;
+        this.geometry = geometry;
+        this.material = material;
+        this.colored = colored;
+        this.castShadow = castShadow;
+        this.receiveShadow = receiveShadow;
+        this.mesh = null;
+        this.allocate(capacity);
+    }
+
+    allocate(capacity) {
+        const mesh = new THREE.InstancedMesh(this.geometry, this.material, capacity);
+        mesh.instanceMatrix.setUsage(THREE.DynamicDrawUsage);
+        mesh.castShadow = this.castShadow;
+        mesh.receiveShadow = this.receiveShadow;
+        // Instances are spread over the whole arena, the geometry bounds do not describe them
+        mesh.frustumCulled = false;
+        if (this.colored) {
+            // Create the color buffer up front so the shader is compiled with instance colors
+            mesh.instanceColor = new THREE.InstancedBufferAttribute(new Float32Array(capacity * 3).fill(1), 3);
+        }
+
+        if (this.mesh) {
+            mesh.instanceMatrix.array.set(this.mesh.instanceMatrix.array);
+            if (this.colored) {
+                mesh.instanceColor.array.set(this.mesh.instanceColor.array);
+            }
+            mesh.count = this.mesh.count;
+            this.scene.remove(this.mesh);
+            this.mesh.dispose();
+        } else {
+            mesh.count = 0;
+        }
+
+        this.capacity = capacity;
+        this.mesh = mesh;
+        this.scene.add(mesh);
+    }
+
+    ensureCapacity(count) {
+        if (count > this.capacity) {
+            let capacity = this.capacity;
+            while (capacity < count) {
+                capacity *= 2;
+            }
+            this.allocate(capacity);
+        }
+    }
+
+    commit(count) {
+        this.mesh.count = count;
+        this.mesh.instanceMatrix.needsUpdate = true;
+        if (this.colored) {
+            this.mesh.instanceColor.needsUpdate = true;
+        }
+    }
+}
+
+/**
+ * Draws all tanks with one InstancedMesh per tank part. Each player owns a
+ * slot; slots stay dense (a leaving player's slot is filled by the last one)
+ * so every part is drawn with a single call regardless of player count.
+ */
+class TankRenderer {
+    constructor(scene) {
+        const box = (w, h, d) => new THREE.BoxGeometry(w, h, d);
+        const cylinder = (top, bottom, height, segments) => new THREE.CylinderGeometry(top, bottom, height, segments);
+
+        // Part layout for a size 20 tank (scale factor 1). tint: 'base' = player color,
+        // 'dark' = player color * 0.8, otherwise a fixed material color.
+        const parts = [
+            // Tank tracks (left and right side)
+            { geometry: box(3, 5, 28), color: 0x2a2a2a, position: [-8, 2.5, 0], receiveShadow: true },
+            { geometry: box(3, 5, 28), color: 0x2a2a2a, position: [8, 2.5, 0], receiveShadow: true },
+            // Main body
+            { geometry: box(12, 6, 26), tint: 'base', position: [0, 6, 0], receiveShadow: true },
+            // Upper hull section, slightly forward
+            { geometry: box(10, 3, 18), tint: 'dark', position: [0, 10.5, 2], receiveShadow: true },
+            // Turret and top hatch
+            { geometry: cylinder(6, 7, 5, 16), tint: 'base', position: [0, 14.5, 0], receiveShadow: true },
+            { geometry: cylinder(2.5, 2.5, 1, 8), tint: 'dark', position: [0, 17.5, -2] },
+            // Barrel and muzzle brake
+            { geometry: cylinder(1.2, 1.5, 20, 12), color: 0x1a1a1a, emissive: 0x0a0a0a, position: [0, 14.5, -14], rotationX: Math.PI / 2, receiveShadow: true },
+            { geometry: cylinder(1.8, 1.8, 2, 8), color: 0x333333, position: [0, 14.5, -24], rotationX: Math.PI / 2 },
+            // Front (angled) and rear armor plates
+            { geometry: box(12, 5, 2), tint: 'dark', position: [0, 7, -14], rotationX: -0.3, receiveShadow: true },
+            { geometry: box(12, 5, 1.5), tint: 'dark', position: [0, 7, 13.5], receiveShadow: true }
+        ];
+
+        this.parts = parts.map(part => {
+            const material = new THREE.MeshLambertMaterial({
+                color: part.tint ? 0xffffff : part.color,
+                emissive: part.emissive || 0x000000
+            });
+            const local = new THREE.Matrix4().compose(
+                new THREE.Vector3(...part.position),
+                new THREE.Quaternion().setFromEuler(new THREE.Euler(part.rotationX || 0, 0, 0)),
+                new THREE.Vector3(1, 1, 1)
+            );
+            const pool = new InstancePool(scene, part.geometry, material, {
+                capacity: 16,
+                colored: Boolean(part.tint),
+                receiveShadow: Boolean(part.receiveShadow)
+            });
+            return { pool, local, tint: part.tint };
+        });
+
+        this.slots = []; // slot -> player id
+        this.slotOf = {}; // player id -> slot
+        this.slotColor = []; // slot -> color key the instance colors were written for
+
+        // Scratch objects reused every frame
+        this.tankMatrix = new THREE.Matrix4();
+        this.partMatrix = new THREE.Matrix4();
+        this.position = new THREE.Vector3();
+        this.rotation = new THREE.Quaternion();
+        this.scale = new THREE.Vector3();
+        this.yAxis = new THREE.Vector3(0, 1, 0);
+        this.baseColor = new THREE.Color();
+        this.darkColor = new THREE.Color();
+    }
+
+    get meshes() {
+        return this.parts.map(part => part.pool.mesh);
+    }
+
+    playerAt(instanceId) {
+        return this.slots[instanceId];
+    }
+
+    remove(id) {
+        const slot = this.slotOf[id];
+        if (slot === undefined) return;
+
+        // Move the last player into the freed slot to keep slots dense
+        const last = this.slots.length - 1;
+        const lastId = this.slots[last];
+        if (slot !== last) {
+            this.slots[slot] = lastId;
+            this.slotOf[lastId] = slot;
+            this.slotColor[slot] = null; // colors are rewritten on the next update
+        }
+        this.slots.pop();
+        this.slotColor.pop();
+        delete this.slotOf[id];
+    }
+
+    update(players, localPlayerId) {
+        // Drop slots of players that are gone
+        for (const id of this.slots.slice()) {
+            if (!players[id]) {
+                this.remove(id);
+            }
+        }
+
+        for (const id in players) {
+            if (this.slotOf[id] === undefined) {
+                this.slotOf[id] = this.slots.length;
+                this.slots.push(id);
+                this.slotColor.push(null);
+            }
+        }
+
+        const count = this.slots.length;
+        for (const part of this.parts) {
+            part.pool.ensureCapacity(count);
+        }
+
+        for (let slot = 0; slot < count; slot++) {
+            const id = this.slots[slot];
+            const player = players[id];
+
+            // Adjust rotation to account for tank barrel pointing along -Z axis when rotation.y = 0
+            // The server uses angle where 0 = +X direction, π/2 = +Z direction
+            const scaleFactor = player.size / 20; // Base size is 20
+            this.position.set(player.x, 0, player.y);
+            this.rotation.setFromAxisAngle(this.yAxis, -(player.angle + Math.PI / 2));
+            this.scale.set(scaleFactor, scaleFactor, scaleFactor);
+            this.tankMatrix.compose(this.position, this.rotation, this.scale);
+
+            for (const part of this.parts) {
+                this.partMatrix.multiplyMatrices(this.tankMatrix, part.local);
+                part.pool.mesh.setMatrixAt(slot, this.partMatrix);
+            }
+
+            // Instance colors change only when a player joins, moves slot or becomes local
+            const isLocal = id === localPlayerId;
+            const colorKey = `${player.color}:${isLocal}`;
+            if (this.slotColor[slot] !== colorKey) {
+                this.slotColor[slot] = colorKey;
+                this.baseColor.set(player.color);
+                this.darkColor.copy(this.baseColor).multiplyScalar(0.8);
+                // Highlight local player (replaces the per-tank emissive material)
+                const highlighted = isLocal ? this.baseColor.clone().lerp(new THREE.Color(0xffffff), 0.2) : this.baseColor;
+                for (const part of this.parts) {
+                    if (part.tint) {
+                        part.pool.mesh.setColorAt(slot, part.tint === 'base' ? highlighted : this.darkColor);
+                    }
+                }
+            }
+        }
+
+        for (const part of this.parts) {
+            part.pool.commit(count);
+        }
+    }
+}
+
+/**
+ * Draws all bullets with a single InstancedMesh whose matrices are rewritten in bulk every frame
+ */
+class BulletRenderer {
+    constructor(scene) {
+        const geometry = new THREE.SphereGeometry(3, 8, 8);
+        const material = new THREE.MeshLambertMaterial({
+            color: 0xff0000,
+            emissive: 0x660000
+        });
+        this.pool = new InstancePool(scene, geometry, material, { capacity: 256 });
+        this.matrix = new THREE.Matrix4();
+    }
+
+    update(bullets) {
+        const list = Object.values(bullets);
+        this.pool.ensureCapacity(list.length);
+
+        const mesh = this.pool.mesh;
+        for (let i = 0; i < list.length; i++) {
+            this.matrix.makeTranslation(list[i].x, 5, list[i].y);
+            mesh.setMatrixAt(i, this.matrix);
+        }
+        this.pool.commit(list.length);
+    }
+}
+
 class Game3D {
     constructor() {
         this.container = document.getElementById('game-canvas-container');
@@ -9,8 +250,6 @@ class Game3D {
         this.playerId = null;
         this.players = {};
         this.bullets = {};
-        this.playerMeshes = {};
-        this.bulletMeshes = {};
         this.localPlayer = {
             x: 0,
             y: 0,
@@ -30,7 +269,13 @@ class Game3D {
         this.config = {
             canvas_width: 800,
             canvas_height: 600,
-            player_speed: 5
+            world_width: 800,
+            world_height: 600,
+            player_speed: 5,
+            physics_fps: 60,
+            broadcast_fps: 20,
+            position_scale: 10,
+            angle_scale: 1000
         };
         this.lastShootTime = 0;
         this.shootCooldown = 250; // milliseconds
@@ -50,15 +295,30 @@ class Game3D {
         this.playerInterpolation = {}; // Stores interpolation data for each remote player
         this.playerUpdateBuffer = {}; // Buffer to store incoming position updates
         this.lastFrameTime = performance.now();
-        // Increased interpolation delay to handle network jitter better
-        // With server broadcasting at 20 FPS (every 50ms), we need enough buffer
-        // to smooth out network latency variations
-        this.interpolationDelay = 150; // ms - intentional delay for smooth interpolation
+        // Snapshots are stamped with server time, so the delay only needs to cover
+        // network jitter; it adapts to the measured jitter (see updateServerClock)
+        this.interpolationDelay = 100; // ms
+        this.minInterpolationDelay = 60; // ms
+        this.maxInterpolationDelay = 250; // ms
+        this.clockOffset = null; // local clock - server clock, ms
+        this.jitter = 0; // smoothed extra delay of recent frames, ms
 
         // Client-side prediction: threshold for server reconciliation
         // Only apply server correction if mismatch is larger than this
         this.serverReconciliationThreshold = 15; // pixels
 
+        // Bullets are simulated locally from bullet_created spawn events,
+        // using a server tick clock that is re-synced on every state frame
+        this.serverTick = 0;
+        this.serverTickTime = 0; // server time of serverTick, ms
+
+        // After a dropped connection the client reconnects with its resume token
+        // and keeps its player, as long as the server's grace period has not run out
+        this.resumeToken = null;
+        this.lastStateTick = 0; // tick of the last state frame received
+        this.reconnectDeadline = 0; // performance.now() until which reconnecting is tried, 0 = connected
+        this.leaving = false; // Set when the page is closed, the socket is closed on purpose
+
         // Death flash effect state
         this.deathFlashActive = false;
         this.deathFlashStartTime = 0;
@@ -73,6 +333,12 @@ class Game3D {
         this.setupWebSocket();
         this.setupControls();
         this.startGameLoop();
+
+        // Leave for good when the page goes away, so the server does not keep our player for a resume
+        window.addEventListener('pagehide', () => {
+            this.leaving = true;
+            if (this.ws) this.ws.close(1000);
+        });
     }
 
     setupThreeJS() {
@@ -87,8 +353,7 @@ class Game3D {
             1,
             2000
         );
-        this.camera.position.set(400, 500, 400);
-        this.camera.lookAt(400, 0, 300);
+        this.updateCamera();
 
         // Create renderer
         this.renderer = new THREE.WebGLRenderer({ antialias: true });
@@ -113,6 +378,7 @@ class Game3D {
         const ambientLight = new THREE.AmbientLight(0x404040, 1.5);
         this.scene.add(ambientLight);
 
+        // The light (and its shadow box) moves with the camera in large worlds
         const directionalLight = new THREE.DirectionalLight(0xffffff, 1);
         directionalLight.position.set(400, 600, 400);
         directionalLight.castShadow = true;
@@ -123,26 +389,15 @@ class Game3D {
         directionalLight.shadow.mapSize.width = 2048;
         directionalLight.shadow.mapSize.height = 2048;
         this.scene.add(directionalLight);
+        this.scene.add(directionalLight.target);
+        this.light = directionalLight;
 
-        // Add ground plane
-        const groundGeometry = new THREE.PlaneGeometry(800, 600);
-        const groundMaterial = new THREE.MeshLambertMaterial({
-            color: 0x1a3a1a,
-            side: THREE.DoubleSide
-        });
-        this.ground = new THREE.Mesh(groundGeometry, groundMaterial);
-        this.ground.rotation.x = -Math.PI / 2;
-        this.ground.position.set(400, 0, 300);
-        this.ground.receiveShadow = true;
-        this.scene.add(this.ground);
-
-        // Add grid helper
-        const gridHelper = new THREE.GridHelper(800, 20, 0x4CAF50, 0x2a2a2a);
-        gridHelper.position.set(400, 0.1, 300);
-        this.scene.add(gridHelper);
+        // Ground, grid and walls, rebuilt when the server reports the world size
+        this.buildArena();
 
-        // Add walls
-        this.createWalls();
+        // Tanks and bullets are drawn with instanced meshes
+        this.tankRenderer = new TankRenderer(this.scene);
+        this.bulletRenderer = new BulletRenderer(this.scene);
 
         // Handle window resize
         window.addEventListener('resize', () => {
@@ -154,212 +409,82 @@ class Game3D {
         });
     }
 
-    createWalls() {
-        const wallHeight = 50;
-        const wallThickness = 5;
-        const wallMaterial = new THREE.MeshLambertMaterial({ color: 0x4CAF50 });
+    buildArena() {
+        const width = this.config.world_width;
+        const height = this.config.world_height;
 
-        // North wall
-        const northWall = new THREE.Mesh(
-            new THREE.BoxGeometry(800, wallHeight, wallThickness),
-            wallMaterial
-        );
-        northWall.position.set(400, wallHeight / 2, 0);
-        northWall.castShadow = true;
-        northWall.receiveShadow = true;
-        this.scene.add(northWall);
-
-        // South wall
-        const southWall = new THREE.Mesh(
-            new THREE.BoxGeometry(800, wallHeight, wallThickness),
-            wallMaterial
-        );
-        southWall.position.set(400, wallHeight / 2, 600);
-        southWall.castShadow = true;
-        southWall.receiveShadow = true;
-        this.scene.add(southWall);
-
-        // West wall
-        const westWall = new THREE.Mesh(
-            new THREE.BoxGeometry(wallThickness, wallHeight, 600),
-            wallMaterial
-        );
-        westWall.position.set(0, wallHeight / 2, 300);
-        westWall.castShadow = true;
-        westWall.receiveShadow = true;
-        this.scene.add(westWall);
-
-        // East wall
-        const eastWall = new THREE.Mesh(
-            new THREE.BoxGeometry(wallThickness, wallHeight, 600),
-            wallMaterial
-        );
-        eastWall.position.set(800, wallHeight / 2, 300);
-        eastWall.castShadow = true;
-        eastWall.receiveShadow = true;
-        this.scene.add(eastWall);
-    }
+        if (this.arena) {
+            if (this.arena.userData.width === width && this.arena.userData.height === height) {
+                return;
+            }
+            this.scene.remove(this.arena);
+            this.arena.traverse((object) => {
+                if (object.geometry) object.geometry.dispose();
+                if (object.material) object.material.dispose();
+            });
+        }
+        this.arena = new THREE.Group();
+        this.arena.userData = { width, height };
 
-    createTankMesh(color, size) {
-        const tank = new THREE.Group();
-        const scaleFactor = size / 20; // Base size is 20
-
-        // Darken the color slightly for better realism
-        const baseColor = new THREE.Color(color);
-        const darkerColor = baseColor.clone().multiplyScalar(0.8);
-        const trackColor = new THREE.Color(0x2a2a2a);
-
-        // Tank tracks (left side)
-        const trackGeometry = new THREE.BoxGeometry(3 * scaleFactor, 5 * scaleFactor, 28 * scaleFactor);
-        const trackMaterial = new THREE.MeshLambertMaterial({ color: trackColor });
-        const leftTrack = new THREE.Mesh(trackGeometry, trackMaterial);
-        leftTrack.position.set(-8 * scaleFactor, 2.5 * scaleFactor, 0);
-        leftTrack.castShadow = true;
-        leftTrack.receiveShadow = true;
-        tank.add(leftTrack);
-
-        // Tank tracks (right side)
-        const rightTrack = new THREE.Mesh(trackGeometry, trackMaterial);
-        rightTrack.position.set(8 * scaleFactor, 2.5 * scaleFactor, 0);
-        rightTrack.castShadow = true;
-        rightTrack.receiveShadow = true;
-        tank.add(rightTrack);
-
-        // Main body (more elongated and realistic)
-        const bodyGeometry = new THREE.BoxGeometry(12 * scaleFactor, 6 * scaleFactor, 26 * scaleFactor);
-        const bodyMaterial = new THREE.MeshLambertMaterial({ color: color });
-        const body = new THREE.Mesh(bodyGeometry, bodyMaterial);
-        body.position.y = 6 * scaleFactor;
-        body.castShadow = true;
-        body.receiveShadow = true;
-        tank.add(body);
-
-        // Upper hull section (adds more detail)
-        const upperHullGeometry = new THREE.BoxGeometry(10 * scaleFactor, 3 * scaleFactor, 18 * scaleFactor);
-        const upperHullMaterial = new THREE.MeshLambertMaterial({ color: darkerColor });
-        const upperHull = new THREE.Mesh(upperHullGeometry, upperHullMaterial);
-        upperHull.position.y = 10.5 * scaleFactor;
-        upperHull.position.z = 2 * scaleFactor; // Slightly forward
-        upperHull.castShadow = true;
-        upperHull.receiveShadow = true;
-        tank.add(upperHull);
-
-        // Tank turret (more realistic proportions)
-        const turretGeometry = new THREE.CylinderGeometry(
-            6 * scaleFactor,
-            7 * scaleFactor,
-            5 * scaleFactor,
-            16
-        );
-        const turretMaterial = new THREE.MeshLambertMaterial({ color: color });
-        const turret = new THREE.Mesh(turretGeometry, turretMaterial);
-        turret.position.y = 14.5 * scaleFactor;
-        turret.position.z = 0;
-        turret.castShadow = true;
-        turret.receiveShadow = true;
-        tank.add(turret);
-
-        // Turret top hatch detail
-        const hatchGeometry = new THREE.CylinderGeometry(
-            2.5 * scaleFactor,
-            2.5 * scaleFactor,
-            1 * scaleFactor,
-            8
-        );
-        const hatchMaterial = new THREE.MeshLambertMaterial({ color: darkerColor });
-        const hatch = new THREE.Mesh(hatchGeometry, hatchMaterial);
-        hatch.position.y = 17.5 * scaleFactor;
-        hatch.position.z = -2 * scaleFactor;
-        hatch.castShadow = true;
-        tank.add(hatch);
-
-        // Tank barrel (gun) - longer and more prominent
-        const barrelGeometry = new THREE.CylinderGeometry(
-            1.2 * scaleFactor,
-            1.5 * scaleFactor,
-            20 * scaleFactor,
-            12
-        );
-        const barrelMaterial = new THREE.MeshLambertMaterial({
-            color: 0x1a1a1a,
-            emissive: 0x0a0a0a
+        // Add ground plane
+        const groundGeometry = new THREE.PlaneGeometry(width, height);
+        const groundMaterial = new THREE.MeshLambertMaterial({
+            color: 0x1a3a1a,
+            side: THREE.DoubleSide
         });
-        const barrel = new THREE.Mesh(barrelGeometry, barrelMaterial);
-        barrel.rotation.x = Math.PI / 2;
-        barrel.position.y = 14.5 * scaleFactor;
-        barrel.position.z = -14 * scaleFactor;
-        barrel.castShadow = true;
-        barrel.receiveShadow = true;
-        tank.add(barrel);
-
-        // Barrel muzzle brake (realistic detail)
-        const muzzleGeometry = new THREE.CylinderGeometry(
-            1.8 * scaleFactor,
-            1.8 * scaleFactor,
-            2 * scaleFactor,
-            8
-        );
-        const muzzleMaterial = new THREE.MeshLambertMaterial({ color: 0x333333 });
-        const muzzle = new THREE.Mesh(muzzleGeometry, muzzleMaterial);
-        muzzle.rotation.x = Math.PI / 2;
-        muzzle.position.y = 14.5 * scaleFactor;
-        muzzle.position.z = -24 * scaleFactor;
-        muzzle.castShadow = true;
-        tank.add(muzzle);
-
-        // Front armor plate (angled for realism)
-        const frontArmorGeometry = new THREE.BoxGeometry(12 * scaleFactor, 5 * scaleFactor, 2 * scaleFactor);
-        const frontArmorMaterial = new THREE.MeshLambertMaterial({ color: darkerColor });
-        const frontArmor = new THREE.Mesh(frontArmorGeometry, frontArmorMaterial);
-        frontArmor.position.y = 7 * scaleFactor;
-        frontArmor.position.z = -14 * scaleFactor;
-        frontArmor.rotation.x = -0.3; // Slight angle
-        frontArmor.castShadow = true;
-        frontArmor.receiveShadow = true;
-        tank.add(frontArmor);
-
-        // Rear armor plate
-        const rearArmorGeometry = new THREE.BoxGeometry(12 * scaleFactor, 5 * scaleFactor, 1.5 * scaleFactor);
-        const rearArmorMaterial = new THREE.MeshLambertMaterial({ color: darkerColor });
-        const rearArmor = new THREE.Mesh(rearArmorGeometry, rearArmorMaterial);
-        rearArmor.position.y = 7 * scaleFactor;
-        rearArmor.position.z = 13.5 * scaleFactor;
-        rearArmor.castShadow = true;
-        rearArmor.receiveShadow = true;
-        tank.add(rearArmor);
-
-        // Store references for later use
-        tank.userData.body = body;
-        tank.userData.turret = turret;
-        tank.userData.barrel = barrel;
-        tank.userData.scaleFactor = scaleFactor;
-
-        return tank;
-    }
+        this.ground = new THREE.Mesh(groundGeometry, groundMaterial);
+        this.ground.rotation.x = -Math.PI / 2;
+        this.ground.position.set(width / 2, 0, height / 2);
+        this.ground.receiveShadow = true;
+        this.arena.add(this.ground);
 
-    updateTankScale(tank, newSize) {
-        const scaleFactor = newSize / 20;
-        const oldScaleFactor = tank.userData.scaleFactor;
-        const scaleRatio = scaleFactor / oldScaleFactor;
+        // Add grid helper (40 units per cell)
+        const gridSize = Math.max(width, height);
+        const gridHelper = new THREE.GridHelper(gridSize, Math.round(gridSize / 40), 0x4CAF50, 0x2a2a2a);
+        gridHelper.position.set(width / 2, 0.1, height / 2);
+        this.arena.add(gridHelper);
 
-        // Update all parts
-        tank.children.forEach(child => {
-            child.scale.multiplyScalar(scaleRatio);
-            child.position.multiplyScalar(scaleRatio);
-        });
+        this.createWalls(width, height);
+        this.scene.add(this.arena);
+    }
+
+    createWalls(width, height) {
+        const wallHeight = 50;
+        const wallThickness = 5;
+        const wallMaterial = new THREE.MeshLambertMaterial({ color: 0x4CAF50 });
 
-        tank.userData.scaleFactor = scaleFactor;
+        // North, south, west and east walls: [size x, size z, position x, position z]
+        const walls = [
+            [width, wallThickness, width / 2, 0],
+            [width, wallThickness, width / 2, height],
+            [wallThickness, height, 0, height / 2],
+            [wallThickness, height, width, height / 2]
+        ];
+        for (const [sizeX, sizeZ, x, z] of walls) {
+            const wall = new THREE.Mesh(new THREE.BoxGeometry(sizeX, wallHeight, sizeZ), wallMaterial);
+            wall.position.set(x, wallHeight / 2, z);
+            wall.castShadow = true;
+            wall.receiveShadow = true;
+            this.arena.add(wall);
+        }
     }
 
-    createBulletMesh() {
-        const bulletGeometry = new THREE.SphereGeometry(3, 8, 8);
-        const bulletMaterial = new THREE.MeshLambertMaterial({
-            color: 0xff0000,
-            emissive: 0x660000
-        });
-        const bullet = new THREE.Mesh(bulletGeometry, bulletMaterial);
-        bullet.castShadow = true;
-        return bullet;
+    updateCamera() {
+        // Look at the local player, clamped so the view never leaves the world.
+        // A world the size of the canvas keeps the fixed view of its center.
+        const halfWidth = this.config.canvas_width / 2;
+        const halfHeight = this.config.canvas_height / 2;
+        const clamp = (value, min, max) => Math.max(min, Math.min(max, value));
+        const player = this.localPlayer;
+        const x = clamp(player ? player.x : 0, halfWidth, Math.max(halfWidth, this.config.world_width - halfWidth));
+        const z = clamp(player ? player.y : 0, halfHeight, Math.max(halfHeight, this.config.world_height - halfHeight));
+
+        this.camera.position.set(x, 500, z + 100);
+        this.camera.lookAt(x, 0, z);
+        if (this.light) {
+            this.light.position.set(x, 600, z + 100);
+            this.light.target.position.set(x - 400, 0, z - 300);
+        }
     }
 
     setupNameModal() {
@@ -402,6 +527,16 @@ class Game3D {
             const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
             wsUrl = `${protocol}//${window.location.host}/ws`;
         }
+        if (this.reconnectDeadline && this.resumeToken) {
+            const url = new URL(wsUrl);
+            // The launcher routes by ?room, resume in the room the player is in
+            if (this.config.room != null) {
+                url.searchParams.set('room', this.config.room);
+            }
+            url.searchParams.set('resume', this.resumeToken);
+            url.searchParams.set('tick', this.lastStateTick);
+            wsUrl = url.toString();
+        }
 
         console.log('Connecting to WebSocket:', wsUrl);
         this.ws = new WebSocket(wsUrl);
@@ -427,41 +562,102 @@ class Game3D {
 
         this.ws.onerror = (error) => {
             console.error('WebSocket error:', error);
+            if (this.reconnectDeadline) return; // onclose retries
             this.updateStatus('Connection Error', false);
             this.showError('Connection error occurred');
         };
 
         this.ws.onclose = () => {
             console.log('Disconnected from server');
+            if (this.tryReconnect()) return;
             this.updateStatus('Disconnected', false);
             this.showError('Disconnected from server. Refresh to reconnect.');
         };
     }
 
+    tryReconnect() {
+        // Retry within the server's grace period; the server keeps our player until then
+        const grace = (this.config.resume_grace || 0) * 1000;
+        if (this.leaving || !this.resumeToken || !grace) return false;
+
+        const now = performance.now();
+        if (!this.reconnectDeadline) {
+            this.reconnectDeadline = now + grace;
+        } else if (now >= this.reconnectDeadline) {
+            this.reconnectDeadline = 0;
+            return false;
+        }
+        this.updateStatus('Reconnecting...', false);
+        setTimeout(() => this.setupWebSocket(), 1000);
+        return true;
+    }
+
     handleMessage(message) {
         switch (message.type) {
-            case 'init':
+            case 'init': {
+                // A reconnect that could not resume joins as a new player; keep the chosen name
+                const previousName = this.reconnectDeadline && this.localPlayer ? this.localPlayer.name : null;
+                this.reconnectDeadline = 0;
+                this.resumeToken = message.resume_token;
                 this.playerId = message.player_id;
                 this.localPlayer = message.player;
                 this.players[this.playerId] = this.localPlayer;
                 this.config = message.config;
                 console.log('Initialized as player:', this.playerId);
+                this.buildArena();
+
+                // Bullets already in flight
+                this.updateServerClock(message.time);
+                this.syncServerTick(message.tick, message.time);
+                this.bullets = {};
+                for (const bullet of Object.values(message.bullets || {})) {
+                    this.addBullet(bullet, message.tick);
+                }
 
                 const nameInput = document.getElementById('player-name-input');
                 if (nameInput) {
                     nameInput.value = this.localPlayer.name;
                 }
+                if (previousName && previousName !== this.localPlayer.name) {
+                    this.sendNameChange(previousName);
+                }
                 break;
+            }
+
+            case 'resumed': {
+                // Same player as before the drop: nobody saw us leave. Take the server's
+                // view of our player and bullets; the next state frame updates everyone else
+                this.reconnectDeadline = 0;
+                this.resumeToken = message.resume_token;
+                Object.assign(this.localPlayer, message.player);
+                this.players[this.playerId] = this.localPlayer;
+                this.updateServerClock(message.time);
+                this.syncServerTick(message.tick, message.time);
+
+                const inFlight = new Set(message.bullet_ids);
+                for (const bulletId of Object.keys(this.bullets)) {
+                    if (!inFlight.has(bulletId)) {
+                        delete this.bullets[bulletId];
+                    }
+                }
+                for (const bullet of Object.values(message.bullets)) {
+                    this.addBullet(bullet, message.tick);
+                }
+                console.log('Resumed as player:', this.playerId, 'missed ticks:', message.tick - message.since_tick);
+                break;
+            }
 
             case 'state':
                 // Use buffered interpolation for smooth movement
-                const currentTime = performance.now();
-
-                // Update bullets directly (no interpolation needed)
-                this.bullets = message.data.bullets;
+                // Re-sync the server clock used for interpolation and bullet simulation
+                this.updateServerClock(message.time);
+                this.syncServerTick(message.tick, message.time);
+                this.lastStateTick = message.tick;
 
                 // Process each player in the server update
-                for (const [id, newPlayerData] of Object.entries(message.data.players)) {
+                for (const [id, quantizedData] of Object.entries(message.data.players)) {
+                    const newPlayerData = this.decodePlayerState(id, quantizedData);
+
                     // Add or update player in our local state
                     if (!this.players[id]) {
                         this.players[id] = { ...newPlayerData };
@@ -508,7 +704,7 @@ class Game3D {
                         x: newPlayerData.x,
                         y: newPlayerData.y,
                         angle: newPlayerData.angle,
-                        timestamp: currentTime
+                        timestamp: message.time
                     });
 
                     // Keep only last 5 updates (prevents buffer from growing unbounded)
@@ -530,9 +726,22 @@ class Game3D {
                     }
                 }
 
+                // Players outside this client's view are not streamed (large worlds);
+                // forget them until they come back into view. Budgeted frames leave out
+                // players in view too, those frames list the ones that left the view in "gone"
+                const gone = message.gone || Object.keys(this.players).filter(id => !(id in message.data.players));
+                for (const id of gone) {
+                    if (id !== this.playerId) {
+                        delete this.players[id];
+                        delete this.playerInterpolation[id];
+                        delete this.playerUpdateBuffer[id];
+                    }
+                }
+
                 // Handle hits
                 if (message.hits && message.hits.length > 0) {
                     message.hits.forEach(hit => {
+                        delete this.bullets[hit.bullet_id];
                         if (hit.player_id === this.playerId) {
                             this.startDeathFlash();
                         }
@@ -546,19 +755,22 @@ class Game3D {
                 break;
 
             case 'player_left':
-                // Remove mesh from scene
-                if (this.playerMeshes[message.player_id]) {
-                    this.scene.remove(this.playerMeshes[message.player_id]);
-                    delete this.playerMeshes[message.player_id];
-                }
+                // Free the player's tank instance
+                this.tankRenderer.remove(message.player_id);
                 delete this.players[message.player_id];
+                // The server removes a leaving player's bullets with them
+                for (const [bulletId, bullet] of Object.entries(this.bullets)) {
+                    if (bullet.owner_id === message.player_id) {
+                        delete this.bullets[bulletId];
+                    }
+                }
                 delete this.playerInterpolation[message.player_id];
                 delete this.playerUpdateBuffer[message.player_id];
                 console.log('Player left:', message.player_id);
                 break;
 
             case 'bullet_created':
-                this.bullets[message.bullet.id] = message.bullet;
+                this.addBullet(message.bullet, message.tick);
                 break;
 
             case 'player_name_changed':
@@ -687,6 +899,7 @@ class Game3D {
 
             this.update();
             this.updateInterpolation(deltaTime);
+            this.updateBullets();
             this.render3D();
             requestAnimationFrame(loop);
         };
@@ -694,8 +907,8 @@ class Game3D {
     }
 
     updateInterpolation(deltaTime) {
-        const currentTime = performance.now();
-        const renderTime = currentTime - this.interpolationDelay;
+        // Render remote players in the past on the server timeline
+        const renderTime = this.serverNow() - this.interpolationDelay;
 
         // Update interpolation for all remote players using buffered updates
         for (const [id, buffer] of Object.entries(this.playerUpdateBuffer)) {
@@ -793,6 +1006,86 @@ class Game3D {
         }
     }
 
+    updateServerClock(serverTime) {
+        // Offset between the local clock and server time, taken from the least delayed
+        // frame seen so far. It creeps up slowly so clock drift and route changes are absorbed.
+        const offset = performance.now() - serverTime;
+        if (this.clockOffset === null || offset < this.clockOffset) {
+            this.clockOffset = offset;
+        } else {
+            this.clockOffset += 0.02;
+        }
+
+        // Adaptive jitter buffer: delay = one broadcast interval plus twice the smoothed
+        // extra delay of recent frames, so a quiet network gets a small delay
+        const extraDelay = offset - this.clockOffset;
+        this.jitter += (extraDelay - this.jitter) * 0.1;
+        const broadcastInterval = 1000 / this.config.broadcast_fps;
+        const targetDelay = Math.min(this.maxInterpolationDelay,
+            Math.max(this.minInterpolationDelay, broadcastInterval + 2 * this.jitter));
+        this.interpolationDelay += (targetDelay - this.interpolationDelay) * 0.05;
+    }
+
+    serverNow() {
+        return performance.now() - (this.clockOffset || 0);
+    }
+
+    decodePlayerState(id, data) {
+        // State frames carry fixed-point integers (see position_scale / angle_scale)
+        const scale = this.config.position_scale;
+        return {
+            id: id,
+            x: data.x / scale,
+            y: data.y / scale,
+            angle: data.angle / this.config.angle_scale,
+            size: data.size / scale,
+            name: data.name,
+            color: data.color
+        };
+    }
+
+    syncServerTick(tick, serverTime) {
+        this.serverTick = tick;
+        this.serverTickTime = serverTime;
+    }
+
+    estimateServerTick() {
+        const elapsed = this.serverNow() - this.serverTickTime;
+        return this.serverTick + elapsed * this.config.physics_fps / 1000;
+    }
+
+    addBullet(bullet, tick) {
+        // Never let the tick clock lag behind a spawn we already know about
+        if (tick > this.estimateServerTick()) {
+            this.syncServerTick(tick, this.serverNow());
+        }
+        this.bullets[bullet.id] = {
+            ...bullet,
+            originX: bullet.x,
+            originY: bullet.y,
+            spawnTick: tick
+        };
+    }
+
+    updateBullets() {
+        // Bullets fly in a straight line at constant velocity (one step per server tick),
+        // so their position is fully determined by the spawn event
+        const tick = this.estimateServerTick();
+        const maxTicks = 5 * this.config.physics_fps; // Server removes bullets after 5 seconds
+
+        for (const [id, bullet] of Object.entries(this.bullets)) {
+            const ticks = Math.max(0, tick - bullet.spawnTick);
+            bullet.x = bullet.originX + bullet.vx * ticks;
+            bullet.y = bullet.originY + bullet.vy * ticks;
+
+            if (bullet.x < 0 || bullet.x > this.config.world_width ||
+                bullet.y < 0 || bullet.y > this.config.world_height ||
+                ticks > maxTicks) {
+                delete this.bullets[id];
+            }
+        }
+    }
+
     easeOutCubic(t) {
         return 1 - Math.pow(1 - t, 3);
     }
@@ -855,8 +1148,8 @@ class Game3D {
         }
 
         // Clamp position, considering player size (radius) to prevent going beyond boundaries
-        this.localPlayer.x = Math.max(this.localPlayer.size, Math.min(this.config.canvas_width - this.localPlayer.size, this.localPlayer.x));
-        this.localPlayer.y = Math.max(this.localPlayer.size, Math.min(this.config.canvas_height - this.localPlayer.size, this.localPlayer.y));
+        this.localPlayer.x = Math.max(this.localPlayer.size, Math.min(this.config.world_width - this.localPlayer.size, this.localPlayer.x));
+        this.localPlayer.y = Math.max(this.localPlayer.size, Math.min(this.config.world_height - this.localPlayer.size, this.localPlayer.y));
 
         if (moved) {
             const now = Date.now();
@@ -930,16 +1223,16 @@ class Game3D {
 
         let hoveredPlayerId = null;
 
-        // Check intersection with player meshes
-        for (const [id, mesh] of Object.entries(this.playerMeshes)) {
-            const intersects = this.raycaster.intersectObject(mesh, true);
-            if (intersects.length > 0 && this.players[id]) {
+        // Check intersection with tank instances
+        const intersects = this.raycaster.intersectObjects(this.tankRenderer.meshes);
+        if (intersects.length > 0) {
+            const id = this.tankRenderer.playerAt(intersects[0].instanceId);
+            if (this.players[id]) {
                 hoveredPlayerId = id;
                 tooltip.textContent = this.players[id].name || id;
                 tooltip.style.display = 'block';
                 tooltip.style.left = `${screenX + 10}px`;
                 tooltip.style.top = `${screenY + 10}px`;
-                break;
             }
         }
 
@@ -951,62 +1244,11 @@ class Game3D {
     }
 
     render3D() {
-        // Update player meshes
-        for (const [id, player] of Object.entries(this.players)) {
-            if (!this.playerMeshes[id]) {
-                // Create new tank mesh
-                this.playerMeshes[id] = this.createTankMesh(player.color, player.size);
-                this.scene.add(this.playerMeshes[id]);
-            }
-
-            const mesh = this.playerMeshes[id];
-            mesh.position.x = player.x;
-            mesh.position.z = player.y;
-            // Adjust rotation to account for tank barrel pointing along -Z axis when rotation.y = 0
-            // The server uses angle where 0 = +X direction, π/2 = +Z direction
-            // We need to rotate the tank so barrel points from -Z (at rotation.y=0) to the correct direction
-            mesh.rotation.y = -(player.angle + Math.PI / 2);
-
-            // Update scale if size changed
-            const expectedScaleFactor = player.size / 20;
-            if (Math.abs(mesh.userData.scaleFactor - expectedScaleFactor) > 0.01) {
-                this.updateTankScale(mesh, player.size);
-            }
-
-            // Highlight local player
-            if (id === this.playerId) {
-                mesh.userData.body.material.emissive = new THREE.Color(0x333333);
-            }
-        }
-
-        // Remove meshes for players that left
-        for (const id in this.playerMeshes) {
-            if (!this.players[id]) {
-                this.scene.remove(this.playerMeshes[id]);
-                delete this.playerMeshes[id];
-            }
-        }
+        this.updateCamera();
 
-        // Update bullet meshes
-        for (const [id, bullet] of Object.entries(this.bullets)) {
-            if (!this.bulletMeshes[id]) {
-                this.bulletMeshes[id] = this.createBulletMesh();
-                this.scene.add(this.bulletMeshes[id]);
-            }
-
-            const mesh = this.bulletMeshes[id];
-            mesh.position.x = bullet.x;
-            mesh.position.y = 5;
-            mesh.position.z = bullet.y;
-        }
-
-        // Remove meshes for bullets that no longer exist
-        for (const id in this.bulletMeshes) {
-            if (!this.bullets[id]) {
-                this.scene.remove(this.bulletMeshes[id]);
-                delete this.bulletMeshes[id];
-            }
-        }
+        // Update tank and bullet instances in bulk
+        this.tankRenderer.update(this.players, this.playerId);
+        this.bulletRenderer.update(this.bullets);
 
         // Update UI
         this.updateUI();
@@ -20,7 +20,13 @@ class PhaserGame {
         this.config = {
             canvas_width: 800,
             canvas_height: 600,
-            player_speed: 5
+            world_width: 800,
+            world_height: 600,
+            player_speed: 5,
+            physics_fps: 60,
+            broadcast_fps: 20,
+            position_scale: 10,
+            angle_scale: 1000
         };
         this.lastShootTime = 0;
         this.shootCooldown = 250;
@@ -37,12 +43,30 @@ class PhaserGame {
         // Interpolation state
         this.playerInterpolation = {};
         this.playerUpdateBuffer = {};
-        this.interpolationDelay = 150;
+        // Snapshots are stamped with server time, so the delay only needs to cover
+        // network jitter; it adapts to the measured jitter (see updateServerClock)
+        this.interpolationDelay = 100; // ms
+        this.minInterpolationDelay = 60; // ms
+        this.maxInterpolationDelay = 250; // ms
+        this.clockOffset = null; // local clock - server clock, ms
+        this.jitter = 0; // smoothed extra delay of recent frames, ms
 
         // Client-side prediction: threshold for server reconciliation
         // Only apply server correction if mismatch is larger than this
         this.serverReconciliationThreshold = 15; // pixels
 
+        // Bullets are simulated locally from bullet_created spawn events,
+        // using a server tick clock that is re-synced on every state frame
+        this.serverTick = 0;
+        this.serverTickTime = 0; // server time of serverTick, ms
+
+        // After a dropped connection the client reconnects with its resume token
+        // and keeps its player, as long as the server's grace period has not run out
+        this.resumeToken = null;
+        this.lastStateTick = 0; // tick of the last state frame received
+        this.reconnectDeadline = 0; // performance.now() until which reconnecting is tried, 0 = connected
+        this.leaving = false; // Set when the page is closed, the socket is closed on purpose
+
         // Death flash effect state
         this.deathFlashActive = false;
         this.deathFlashStartTime = 0;
@@ -61,6 +85,12 @@ class PhaserGame {
         this.setupNameModal();
         this.setupPhaserGame();
         this.setupWebSocket();
+
+        // Leave for good when the page goes away, so the server does not keep our player for a resume
+        window.addEventListener('pagehide', () => {
+            this.leaving = true;
+            if (this.ws) this.ws.close(1000);
+        });
     }
 
     setupNameModal() {
@@ -114,21 +144,14 @@ class PhaserGame {
                 // Set up background
                 this.cameras.main.setBackgroundColor('#0a0a0a');
 
-                // Create grid graphics
-                const graphics = this.add.graphics();
-                graphics.lineStyle(1, 0x1a1a1a, 1);
+                // Grid graphics, redrawn when the server reports the world size
+                this.gridGraphics = this.add.graphics();
+                self.drawWorld();
 
-                // Draw grid
-                for (let x = 0; x < 800; x += 50) {
-                    graphics.lineBetween(x, 0, x, 600);
-                }
-                for (let y = 0; y < 600; y += 50) {
-                    graphics.lineBetween(0, y, 800, y);
-                }
-
-                // Create death flash overlay (initially invisible)
+                // Create death flash overlay (initially invisible), fixed to the screen
                 this.deathFlashGraphics = this.add.graphics();
                 this.deathFlashGraphics.setDepth(1000);
+                this.deathFlashGraphics.setScrollFactor(0);
 
                 // Create death message text (initially invisible)
                 this.deathMessageText = this.add.text(400, 300, 'Вы убиты', {
@@ -141,6 +164,7 @@ class PhaserGame {
                 });
                 this.deathMessageText.setOrigin(0.5, 0.5);
                 this.deathMessageText.setDepth(1001);
+                this.deathMessageText.setScrollFactor(0);
                 this.deathMessageText.setVisible(false);
 
                 // Enable input
@@ -165,7 +189,10 @@ class PhaserGame {
 
             update() {
                 self.updateGame();
+                self.updateCamera();
                 self.updateInterpolation();
+                self.updateBullets();
+                self.renderBullets();
                 self.updateDeathFlash();
             }
         }
@@ -189,6 +216,33 @@ class PhaserGame {
         this.phaserGame = new Phaser.Game(config);
     }
 
+    drawWorld() {
+        // Grid over the whole world; worlds larger than the canvas also get a border
+        const graphics = this.gameScene.gridGraphics;
+        const width = this.config.world_width;
+        const height = this.config.world_height;
+        graphics.clear();
+        graphics.lineStyle(1, 0x1a1a1a, 1);
+        for (let x = 0; x < width; x += 50) {
+            graphics.lineBetween(x, 0, x, height);
+        }
+        for (let y = 0; y < height; y += 50) {
+            graphics.lineBetween(0, y, width, y);
+        }
+        if (width > this.config.canvas_width || height > this.config.canvas_height) {
+            graphics.lineStyle(2, 0x4CAF50, 1);
+            graphics.strokeRect(0, 0, width, height);
+        }
+        this.gameScene.cameras.main.setBounds(0, 0, width, height);
+    }
+
+    updateCamera() {
+        // The camera follows the local player; bounds keep it inside the world,
+        // so it does not move at all when the world fits the canvas
+        if (!this.localPlayer) return;
+        this.gameScene.cameras.main.centerOn(this.localPlayer.x, this.localPlayer.y);
+    }
+
     setupWebSocket() {
         let wsUrl;
         if (window.GAME_CONFIG && window.GAME_CONFIG.wsUrl) {
@@ -197,6 +251,16 @@ class PhaserGame {
             const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
             wsUrl = `${protocol}//${window.location.host}/ws`;
         }
+        if (this.reconnectDeadline && this.resumeToken) {
+            const url = new URL(wsUrl);
+            // The launcher routes by ?room, resume in the room the player is in
+            if (this.config.room != null) {
+                url.searchParams.set('room', this.config.room);
+            }
+            url.searchParams.set('resume', this.resumeToken);
+            url.searchParams.set('tick', this.lastStateTick);
+            wsUrl = url.toString();
+        }
 
         console.log('Connecting to WebSocket:', wsUrl);
         this.ws = new WebSocket(wsUrl);
@@ -222,37 +286,101 @@ class PhaserGame {
 
         this.ws.onerror = (error) => {
             console.error('WebSocket error:', error);
+            if (this.reconnectDeadline) return; // onclose retries
             this.updateStatus('Connection Error', false);
             this.showError('Connection error occurred');
         };
 
         this.ws.onclose = () => {
             console.log('Disconnected from server');
+            if (this.tryReconnect()) return;
             this.updateStatus('Disconnected', false);
             this.showError('Disconnected from server. Refresh to reconnect.');
         };
     }
 
+    tryReconnect() {
+        // Retry within the server's grace period; the server keeps our player until then
+        const grace = (this.config.resume_grace || 0) * 1000;
+        if (this.leaving || !this.resumeToken || !grace) return false;
+
+        const now = performance.now();
+        if (!this.reconnectDeadline) {
+            this.reconnectDeadline = now + grace;
+        } else if (now >= this.reconnectDeadline) {
+            this.reconnectDeadline = 0;
+            return false;
+        }
+        this.updateStatus('Reconnecting...', false);
+        setTimeout(() => this.setupWebSocket(), 1000);
+        return true;
+    }
+
     handleMessage(message) {
         switch (message.type) {
-            case 'init':
+            case 'init': {
+                // A reconnect that could not resume joins as a new player; keep the chosen name
+                const previousName = this.reconnectDeadline && this.localPlayer ? this.localPlayer.name : null;
+                this.reconnectDeadline = 0;
+                this.resumeToken = message.resume_token;
                 this.playerId = message.player_id;
                 this.localPlayer = message.player;
                 this.players[this.playerId] = this.localPlayer;
                 this.config = message.config;
                 console.log('Initialized as player:', this.playerId);
+                if (this.gameScene) {
+                    this.drawWorld();
+                }
+
+                // Bullets already in flight
+                this.updateServerClock(message.time);
+                this.syncServerTick(message.tick, message.time);
+                this.bullets = {};
+                for (const bullet of Object.values(message.bullets || {})) {
+                    this.addBullet(bullet, message.tick);
+                }
 
                 const nameInput = document.getElementById('player-name-input');
                 if (nameInput) {
                     nameInput.value = this.localPlayer.name;
                 }
+                if (previousName && previousName !== this.localPlayer.name) {
+                    this.sendNameChange(previousName);
+                }
+                break;
+            }
+
+            case 'resumed': {
+                // Same player as before the drop: nobody saw us leave. Take the server's
+                // view of our player and bullets; the next state frame updates everyone else
+                this.reconnectDeadline = 0;
+                this.resumeToken = message.resume_token;
+                Object.assign(this.localPlayer, message.player);
+                this.players[this.playerId] = this.localPlayer;
+                this.updateServerClock(message.time);
+                this.syncServerTick(message.tick, message.time);
+
+                const inFlight = new Set(message.bullet_ids);
+                for (const bulletId of Object.keys(this.bullets)) {
+                    if (!inFlight.has(bulletId)) {
+                        delete this.bullets[bulletId];
+                    }
+                }
+                for (const bullet of Object.values(message.bullets)) {
+                    this.addBullet(bullet, message.tick);
+                }
+                console.log('Resumed as player:', this.playerId, 'missed ticks:', message.tick - message.since_tick);
                 break;
+            }
 
             case 'state':
-                const currentTime = performance.now();
-                this.bullets = message.data.bullets;
+                this.updateServerClock(message.time);
+                this.syncServerTick(message.tick, message.time);
+                this.lastStateTick = message.tick;
+
+                for (const [id, quantizedData] of Object.entries(message.data.players)) {
+                    const newPlayerData = this.decodePlayerState(id, quantizedData);
 
-                for (const [id, newPlayerData] of Object.entries(message.data.players)) {
                     if (!this.players[id]) {
                         this.players[id] = { ...newPlayerData };
                     }
@@ -294,7 +422,7 @@ class PhaserGame {
                         x: newPlayerData.x,
                         y: newPlayerData.y,
                         angle: newPlayerData.angle,
-                        timestamp: currentTime
+                        timestamp: message.time
                     });
 
                     if (this.playerUpdateBuffer[id].length > 5) {
@@ -313,8 +441,21 @@ class PhaserGame {
                     }
                 }
 
+                // Players outside this client's view are not streamed (large worlds);
+                // forget them until they come back into view. Budgeted frames leave out
+                // players in view too, those frames list the ones that left the view in "gone"
+                const gone = message.gone || Object.keys(this.players).filter(id => !(id in message.data.players));
+                for (const id of gone) {
+                    if (id !== this.playerId) {
+                        delete this.players[id];
+                        delete this.playerInterpolation[id];
+                        delete this.playerUpdateBuffer[id];
+                    }
+                }
+
                 if (message.hits && message.hits.length > 0) {
                     message.hits.forEach(hit => {
+                        delete this.bullets[hit.bullet_id];
                         if (hit.player_id === this.playerId) {
                             this.startDeathFlash();
                         }
@@ -322,7 +463,6 @@ class PhaserGame {
                 }
 
                 this.renderPlayers();
-                this.renderBullets();
                 break;
 
             case 'player_joined':
@@ -332,6 +472,12 @@ class PhaserGame {
 
             case 'player_left':
                 delete this.players[message.player_id];
+                // The server removes a leaving player's bullets with them
+                for (const [bulletId, bullet] of Object.entries(this.bullets)) {
+                    if (bullet.owner_id === message.player_id) {
+                        delete this.bullets[bulletId];
+                    }
+                }
                 delete this.playerInterpolation[message.player_id];
                 delete this.playerUpdateBuffer[message.player_id];
                 if (this.playerSprites[message.player_id]) {
@@ -347,7 +493,7 @@ class PhaserGame {
                 break;
 
             case 'bullet_created':
-                this.bullets[message.bullet.id] = message.bullet;
+                this.addBullet(message.bullet, message.tick);
                 break;
 
             case 'player_name_changed':
@@ -376,8 +522,9 @@ class PhaserGame {
     handlePointerMove(pointer) {
         if (!this.playerId || !this.gameScene) return;
 
-        const mouseX = pointer.x;
-        const mouseY = pointer.y;
+        // World coordinates, the camera may be scrolled
+        const mouseX = pointer.worldX;
+        const mouseY = pointer.worldY;
 
         const dx = mouseX - this.localPlayer.x;
         const dy = mouseY - this.localPlayer.y;
@@ -398,8 +545,9 @@ class PhaserGame {
         // Update cannon angle towards tap/click position and shoot
         if (!this.playerId) return;
 
-        const mouseX = pointer.x;
-        const mouseY = pointer.y;
+        // World coordinates, the camera may be scrolled
+        const mouseX = pointer.worldX;
+        const mouseY = pointer.worldY;
 
         const dx = mouseX - this.localPlayer.x;
         const dy = mouseY - this.localPlayer.y;
@@ -476,8 +624,8 @@ class PhaserGame {
         }
 
         // Clamp position, considering player size (radius) to prevent going beyond boundaries
-        this.localPlayer.x = Math.max(this.localPlayer.size, Math.min(this.config.canvas_width - this.localPlayer.size, this.localPlayer.x));
-        this.localPlayer.y = Math.max(this.localPlayer.size, Math.min(this.config.canvas_height - this.localPlayer.size, this.localPlayer.y));
+        this.localPlayer.x = Math.max(this.localPlayer.size, Math.min(this.config.world_width - this.localPlayer.size, this.localPlayer.x));
+        this.localPlayer.y = Math.max(this.localPlayer.size, Math.min(this.config.world_height - this.localPlayer.size, this.localPlayer.y));
 
         if (moved) {
             const now = Date.now();
@@ -489,8 +637,8 @@ class PhaserGame {
     }
 
     updateInterpolation() {
-        const currentTime = performance.now();
-        const renderTime = currentTime - this.interpolationDelay;
+        // Render remote players in the past on the server timeline
+        const renderTime = this.serverNow() - this.interpolationDelay;
 
         for (const [id, buffer] of Object.entries(this.playerUpdateBuffer)) {
             if (!this.players[id] || buffer.length === 0) {
@@ -561,6 +709,86 @@ class PhaserGame {
         }
     }
 
+    updateServerClock(serverTime) {
+        // Offset between the local clock and server time, taken from the least delayed
+        // frame seen so far. It creeps up slowly so clock drift and route changes are absorbed.
+        const offset = performance.now() - serverTime;
+        if (this.clockOffset === null || offset < this.clockOffset) {
+            this.clockOffset = offset;
+        } else {
+            this.clockOffset += 0.02;
+        }
+
+        // Adaptive jitter buffer: delay = one broadcast interval plus twice the smoothed
+        // extra delay of recent frames, so a quiet network gets a small delay
+        const extraDelay = offset - this.clockOffset;
+        this.jitter += (extraDelay - this.jitter) * 0.1;
+        const broadcastInterval = 1000 / this.config.broadcast_fps;
+        const targetDelay = Math.min(this.maxInterpolationDelay,
+            Math.max(this.minInterpolationDelay, broadcastInterval + 2 * this.jitter));
+        this.interpolationDelay += (targetDelay - this.interpolationDelay) * 0.05;
+    }
+
+    serverNow() {
+        return performance.now() - (this.clockOffset || 0);
+    }
+
+    decodePlayerState(id, data) {
+        // State frames carry fixed-point integers (see position_scale / angle_scale)
+        const scale = this.config.position_scale;
+        return {
+            id: id,
+            x: data.x / scale,
+            y: data.y / scale,
+            angle: data.angle / this.config.angle_scale,
+            size: data.size / scale,
+            name: data.name,
+            color: data.color
+        };
+    }
+
+    syncServerTick(tick, serverTime) {
+        this.serverTick = tick;
+        this.serverTickTime = serverTime;
+    }
+
+    estimateServerTick() {
+        const elapsed = this.serverNow() - this.serverTickTime;
+        return this.serverTick + elapsed * this.config.physics_fps / 1000;
+    }
+
+    addBullet(bullet, tick) {
+        // Never let the tick clock lag behind a spawn we already know about
+        if (tick > this.estimateServerTick()) {
+            this.syncServerTick(tick, this.serverNow());
+        }
+        this.bullets[bullet.id] = {
+            ...bullet,
+            originX: bullet.x,
+            originY: bullet.y,
+            spawnTick: tick
+        };
+    }
+
+    updateBullets() {
+        // Bullets fly in a straight line at constant velocity (one step per server tick),
+        // so their position is fully determined by the spawn event
+        const tick = this.estimateServerTick();
+        const maxTicks = 5 * this.config.physics_fps; // Server removes bullets after 5 seconds
+
+        for (const [id, bullet] of Object.entries(this.bullets)) {
+            const ticks = Math.max(0, tick - bullet.spawnTick);
+            bullet.x = bullet.originX + bullet.vx * ticks;
+            bullet.y = bullet.originY + bullet.vy * ticks;
+
+            if (bullet.x < 0 || bullet.x > this.config.world_width ||
+                bullet.y < 0 || bullet.y > this.config.world_height ||
+                ticks > maxTicks) {
+                delete this.bullets[id];
+            }
+        }
+    }
+
     easeOutCubic(t) {
         return 1 - Math.pow(1 - t, 3);
     }